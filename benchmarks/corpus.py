@@ -0,0 +1,440 @@
+# ============================================================================
+# SYNTHETIC CORPUS - Deterministic benchmark input for every extractor
+# ============================================================================
+#
+# Usage: python -m benchmarks.corpus DIR [--scale 1] [--seed 0]
+#
+# Writes text in several sizes and encodings, CSV/JSONL/XML/log files,
+# markdown, multi-page PDFs with tables, DOCX with tables, images with
+# rendered text and nested ZIP/TAR/GZ/7z archives. The same seed and scale
+# always produce the same content, so runs on different commits extract the
+# same work. Kinds whose writer library is missing (python-docx, Pillow,
+# py7zr) are left out and listed in the manifest. RAR archives cannot be
+# written with the libraries the project uses, so RARExtractor gets no input.
+
+import io
+import os
+import gzip
+import json
+import random
+import hashlib
+import tarfile
+import zipfile
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Fixed timestamp for archive members, so archives are byte-identical between runs
+EPOCH = (2020, 1, 1, 0, 0, 0)
+EPOCH_SECONDS = 1577836800
+
+WORDS = (
+    'extraction', 'document', 'archive', 'throughput', 'latency', 'pipeline', 'record', 'encoding',
+    'buffer', 'worker', 'schedule', 'checksum', 'stream', 'layout', 'table', 'column', 'page',
+    'image', 'scanner', 'cache', 'delta', 'snapshot', 'budget', 'memory', 'thread', 'process',
+    'the', 'of', 'and', 'to', 'in', 'is', 'for', 'with', 'on', 'as', 'by', 'at', 'from', 'a',
+)
+# Accented words every 8-bit codepage below can encode, and words only Unicode can
+LATIN_WORDS = ('café', 'naïve', 'Größe', 'façade', 'señor', 'crème', 'déjà', 'über')
+UNICODE_WORDS = ('日本語', 'данные', 'δεδομένα', '데이터', 'بيانات', '数据')
+
+# Text files: (size in bytes, encoding) cycled over the count
+TEXT_VARIANTS = (
+    (1024, 'utf-8'), (1024, 'cp1252'), (1024, 'utf-16'),
+    (64 * 1024, 'utf-8'), (64 * 1024, 'latin-1'), (64 * 1024, 'utf-16'),
+    (1024 * 1024, 'utf-8'),
+)
+
+
+class CorpusWriter:
+    """
+    Write a synthetic corpus into a directory.
+    
+    Every kind of file comes from its own random generator seeded from the
+    corpus seed and the kind, so adding a kind does not change the others.
+    """
+    
+    # Kind -> files at scale 1
+    COUNTS = {
+        'text': 21,
+        'csv': 4,
+        'jsonl': 4,
+        'xml': 4,
+        'log': 4,
+        'markdown': 6,
+        'pdf': 4,
+        'docx': 4,
+        'image': 4,
+        'zip': 2,
+        'tar': 2,
+        'gz': 2,
+        '7z': 1,
+    }
+    
+    def __init__(self, root: Path, scale: float = 1.0, seed: int = 0):
+        """
+        Initialize writer
+        
+        Args:
+            root: Directory to write into (created if missing)
+            scale: Multiplier for the number of files of every kind
+            seed: Seed of all generated content
+        """
+        self.root = Path(root)
+        self.scale = scale
+        self.seed = seed
+    
+    def write(self) -> dict:
+        """
+        Write every kind of file
+        
+        Returns:
+            Manifest: seed, scale, files and bytes per kind, skipped kinds and
+            a fingerprint of the contents
+        """
+        writers: Dict[str, Callable[[random.Random, int], Path]] = {
+            'text': self._write_text,
+            'csv': self._write_csv,
+            'jsonl': self._write_jsonl,
+            'xml': self._write_xml,
+            'log': self._write_log,
+            'markdown': self._write_markdown,
+            'pdf': self._write_pdf,
+            'docx': self._write_docx,
+            'image': self._write_image,
+            'zip': self._write_zip,
+            'tar': self._write_tar,
+            'gz': self._write_gz,
+            '7z': self._write_7z,
+        }
+        
+        kinds = {}
+        skipped = {}
+        files = []
+        for kind, writer in writers.items():
+            count = max(1, round(self.COUNTS[kind] * self.scale))
+            rng = random.Random(f"{self.seed}:{kind}")
+            directory = self.root / kind
+            directory.mkdir(parents=True, exist_ok=True)
+            try:
+                written = [writer(rng, i) for i in range(count)]
+            except ImportError as e:
+                skipped[kind] = f"missing library: {e.name or e}"
+                continue
+            kinds[kind] = {'files': len(written), 'bytes': sum(p.stat().st_size for p in written)}
+            files.extend(written)
+        
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            digest.update(path.relative_to(self.root).as_posix().encode('utf-8'))
+            digest.update(path.read_bytes())
+        
+        return {
+            'seed': self.seed,
+            'scale': self.scale,
+            'files': len(files),
+            'bytes': sum(kind['bytes'] for kind in kinds.values()),
+            'kinds': kinds,
+            'skipped': skipped,
+            'fingerprint': digest.hexdigest(),
+        }
+    
+    # ------------------------------------------------------------------------
+    # Content
+    # ------------------------------------------------------------------------
+    
+    @staticmethod
+    def _sentence(rng: random.Random, extra=(), words: int = 12) -> str:
+        """A capitalised sentence of random words, sometimes with one of `extra`"""
+        chosen = [rng.choice(WORDS) for _ in range(words)]
+        if extra and rng.random() < 0.3:
+            chosen[rng.randrange(words)] = rng.choice(extra)
+        return ' '.join(chosen).capitalize() + '.'
+    
+    def _paragraphs(self, rng: random.Random, size: int, extra=()) -> str:
+        """Paragraphs of sentences until the text is about `size` characters long"""
+        parts = []
+        length = 0
+        while length < size:
+            paragraph = ' '.join(self._sentence(rng, extra) for _ in range(rng.randint(2, 6)))
+            parts.append(paragraph)
+            length += len(paragraph) + 2
+        return '\n\n'.join(parts)[:size]
+    
+    def _table(self, rng: random.Random, rows: int, columns: int) -> List[List[str]]:
+        """Header row plus rows of words and numbers"""
+        table = [[f"{rng.choice(WORDS).capitalize()} {column + 1}" for column in range(columns)]]
+        for _ in range(rows):
+            table.append([str(rng.randint(0, 99999)) if column % 2 else rng.choice(WORDS)
+                          for column in range(columns)])
+        return table
+    
+    # ------------------------------------------------------------------------
+    # Text and data formats
+    # ------------------------------------------------------------------------
+    
+    def _write_text(self, rng: random.Random, index: int) -> Path:
+        size, encoding = TEXT_VARIANTS[index % len(TEXT_VARIANTS)]
+        extra = LATIN_WORDS if encoding in ('cp1252', 'latin-1') else LATIN_WORDS + UNICODE_WORDS
+        path = self.root / 'text' / f"text_{index:03d}_{size // 1024}k_{encoding}.txt"
+        path.write_bytes(self._paragraphs(rng, size, extra).encode(encoding))
+        return path
+    
+    def _write_csv(self, rng: random.Random, index: int) -> Path:
+        path = self.root / 'csv' / f"data_{index:03d}.csv"
+        rows = self._table(rng, 800, 6)
+        path.write_text('\n'.join(','.join(row) for row in rows) + '\n', encoding='utf-8')
+        return path
+    
+    def _write_jsonl(self, rng: random.Random, index: int) -> Path:
+        path = self.root / 'jsonl' / f"events_{index:03d}.jsonl"
+        lines = [json.dumps({
+            'id': n,
+            'type': rng.choice(WORDS),
+            'value': rng.randint(0, 10 ** 6),
+            'text': self._sentence(rng, LATIN_WORDS + UNICODE_WORDS),
+        }, ensure_ascii=False) for n in range(500)]
+        path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        return path
+    
+    def _write_xml(self, rng: random.Random, index: int) -> Path:
+        path = self.root / 'xml' / f"catalog_{index:03d}.xml"
+        items = '\n'.join(
+            f'  <item id="{n}" kind="{rng.choice(WORDS)}"><title>{self._sentence(rng, words=5)}</title>'
+            f'<price>{rng.randint(1, 999)}.{rng.randint(0, 99):02d}</price></item>'
+            for n in range(400)
+        )
+        path.write_text(f'<?xml version="1.0" encoding="UTF-8"?>\n<catalog>\n{items}\n</catalog>\n',
+                        encoding='utf-8')
+        return path
+    
+    def _write_log(self, rng: random.Random, index: int) -> Path:
+        path = self.root / 'log' / f"service_{index:03d}.log"
+        lines = []
+        for n in range(1500):
+            seconds = EPOCH_SECONDS + n * 7 + rng.randint(0, 6)
+            level = rng.choice(('DEBUG', 'INFO', 'INFO', 'INFO', 'WARNING', 'ERROR'))
+            lines.append(f"{seconds} {level:<7} [{rng.choice(WORDS)}] {self._sentence(rng, words=8)}")
+        path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        return path
+    
+    def _write_markdown(self, rng: random.Random, index: int) -> Path:
+        path = self.root / 'markdown' / f"notes_{index:03d}.md"
+        parts = [f"---\ntitle: {self._sentence(rng, words=4)}\ntags: [{rng.choice(WORDS)}]\n---\n"]
+        for section in range(6):
+            parts.append(f"## {section + 1}. {rng.choice(WORDS).capitalize()}\n")
+            parts.append(self._paragraphs(rng, 1500))
+            table = self._table(rng, 5, 3)
+            parts.append('\n'.join(['| ' + ' | '.join(table[0]) + ' |', '|' + '---|' * 3]
+                                   + ['| ' + ' | '.join(row) + ' |' for row in table[1:]]))
+            parts.append(f"```python\ndef {rng.choice(WORDS)}_{section}():\n    return {rng.randint(0, 99)}\n```")
+        path.write_text('\n\n'.join(parts) + '\n', encoding='utf-8')
+        return path
+    
+    # ------------------------------------------------------------------------
+    # Documents and images
+    # ------------------------------------------------------------------------
+    
+    def _write_pdf(self, rng: random.Random, index: int) -> Path:
+        """Multi-page PDF with a paragraph and a ruled table on every page (written by hand)"""
+        path = self.root / 'pdf' / f"report_{index:03d}.pdf"
+        pages = []
+        for page in range(5):
+            lines = [self._sentence(rng, words=10) for _ in range(12)]
+            pages.append(_pdf_page_content(f"Page {page + 1}", lines, self._table(rng, 8, 4)))
+        path.write_bytes(_pdf_document(pages))
+        return path
+    
+    def _write_docx(self, rng: random.Random, index: int) -> Path:
+        import docx
+        from datetime import datetime
+        
+        path = self.root / 'docx' / f"memo_{index:03d}.docx"
+        document = docx.Document()
+        document.core_properties.created = datetime(*EPOCH)
+        document.core_properties.modified = datetime(*EPOCH)
+        document.add_heading(self._sentence(rng, words=4), level=1)
+        for _ in range(3):
+            for _ in range(4):
+                document.add_paragraph(self._paragraphs(rng, 600))
+            table_rows = self._table(rng, 10, 4)
+            table = document.add_table(rows=len(table_rows), cols=4)
+            for row, values in zip(table.rows, table_rows):
+                for cell, value in zip(row.cells, values):
+                    cell.text = value
+        
+        # python-docx stamps the package parts with the current time; rewrite
+        # them with a fixed one so the file is byte-identical between runs
+        buffer = io.BytesIO()
+        document.save(buffer)
+        path.write_bytes(_normalise_zip(buffer.getvalue()))
+        return path
+    
+    def _write_image(self, rng: random.Random, index: int) -> Path:
+        from PIL import Image, ImageDraw
+        
+        extension = ('png', 'jpg')[index % 2]
+        path = self.root / 'image' / f"scan_{index:03d}.{extension}"
+        image = Image.new('RGB', (1200, 800), 'white')
+        draw = ImageDraw.Draw(image)
+        for line in range(20):
+            draw.text((40, 30 + line * 36), self._sentence(rng, words=9), fill='black')
+        if extension == 'jpg':
+            image.save(path, quality=90)
+        else:
+            image.save(path)
+        return path
+    
+    # ------------------------------------------------------------------------
+    # Archives
+    # ------------------------------------------------------------------------
+    
+    def _members(self, rng: random.Random, count: int) -> Dict[str, bytes]:
+        """Text, CSV and markdown members for an archive"""
+        members = {}
+        for n in range(count):
+            kind = n % 3
+            if kind == 0:
+                members[f"docs/part_{n:02d}.txt"] = self._paragraphs(rng, 8 * 1024).encode('utf-8')
+            elif kind == 1:
+                rows = self._table(rng, 100, 4)
+                members[f"data/table_{n:02d}.csv"] = '\n'.join(','.join(r) for r in rows).encode('utf-8')
+            else:
+                members[f"notes/note_{n:02d}.md"] = f"# Note {n}\n\n{self._paragraphs(rng, 2048)}\n".encode('utf-8')
+        return members
+    
+    def _write_zip(self, rng: random.Random, index: int) -> Path:
+        """ZIP with text members and a nested ZIP inside"""
+        path = self.root / 'zip' / f"bundle_{index:03d}.zip"
+        inner = _zip_bytes(self._members(rng, 4))
+        members = self._members(rng, 8)
+        members['nested/inner.zip'] = inner
+        path.write_bytes(_zip_bytes(members))
+        return path
+    
+    def _write_tar(self, rng: random.Random, index: int) -> Path:
+        """Plain TAR, and gzip-compressed TAR for odd indexes"""
+        compressed = index % 2 == 1
+        path = self.root / 'tar' / (f"backup_{index:03d}.tar.gz" if compressed else f"backup_{index:03d}.tar")
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w', format=tarfile.PAX_FORMAT) as tar:
+            for name, data in self._members(rng, 9).items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = EPOCH_SECONDS
+                tar.addfile(info, io.BytesIO(data))
+        data = buffer.getvalue()
+        path.write_bytes(gzip.compress(data, mtime=0) if compressed else data)
+        return path
+    
+    def _write_gz(self, rng: random.Random, index: int) -> Path:
+        path = self.root / 'gz' / f"export_{index:03d}.log.gz"
+        path.write_bytes(gzip.compress(self._paragraphs(rng, 256 * 1024).encode('utf-8'), mtime=0))
+        return path
+    
+    def _write_7z(self, rng: random.Random, index: int) -> Path:
+        import py7zr
+        
+        path = self.root / '7z' / f"package_{index:03d}.7z"
+        # py7zr stamps members written from memory with the current time, so
+        # write them from files with a fixed mtime instead
+        with tempfile.TemporaryDirectory(prefix='corpus_7z_') as work:
+            with py7zr.SevenZipFile(path, 'w') as archive:
+                for name, data in self._members(rng, 6).items():
+                    member = Path(work) / name
+                    member.parent.mkdir(parents=True, exist_ok=True)
+                    member.write_bytes(data)
+                    os.utime(member, (EPOCH_SECONDS, EPOCH_SECONDS))
+                    archive.write(member, name)
+        return path
+
+
+# ============================================================================
+# FILE FORMAT HELPERS
+# ============================================================================
+
+def _zip_bytes(members: Dict[str, bytes]) -> bytes:
+    """Deflated ZIP of the members with fixed timestamps"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(zipfile.ZipInfo(name, date_time=EPOCH), data, zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+def _normalise_zip(data: bytes) -> bytes:
+    """Rewrite a ZIP with fixed member timestamps"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return _zip_bytes({info.filename: archive.read(info) for info in archive.infolist()})
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_page_content(title: str, lines: List[str], table: List[List[str]]) -> bytes:
+    """Content stream of an A4 page: a title, lines of text and a ruled table"""
+    ops = [f"BT /F1 16 Tf 50 790 Td ({_pdf_escape(title)}) Tj ET",
+           "BT /F1 10 Tf 50 760 Td 14 TL"]
+    ops.extend(f"({_pdf_escape(line)}) Tj T*" for line in lines)
+    ops.append("ET")
+    
+    # Ruled grid, so table detection has lines to work with
+    left, top, width, height = 50, 560, 120, 20
+    columns = len(table[0])
+    ops.append("0.5 w")
+    for row in range(len(table) + 1):
+        y = top - row * height
+        ops.append(f"{left} {y} m {left + columns * width} {y} l S")
+    for column in range(columns + 1):
+        x = left + column * width
+        ops.append(f"{x} {top} m {x} {top - len(table) * height} l S")
+    for row, values in enumerate(table):
+        for column, value in enumerate(values):
+            ops.append(f"BT /F1 9 Tf {left + column * width + 4} {top - (row + 1) * height + 6} Td "
+                       f"({_pdf_escape(value)}) Tj ET")
+    return '\n'.join(ops).encode('latin-1')
+
+
+def _pdf_document(pages: List[bytes]) -> bytes:
+    """Assemble page content streams into a PDF with a Helvetica font"""
+    page_ids = [4 + 2 * n for n in range(len(pages))]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(pages)} >>".encode(),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    for page_id, content in zip(page_ids, pages):
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>").encode()
+        objects[page_id + 1] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+    
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id])
+    
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for object_id in sorted(objects):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Write the synthetic benchmark corpus")
+    parser.add_argument('directory', help="Directory to write into")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiplier for the number of files")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the generated content")
+    args = parser.parse_args()
+    
+    manifest = CorpusWriter(Path(args.directory), args.scale, args.seed).write()
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+# ============================================================================
+# EXTRACTION BENCHMARK - Throughput, latency and memory on a synthetic corpus
+# ============================================================================
+#
+# Usage: python -m benchmarks.extraction [--scale 1] [--seed 0] [--runs 3]
+#                                        [--corpus DIR] [--only CLASS ...]
+#                                        [--output FILE]
+#
+# Writes the synthetic corpus of benchmarks.corpus (or reuses --corpus), then
+# runs every extractor class on its files in isolation and extract_documents
+# on the whole corpus, without the extraction cache ('pipeline') and with it
+# as configured by default ('pipeline_cache'). Each one runs in a fresh interpreter, so imports of the
+# other extractors do not count and peak RSS belongs to that one measurement.
+# Reports files/s, MB/s, p50/p95 per-file latency and peak RSS as JSON; keep
+# the reports of two commits to compare them.
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from collections import Counter
+from typing import List, Optional
+
+from benchmarks.corpus import CorpusWriter
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CORPUS_MANIFEST = 'corpus.json'
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile (None for no values)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident memory of this process
+    
+    Returns:
+        Bytes, or None where it cannot be measured (Windows without psutil)
+    """
+    # Linux keeps ru_maxrss across fork and exec, so a fresh interpreter would
+    # report the benchmark driver's peak; VmHWM starts over with the new image
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+    
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            return None
+    
+    # macOS reports bytes, other Unixes kilobytes
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def summarize(files: int, total_bytes: int, run_seconds: List[float], latencies_ms: List[float]) -> dict:
+    """
+    Throughput of the median run and the per-file latency distribution of all runs
+    
+    Returns:
+        Report dictionary
+    """
+    seconds = statistics.median(run_seconds)
+    return {
+        'files': files,
+        'bytes': total_bytes,
+        'runs': len(run_seconds),
+        'median_run_seconds': round(seconds, 3),
+        'files_per_second': round(files / seconds, 2) if seconds else None,
+        'mb_per_second': round(total_bytes / (1024 * 1024) / seconds, 3) if seconds else None,
+        'p50_ms': round(percentile(latencies_ms, 50), 2) if latencies_ms else None,
+        'p95_ms': round(percentile(latencies_ms, 95), 2) if latencies_ms else None,
+        'max_ms': round(max(latencies_ms), 2) if latencies_ms else None,
+    }
+
+
+def corpus_files(corpus: Path) -> List[Path]:
+    """Every file of the corpus, in a fixed order"""
+    return sorted(path for path in corpus.rglob('*') if path.is_file() and path.name != CORPUS_MANIFEST)
+
+
+# ============================================================================
+# MEASUREMENTS (each runs in its own interpreter)
+# ============================================================================
+
+def bench_extractor(corpus: Path, class_name: str, runs: int) -> dict:
+    """
+    Run one extractor class on its files of the corpus, one file at a time
+    
+    The first file is extracted once untimed, so library imports are not
+    counted as latency.
+    """
+    from extractor.registry import load_class, lookup
+    
+    extractor_class = load_class(class_name)
+    files = [path for path in corpus_files(corpus) if lookup(path.name) == class_name]
+    extractor_class(files[0]).safe_extract()
+    
+    run_seconds = []
+    latencies_ms = []
+    statuses = Counter()
+    for run in range(runs):
+        run_start = time.perf_counter()
+        for path in files:
+            start = time.perf_counter()
+            result = extractor_class(path).safe_extract()
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            if run == 0:
+                statuses[result['extraction_status']] += 1
+        run_seconds.append(time.perf_counter() - run_start)
+    
+    report = summarize(len(files), sum(path.stat().st_size for path in files), run_seconds, latencies_ms)
+    report['statuses'] = dict(statuses)
+    report['peak_rss_bytes'] = peak_rss_bytes()
+    return report
+
+
+def bench_pipeline(corpus: Path, runs: int, cache: bool = False) -> dict:
+    """
+    Run extract_documents on the whole corpus (scan, scheduling, workers, output)
+    
+    Per-file latency is the 'total' of each result's timings, so it needs
+    Config.RECORD_TIMINGS.
+    
+    With cache, every timed run starts from an empty extraction cache (so it
+    measures what the cache costs a first run); one more run then reuses the
+    last run's cache and is reported as 'warm_run_seconds'.
+    """
+    import main
+    from config import Config
+    from utils.output_writer import iter_records
+    
+    output_root = Path(Config.OUTPUT_FOLDER)
+    files = corpus_files(corpus)
+    
+    run_seconds = []
+    latencies_ms = []
+    statuses = Counter()
+    for run in range(runs):
+        # A folder per run, so run IDs and output names cannot collide; the
+        # derived paths are given too, as the last load exported the old ones
+        run_folder = output_root / f"run_{run}"
+        overrides = {name: str(run_folder / subpath) for name, subpath in Config.OUTPUT_SUBPATHS.items()}
+        Config.load(overrides={'OUTPUT_FOLDER': str(run_folder), 'CACHE_ENABLED': cache, **overrides})
+        start = time.perf_counter()
+        output_file = main.extract_documents(corpus)
+        run_seconds.append(time.perf_counter() - start)
+        
+        for record in iter_records(output_file):
+            if record['record_type'] != 'result':
+                continue
+            if 'timings' in record:
+                latencies_ms.append(record['timings']['total']['ms'])
+            if run == 0:
+                statuses[record['extraction_status']] += 1
+    
+    report = summarize(len(files), sum(path.stat().st_size for path in files), run_seconds, latencies_ms)
+    report['statuses'] = dict(statuses)
+    if cache:
+        # Same cache folder as the last run, fresh output and run folders
+        warm_folder = output_root / 'warm'
+        overrides = {name: str(warm_folder / subpath) for name, subpath in Config.OUTPUT_SUBPATHS.items()}
+        overrides['CACHE_FOLDER'] = Config.CACHE_FOLDER
+        Config.load(overrides={'OUTPUT_FOLDER': str(warm_folder), 'CACHE_ENABLED': True, **overrides})
+        start = time.perf_counter()
+        main.extract_documents(corpus)
+        report['warm_run_seconds'] = round(time.perf_counter() - start, 3)
+    # Worker processes are not included; the per-extractor measurements cover them
+    report['peak_rss_bytes'] = peak_rss_bytes()
+    return report
+
+
+def run_isolated(measurement: str, corpus: Path, runs: int, output_folder: Path) -> dict:
+    """
+    Run a measurement in a fresh interpreter
+    
+    Args:
+        measurement: 'pipeline', 'pipeline_cache' or an extractor class name
+        corpus: Corpus directory
+        runs: Timed runs
+        output_folder: OUTPUT_FOLDER of the run (output, manifests, logs)
+    
+    Returns:
+        Report of the measurement, or {'error': ...} if it failed
+    """
+    report_file = output_folder / f"{measurement}.json"
+    env = dict(os.environ)
+    env['DOCEXTRACT_OUTPUT_FOLDER'] = str(output_folder)
+    env.pop('DOCEXTRACT_CACHE_ENABLED', None)  # bench_pipeline sets it; extractors run without it
+    
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.extraction', '--measure', measurement,
+         '--corpus', str(corpus), '--runs', str(runs), '--report', str(report_file)],
+        cwd=str(PROJECT_ROOT), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    if completed.returncode != 0 or not report_file.exists():
+        error = completed.stderr.decode(errors='replace').strip().splitlines()
+        return {'error': error[-1] if error else f"exit status {completed.returncode}"}
+    return json.loads(report_file.read_text(encoding='utf-8'))
+
+
+def git_commit() -> Optional[str]:
+    """Commit of the working tree, if it is a git checkout"""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(PROJECT_ROOT),
+                                   capture_output=True, text=True)
+    except OSError:
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout.strip() or None
+
+
+def run_benchmark(scale: float = 1.0, seed: int = 0, runs: int = 3, corpus: Optional[Path] = None,
+                  only: Optional[List[str]] = None) -> dict:
+    """
+    Write (or reuse) the corpus and run every measurement on it
+    
+    Args:
+        scale: Corpus size multiplier
+        seed: Corpus seed
+        runs: Timed runs per measurement
+        corpus: Directory to keep the corpus in; reused if it already holds one
+        only: Measurements to run (extractor class names, 'pipeline', 'pipeline_cache')
+    
+    Returns:
+        Report dictionary
+    """
+    from extractor.registry import EXTRACTOR_MODULES, lookup
+    
+    with tempfile.TemporaryDirectory(prefix='extraction_bench_') as work:
+        corpus = Path(corpus) if corpus else Path(work) / 'corpus'
+        manifest_file = corpus / CORPUS_MANIFEST
+        if manifest_file.exists():
+            manifest = json.loads(manifest_file.read_text(encoding='utf-8'))
+        else:
+            manifest = CorpusWriter(corpus, scale, seed).write()
+            manifest_file.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        
+        present = Counter(lookup(path.name) for path in corpus_files(corpus))
+        measurements = [name for name in EXTRACTOR_MODULES if present[name]] + ['pipeline', 'pipeline_cache']
+        if only:
+            measurements = [name for name in measurements if name in only]
+        
+        results = {}
+        for measurement in measurements:
+            output_folder = Path(work) / 'output' / measurement
+            output_folder.mkdir(parents=True)
+            results[measurement] = run_isolated(measurement, corpus, runs, output_folder)
+    
+    return {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'commit': git_commit(),
+        'corpus': manifest,
+        'runs': runs,
+        'extractors': {name: report for name, report in results.items() if not name.startswith('pipeline')},
+        'no_input': [name for name in EXTRACTOR_MODULES if not present[name]],
+        'pipeline': results.get('pipeline'),
+        'pipeline_cache': results.get('pipeline_cache'),
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark extraction on a synthetic corpus")
+    parser.add_argument('--scale', type=float, default=1.0, help="Corpus size multiplier")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed")
+    parser.add_argument('--runs', type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument('--corpus', metavar='DIR',
+                        help="Keep the corpus here and reuse it on later runs (default: temporary)")
+    parser.add_argument('--only', nargs='+', metavar='NAME',
+                        help="Only these measurements (extractor class names, 'pipeline', 'pipeline_cache')")
+    parser.add_argument('--output', metavar='FILE', help="Also write the report to this file")
+    # Internal: one measurement in this interpreter, report written to --report
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    parser.add_argument('--report', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure:
+        # Settings run_isolated passed in the environment (OUTPUT_FOLDER)
+        from config import Config
+        Config.load()
+        
+        corpus = Path(args.corpus)
+        if args.measure in ('pipeline', 'pipeline_cache'):
+            report = bench_pipeline(corpus, args.runs, cache=args.measure == 'pipeline_cache')
+        else:
+            report = bench_extractor(corpus, args.measure, args.runs)
+        Path(args.report).write_text(json.dumps(report), encoding='utf-8')
+        return
+    
+    report = run_benchmark(args.scale, args.seed, args.runs,
+                           Path(args.corpus) if args.corpus else None, args.only)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    print(text)
+    results = list(report['extractors'].values()) + [report['pipeline'] or {}, report['pipeline_cache'] or {}]
+    sys.exit(1 if any('error' in result for result in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
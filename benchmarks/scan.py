@@ -0,0 +1,167 @@
+# ============================================================================
+# SCAN BENCHMARK - Directory walking on a synthetic deep/wide tree
+# ============================================================================
+#
+# Usage: python -m benchmarks.scan [--depth 3] [--width 6] [--files 20]
+#                                  [--threads 8] [--latency-ms 0] [--runs 5]
+#
+# Compares the old rglob('*') scan with the single-threaded and parallel
+# os.scandir walkers of FileScanner. --latency-ms adds a delay to every
+# directory listing to stand in for the round trip of a network drive.
+# Prints a JSON report.
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from utils.file_scanner import FileScanner
+
+# File names of every synthetic directory cycle through these extensions
+# (one unsupported, so the filters have work to do)
+EXTENSIONS = ('.txt', '.md', '.py', '.json', '.bin')
+
+
+def build_tree(root: Path, depth: int, width: int, files: int) -> int:
+    """
+    Create a tree with `width` subdirectories per level and `files` small files per directory
+    
+    Returns:
+        Number of directories created
+    """
+    directories = 1
+    for i in range(files):
+        (root / f"file_{i:04d}{EXTENSIONS[i % len(EXTENSIONS)]}").write_text(f"{root.name} {i}\n")
+    if depth > 0:
+        for i in range(width):
+            subdir = root / f"dir_{i:03d}"
+            subdir.mkdir()
+            directories += build_tree(subdir, depth - 1, width, files)
+    return directories
+
+
+def scan_rglob(root: Path) -> List[Path]:
+    """The scan before FileScanner walked with os.scandir: rglob, then is_file and stat per file"""
+    extensions = FileScanner().supported_extensions
+    found = []
+    for file_path in root.rglob('*'):
+        if file_path.is_file() and file_path.suffix.lower() in extensions:
+            file_path.stat()
+            found.append(file_path)
+    return found
+
+
+def add_latency(latency_ms: float):
+    """Delay every os.scandir call (rglob lists directories with it as well)"""
+    scandir = os.scandir
+    
+    def slow_scandir(*args, **kwargs):
+        time.sleep(latency_ms / 1000)  # Releases the GIL, like waiting on the network
+        return scandir(*args, **kwargs)
+    
+    os.scandir = slow_scandir
+
+
+def time_scan(scan: Callable[[], List[Path]], runs: int) -> Dict[str, float]:
+    """
+    Run a scan repeatedly and summarize its wall-clock time
+    
+    Returns:
+        Dictionary with min/median/max milliseconds and the files found
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        found = scan()
+        samples.append((time.perf_counter() - start) * 1000)
+    
+    return {
+        'files': len(found),
+        'min_ms': round(min(samples), 2),
+        'median_ms': round(statistics.median(samples), 2),
+        'max_ms': round(max(samples), 2),
+    }
+
+
+def run_benchmark(depth: int = 3, width: int = 6, files: int = 20, threads: int = 8,
+                  latency_ms: float = 0.0, runs: int = 5) -> dict:
+    """
+    Build the tree and time every scan method on it
+    
+    Args:
+        depth: Directory levels below the root
+        width: Subdirectories per directory
+        files: Files per directory
+        threads: Listing threads of the parallel walkers
+        latency_ms: Delay added to every directory listing
+        runs: Timed runs per method
+    
+    Returns:
+        Report dictionary
+    """
+    with tempfile.TemporaryDirectory(prefix='scan_bench_') as work:
+        root = Path(work)
+        directories = build_tree(root, depth, width, files)
+        if latency_ms:
+            add_latency(latency_ms)
+        
+        scans = {
+            'rglob': lambda: scan_rglob(root),
+            'scandir': lambda: list(FileScanner().iter_directory(root, threads=1)),
+            'parallel': lambda: list(FileScanner().iter_directory(root, threads=threads,
+                                                                  deterministic=False)),
+            'parallel_deterministic': lambda: list(FileScanner().iter_directory(
+                root, threads=threads, deterministic=True)),
+        }
+        results = {name: time_scan(scan, runs) for name, scan in scans.items()}
+        
+        # Every method must find the same files; the deterministic walk in the same order
+        reference = sorted(scan_rglob(root))
+        serial = list(FileScanner().iter_directory(root, threads=1))
+        consistent = (
+            sorted(serial) == reference
+            and sorted(scans['parallel']()) == reference
+            and scans['parallel_deterministic']() == serial
+        )
+    
+    baseline = results['rglob']['median_ms']
+    for result in results.values():
+        result['speedup'] = round(baseline / result['median_ms'], 2) if result['median_ms'] else None
+    
+    return {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'tree': {'depth': depth, 'width': width, 'files_per_directory': files,
+                 'directories': directories},
+        'threads': threads,
+        'latency_ms': latency_ms,
+        'runs': runs,
+        'results': results,
+        'consistent': consistent,
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compare directory scan methods")
+    parser.add_argument('--depth', type=int, default=3, help="Directory levels below the root")
+    parser.add_argument('--width', type=int, default=6, help="Subdirectories per directory")
+    parser.add_argument('--files', type=int, default=20, help="Files per directory")
+    parser.add_argument('--threads', type=int, default=8, help="Listing threads of the parallel walkers")
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help="Delay added to every directory listing (simulates a network drive)")
+    parser.add_argument('--runs', type=int, default=5, help="Timed runs per method")
+    args = parser.parse_args()
+    
+    report = run_benchmark(args.depth, args.width, args.files, args.threads, args.latency_ms, args.runs)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report['consistent'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,10 +3,18 @@
 # ============================================================================
 
 import os
+import json
 from pathlib import Path
 
 class Config:
-    """Central configuration for the document extractor"""
+    """
+    Central configuration for the document extractor
+    
+    The values below are defaults. Config.load() overrides them at run time
+    from a JSON config file, DOCEXTRACT_<SETTING> environment variables and
+    the command line. Importing this module has no side effects; folders
+    are created when something is first written to them.
+    """
     
     # -------------------------------------------------------------------------
     # OUTPUT SETTINGS
@@ -14,9 +22,6 @@ class Config:
     OUTPUT_DRIVE = "D:\\"
     OUTPUT_FOLDER = os.path.join(OUTPUT_DRIVE, "extracted_data")
     
-    # Create output folder if it doesn't exist
-    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
-    
     # JSON output settings
     JSON_INDENT = 2  # Pretty printing with 2 spaces
     JSON_ENSURE_ASCII = False  # Preserve Unicode characters
@@ -25,7 +30,56 @@ class Config:
     # PROCESSING SETTINGS
     # -------------------------------------------------------------------------
     MAX_THREADS = 8  # Number of parallel processing threads
-    CHUNK_SIZE = 100  # Process files in chunks for memory efficiency
+    MAX_PROCESSES = os.cpu_count() or 1  # Worker processes for CPU-heavy extractors
+    USE_PROCESS_POOL = True  # Run CPU-bound and crash-prone extractors in worker processes
+    
+    # Limits for files run in worker processes; a worker that breaches one is
+    # killed and replaced, and the file is recorded as 'timeout' or 'crashed'
+    EXTRACTION_TIMEOUT_SECONDS = 300  # Wall-clock limit per file (0 = no limit)
+    WORKER_MEMORY_LIMIT_MB = 2048  # Resident memory limit per worker (0 = no limit)
+    ISOLATE_ALL_FILES = False  # Also run text/DOCX/TAR files in worker processes
+    CHUNK_SIZE = 100  # Max tasks in flight at once (bounds scheduler memory)
+    
+    # Memory admission: a file is only started while the estimated memory of
+    # all running extractions stays under the budget; one always runs, however large
+    MEMORY_BUDGET_MB = 4096  # 0 = no limit
+    
+    # Estimated peak memory per byte of file, by category (a text file is held
+    # as bytes, as decoded text and split into lines; images are decompressed)
+    MEMORY_COST_FACTORS = {
+        'images': 12,
+        'pdf': 8,
+        'docx': 10,
+        'markdown': 8,
+        'archive': 3,
+        'text': 6
+    }
+    MEMORY_COST_OVERHEAD_MB = 8  # Added to every estimate (extractor, libraries' buffers)
+    
+    # Directories listed at once while scanning; more than 1 hides the
+    # per-directory round trip of network drives
+    SCAN_THREADS = 4
+    SCAN_DETERMINISTIC = False  # With SCAN_THREADS > 1, still find files in name order
+    
+    # Start the most expensive files first so a huge file found last
+    # does not keep the run alive after every other worker is idle
+    SCHEDULE_LARGEST_FIRST = True
+    
+    # Files found by the scan but not yet started; a full queue pauses the
+    # scan, so a huge tree is not held in memory path by path (largest-first
+    # ordering applies within this window)
+    SCAN_QUEUE_MAX_FILES = 10000
+    
+    # Relative cost per byte of each file category (text = 1)
+    EXTRACTION_COST_WEIGHTS = {
+        'images': 20,
+        'pdf': 10,
+        'docx': 3,
+        'markdown': 2,
+        'archive': 2,
+        'text': 1
+    }
+    COST_FIXED_OVERHEAD_BYTES = 64 * 1024  # Per-file overhead added before weighting
     
     # -------------------------------------------------------------------------
     # FILE TYPE SUPPORT
@@ -80,7 +134,6 @@ class Config:
     # -------------------------------------------------------------------------
     MAX_ZIP_DEPTH = 10  # Maximum nesting level for ZIP files
     EXTRACT_TEMP_FOLDER = os.path.join(OUTPUT_FOLDER, 'temp_extracted')
-    os.makedirs(EXTRACT_TEMP_FOLDER, exist_ok=True)
     
     # -------------------------------------------------------------------------
     # ERROR HANDLING
@@ -88,6 +141,8 @@ class Config:
     CONTINUE_ON_ERROR = True  # Don't stop on individual file errors
     LOG_ERRORS_TO_FILE = True
     ERROR_LOG_PATH = os.path.join(OUTPUT_FOLDER, 'errors.log')
+    RUNS_FOLDER = os.path.join(OUTPUT_FOLDER, 'runs')  # Run manifests for --resume
+    STATE_FOLDER = os.path.join(OUTPUT_FOLDER, 'state')  # File state for --incremental
     
     # -------------------------------------------------------------------------
     # LOGGING SETTINGS
@@ -106,18 +161,82 @@ class Config:
     # PERFORMANCE SETTINGS
     # -------------------------------------------------------------------------
     # Memory management
-    MAX_FILE_SIZE_MB = 500  # Skip files larger than this (safety)
-    BATCH_SAVE_INTERVAL = 100  # Save JSON every N files (progress saving)
+    MAX_FILE_SIZE_MB = 500  # Files larger than this get LARGE_FILE_POLICY (0 = no limit)
+    
+    # What happens to files over MAX_FILE_SIZE_MB: 'skip' them, extract only
+    # the first LARGE_FILE_SAMPLE_MB ('head'), or half of it from the start and
+    # half from the end ('head_tail'). Only text-like extractors (plain text,
+    # single .gz) can work on part of a file; the others skip it either way.
+    LARGE_FILE_POLICY = 'skip'
+    LARGE_FILE_SAMPLE_MB = 16
+    
+    # Output field caps in characters (0 = no cap). They are applied while
+    # reading: at most 4 bytes per character are read, never the whole input.
+    MAX_TEXT_CHARS = 10_000_000  # Extracted text of a text file or .gz
+    MAX_MEMBER_CHARS = 1_000_000  # 'content' of each archive member (tar, 7z, rar)
+    MAX_BINARY_HEX_BYTES = 64 * 1024  # Bytes of an undecodable file dumped as hex
+    BATCH_SAVE_INTERVAL = 100  # Flush/fsync streamed output every N files
+    
+    # Output rolls over to a new shard file at either limit (0 = no limit).
+    # The index maps every result's file_id and path to its shard, byte
+    # offset and length; the output manifest lists the shards.
+    OUTPUT_SHARD_MAX_RECORDS = 0
+    OUTPUT_SHARD_MAX_MB = 1024
+    OUTPUT_INDEX = True
     
     # Progress update frequency
     PROGRESS_UPDATE_INTERVAL = 0.5  # Seconds between GUI updates
+    PROGRESS_MAX_LOG_LINES = 100  # GUI log lines per update; older ones are counted (all reach the log file)
+    GUI_QUEUE_SIZE = 50  # Max messages waiting for the GUI thread
+    RECORD_TIMINGS = True  # Add per-stage durations ('timings') to every result record
+    CLI_PROGRESS_INTERVAL = 10  # Seconds between progress log lines on the command line (0 = off)
+    
+    # Throughput smoothing: rates are sampled at most every PROGRESS_RATE_WINDOW
+    # seconds and averaged exponentially with a PROGRESS_SMOOTHING_SECONDS time constant
+    PROGRESS_RATE_WINDOW = 1.0
+    PROGRESS_SMOOTHING_SECONDS = 10.0
+    
+    # Profiling (--profile): stacks of the extracting threads are sampled and
+    # the slowest files get profiles of their own
+    PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+    PROFILE_SLOWEST_FILES = 10
+    PROFILE_TRACE_MEMORY = True  # Peak allocations via tracemalloc (slows allocation-heavy code down)
+    
+    # -------------------------------------------------------------------------
+    # EXTRACTION CACHE
+    # -------------------------------------------------------------------------
+    # Extracted content is cached by file checksum, so unchanged files are
+    # never re-extracted (or re-OCR'd) on the next run
+    CACHE_ENABLED = True
+    CACHE_FOLDER = os.path.join(OUTPUT_FOLDER, 'cache')
+    CACHE_MAX_SIZE_MB = 2048  # Least recently used entries are evicted beyond this
+    CACHE_VERSION = 1  # Bump to invalidate entries after extractor output changes
+    CACHE_WRITE_BATCH = 200  # Stores and hits written to the database per transaction
+    CACHE_FLUSH_INTERVAL = 2.0  # Seconds before a partial batch is written anyway
+    
+    # -------------------------------------------------------------------------
+    # DEDUPLICATION
+    # -------------------------------------------------------------------------
+    # Byte-identical files in one run are extracted once; the copies are
+    # written as 'duplicate' records pointing to the extracted file
+    DEDUPLICATE_FILES = True
+    DEDUP_SAMPLE_BYTES = 64 * 1024  # Block size of the sampled fast hash
+    DEDUP_HASH_THREADS = 2  # Threads comparing files (one size/extension group each)
     
     # -------------------------------------------------------------------------
     # METADATA EXTRACTION
     # -------------------------------------------------------------------------
     EXTRACT_FILE_METADATA = True  # Size, dates, permissions
     EXTRACT_DOCUMENT_METADATA = True  # Author, title, keywords
-    CALCULATE_CHECKSUMS = True  # MD5 hash for verification
+    CALCULATE_CHECKSUMS = True  # Checksum every file for verification (CHECKSUM_* below)
+    
+    # md5 keeps the 'md5_checksum' field; sha256/blake2b/sha512 write '<name>_checksum';
+    # xxh64/xxh3_128 are much faster non-crypto hashes (needs: pip install xxhash)
+    CHECKSUM_ALGORITHM = 'md5'
+    CHECKSUM_SKIP_TYPES = set()  # Categories without checksums, e.g. {'archive', 'images'}
+    CHECKSUM_CONCURRENT = True  # Hash in a background thread while the file is extracted (not for files read into memory anyway)
+    CHECKSUM_THREADS = 2  # Background hashing threads per worker process
+    CHECKSUM_BUFFER_SIZE = 1024 * 1024  # Read size when streaming large files
     
     # -------------------------------------------------------------------------
     # ENCODING DETECTION
@@ -125,6 +244,8 @@ class Config:
     DEFAULT_ENCODING = 'utf-8'
     FALLBACK_ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
     AUTO_DETECT_ENCODING = True
+    ENCODING_DETECTION_BYTES = 1024 * 1024  # chardet sample taken from the start of the file
+    MMAP_THRESHOLD_MB = 8  # Memory-map files at least this large instead of reading them
     
     # -------------------------------------------------------------------------
     # GUI SETTINGS
@@ -141,18 +262,95 @@ class Config:
     SKIP_EMPTY_FILES = True  # Don't process 0-byte files
     SKIP_SYSTEM_FILES = True  # Ignore hidden/system files
     
-    # System file patterns to skip
+    # System file patterns to skip (file and directory names; matched
+    # directories are not descended into)
     SKIP_PATTERNS = {
         'thumbs.db', 'desktop.ini', '.ds_store',
         '~$*',  # Office temp files
-        '__pycache__', '*.pyc'
+        '__pycache__', '*.pyc',
+        '.git', '.svn', '.hg'  # Version control metadata
     }
     
     # -------------------------------------------------------------------------
     # TIMESTAMP FORMAT
     # -------------------------------------------------------------------------
     TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
-    JSON_FILENAME_FORMAT = 'extraction_%Y%m%d_%H%M%S.json'
+    JSON_FILENAME_FORMAT = 'extraction_%Y%m%d_%H%M%S.jsonl'
+    RUN_ID_FORMAT = '%Y%m%d_%H%M%S'  # Run IDs match the output file timestamp
+    DELTA_FILENAME_FORMAT = 'delta_%Y%m%d_%H%M%S.jsonl'  # Incremental runs
+    SNAPSHOT_FILENAME_FORMAT = 'snapshot_%Y%m%d_%H%M%S.jsonl'  # Merged full snapshot
+    
+    # -------------------------------------------------------------------------
+    # RUN-TIME OVERRIDES
+    # -------------------------------------------------------------------------
+    ENV_PREFIX = 'DOCEXTRACT_'  # DOCEXTRACT_MAX_THREADS=4, DOCEXTRACT_OUTPUT_FOLDER=...
+    CONFIG_FILE_ENV = 'DOCEXTRACT_CONFIG'  # Path of a JSON file of overrides
+    
+    # Paths derived from OUTPUT_FOLDER; they follow it when it is overridden
+    OUTPUT_SUBPATHS = {
+        'EXTRACT_TEMP_FOLDER': 'temp_extracted',
+        'ERROR_LOG_PATH': 'errors.log',
+        'RUNS_FOLDER': 'runs',
+        'STATE_FOLDER': 'state',
+        'LOG_FILE_PATH': 'extraction.log',
+        'CACHE_FOLDER': 'cache',
+    }
+    
+    @classmethod
+    def load(cls, config_file=None, overrides=None):
+        """
+        Apply run-time configuration on top of the defaults
+        
+        Precedence (lowest first): defaults, JSON config file, environment
+        variables, explicit overrides (command line). Applied values are also
+        exported to the environment so spawned worker processes, which
+        import a fresh Config, resolve the same settings with Config.load().
+        
+        Args:
+            config_file: JSON file of {"SETTING": value} (defaults to $DOCEXTRACT_CONFIG)
+            overrides: Dict of {"SETTING": value}; strings are parsed like env values
+        
+        Raises:
+            ValueError: For unknown settings
+        """
+        values = {}
+        
+        config_file = config_file or os.environ.get(cls.CONFIG_FILE_ENV)
+        if config_file:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                values.update(json.load(f))
+        
+        for key, raw in os.environ.items():
+            if key.startswith(cls.ENV_PREFIX) and key != cls.CONFIG_FILE_ENV:
+                values[key[len(cls.ENV_PREFIX):]] = raw
+        
+        values.update(overrides or {})
+        
+        # Derived paths follow OUTPUT_FOLDER unless set explicitly
+        if 'OUTPUT_FOLDER' in values:
+            output_folder = cls._parse('OUTPUT_FOLDER', values['OUTPUT_FOLDER'])
+            for name, subpath in cls.OUTPUT_SUBPATHS.items():
+                values.setdefault(name, os.path.join(output_folder, subpath))
+        
+        for name, raw in values.items():
+            value = cls._parse(name, raw)
+            setattr(cls, name, value)
+            os.environ[cls.ENV_PREFIX + name] = value if isinstance(value, str) else json.dumps(
+                sorted(value) if isinstance(value, set) else value
+            )
+    
+    @classmethod
+    def _parse(cls, name, raw):
+        """Convert an override to the type of the setting's default"""
+        if not name.isupper() or not hasattr(cls, name):
+            raise ValueError(f"Unknown setting: {name}")
+        
+        default = getattr(cls, name)
+        if isinstance(raw, str) and not isinstance(default, str):
+            raw = json.loads(raw)
+        if isinstance(default, set) and isinstance(raw, list):
+            raw = set(raw)
+        return raw
     
     @staticmethod
     def get_output_filename():
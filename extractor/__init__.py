@@ -1,18 +1,14 @@
 # Extractor modules for different file types
+#
+# Extractor classes are loaded on first access (see registry.py), so importing
+# the package does not pull in pdfplumber, OpenCV, py7zr, rarfile, ...
 from .base_extractor import BaseExtractor
-from .pdf_extractor import PDFExtractor
-from .image_extractor import ImageExtractor
-from .docx_extractor import DOCXExtractor
-from .markdown_extractor import MarkdownExtractor
-from .zip_extractor import ZIPExtractor  # Fixed from ZipExtractor
-from .text_extractor import TextExtractor
-from .gzip_extractor import GZIPExtractor
-from .sevenzip_extractor import SevenZipExtractor
-from .tar_extractor import TARExtractor
-from .rar_extractor import RARExtractor
+from .file_source import FileSource
+from .registry import EXTRACTOR_MODULES, get_extractor_class, is_supported, load_class
 
 __all__ = [
     'BaseExtractor',
+    'FileSource',
     'PDFExtractor',
     'ImageExtractor',
     'DOCXExtractor',
@@ -22,5 +18,14 @@ __all__ = [
     'GZIPExtractor',
     'SevenZipExtractor',
     'TARExtractor',
-    'RARExtractor'
+    'RARExtractor',
+    'get_extractor_class',
+    'is_supported',
 ]
+
+
+def __getattr__(name):
+    """Import extractor classes lazily: `from extractor import PDFExtractor`"""
+    if name in EXTRACTOR_MODULES:
+        return load_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
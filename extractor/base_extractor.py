@@ -2,31 +2,66 @@
 # BASE EXTRACTOR - Foundation for all extractors
 # ============================================================================
 
+import io
 import os
+import codecs
 import hashlib
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+from utils.cancellation import current_token
+from utils.checksum import CHECKSUM_ERROR, checksum_field, checksums_enabled, resolve_algorithm
+from utils.timings import StageTimings
+from .file_source import FileSource, MAX_BYTES_PER_CHAR, SAMPLING_POLICIES
+
 class BaseExtractor:
     """
     Base class for all document extractors.
     Provides common functionality for metadata extraction, error handling, etc.
     """
     
-    def __init__(self, file_path: str):
+    # CPU-bound extractors hold the GIL and are run in worker processes
+    cpu_bound = False
+    
+    # Extractors driving native code that can hang or crash (codecs, nested
+    # PDFs/images) also run in supervised worker processes with time/memory limits
+    isolated = False
+    
+    # Extractors that produce a useful result from the start (and end) of a
+    # file; the others skip files over Config.MAX_FILE_SIZE_MB under any policy
+    partial_reads = False
+    
+    # Extractors that decode self.source.data; their small files are hashed
+    # from that buffer instead of being read a second time in the background
+    reads_source = False
+    
+    # Extractors whose results go to the extraction cache; cheap ones (plain
+    # text) re-extract faster than a cache lookup and store cost
+    cacheable = True
+    
+    def __init__(self, file_path: str, stat: Optional[os.stat_result] = None):
         """
         Initialize extractor with file path
         
         Args:
             file_path: Full path to file to extract
+            stat: Stat result already taken by the scanner, if any
         """
         self.file_path = Path(file_path)
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.timings = StageTimings()  # Per-stage durations, see stage()
+        self.source = FileSource(self.file_path, stat=stat, timings=self.timings)  # Bytes, stat and checksum, read once
+        self._base_metadata = None  # Built once, shared by every result dict
+        self.cancel_token = current_token()  # Token of the run this worker belongs to
+        self.truncated_fields: Dict[str, int] = {}  # Output field -> character cap it was cut to
+        self.partial_read: Optional[Dict[str, Any]] = None  # Like source.truncation, for content read another way
         
-        # Validate file exists
-        if not self.file_path.exists():
+        # Validate file exists (the stat is kept for metadata)
+        try:
+            self.source.stat
+        except OSError:
             raise FileNotFoundError(f"File not found: {file_path}")
     
     def extract(self) -> Dict[str, Any]:
@@ -38,33 +73,78 @@ class BaseExtractor:
         """
         raise NotImplementedError("Subclasses must implement extract()")
     
+    def stage(self, name: str, nbytes: int = 0):
+        """
+        Time a stage of the extraction for the 'timings' field
+        
+        Use as `with self.stage('ocr', self.source.size): ...`. Nested
+        stages are subtracted from the stage around them.
+        """
+        return self.timings.stage(name, nbytes)
+    
+    def attach_timings(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the 'timings' field to a result (if Config.RECORD_TIMINGS)"""
+        if self.timings.enabled and result is not None:
+            result['timings'] = self.timings.as_dict()
+        return result
+    
+    def check_cancelled(self):
+        """
+        Cancellation checkpoint for long-running extractors
+        
+        Call between pages, archive members, OCR passes, etc.
+        
+        Raises:
+            ExtractionCancelled: If the run was cancelled
+        """
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+    
     def get_base_metadata(self) -> Dict[str, Any]:
         """
-        Extract common file metadata
+        Extract common file metadata (computed once per extractor)
         
         Returns:
             Dictionary with file metadata
         """
+        if self._base_metadata is None:
+            self._base_metadata = self._build_base_metadata()
+        return dict(self._base_metadata)
+    
+    @staticmethod
+    def stat_metadata(file_path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        """
+        Common file metadata that needs only a stat result (no checksum)
+        
+        Args:
+            file_path: File path
+            stat: Its stat result
+        
+        Returns:
+            Dictionary with file metadata
+        """
+        return {
+            'file_name': file_path.name,
+            'file_path': str(file_path.absolute()),
+            'file_size_bytes': stat.st_size,
+            'file_extension': file_path.suffix.lower(),
+            'created_date': datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            'modified_date': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            'accessed_date': datetime.fromtimestamp(stat.st_atime).isoformat(),
+        }
+    
+    def _build_base_metadata(self) -> Dict[str, Any]:
+        """Stat (cached) and checksum the file"""
         try:
-            stat = self.file_path.stat()
-            
-            metadata = {
-                'file_name': self.file_path.name,
-                'file_path': str(self.file_path.absolute()),
-                'file_size_bytes': stat.st_size,
-                'file_extension': self.file_path.suffix.lower(),
-                'created_date': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'modified_date': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'accessed_date': datetime.fromtimestamp(stat.st_atime).isoformat(),
-            }
+            metadata = self.stat_metadata(self.file_path, self.source.stat)
             
-            # Add MD5 checksum if enabled
-            from config import Config
-            if Config.CALCULATE_CHECKSUMS:
-                metadata['md5_checksum'] = self.calculate_md5()
+            # Add checksum if enabled for this file type ('md5_checksum' by default);
+            # files over MAX_FILE_SIZE_MB are only sampled, so they are not hashed either
+            if checksums_enabled(self.file_path) and not self.source.too_large:
+                metadata[checksum_field()] = self.calculate_checksum()
             
             return metadata
-            
+        
         except Exception as e:
             self.logger.error(f"Error extracting metadata from {self.file_path}: {e}")
             return {
@@ -73,6 +153,22 @@ class BaseExtractor:
                 'metadata_error': str(e)
             }
     
+    def calculate_checksum(self, algorithm: Optional[str] = None) -> str:
+        """
+        Calculate checksum of file
+        
+        Args:
+            algorithm: Algorithm name (defaults to Config.CHECKSUM_ALGORITHM)
+        
+        Returns:
+            Hash as hex string
+        """
+        try:
+            return self.source.checksum(algorithm)
+        except Exception as e:
+            self.logger.error(f"Error calculating checksum for {self.file_path}: {e}")
+            return CHECKSUM_ERROR
+    
     def calculate_md5(self) -> str:
         """
         Calculate MD5 checksum of file
@@ -80,48 +176,95 @@ class BaseExtractor:
         Returns:
             MD5 hash as hex string
         """
+        return self.calculate_checksum('md5')
+    
+    def cache_settings(self) -> Dict[str, Any]:
+        """
+        Settings that change this extractor's output
+        
+        Subclasses extend this so cached content is invalidated when
+        relevant configuration (OCR language, PDF options, ...) changes.
+        
+        Returns:
+            JSON-serializable dictionary of settings
+        """
+        from config import Config
+        return {
+            'auto_detect_encoding': Config.AUTO_DETECT_ENCODING,
+            'fallback_encodings': Config.FALLBACK_ENCODINGS,
+            'max_file_size_mb': Config.MAX_FILE_SIZE_MB,
+            'large_file_policy': Config.LARGE_FILE_POLICY,
+            'large_file_sample_mb': Config.LARGE_FILE_SAMPLE_MB,
+            'max_text_chars': Config.MAX_TEXT_CHARS,
+            'max_member_chars': Config.MAX_MEMBER_CHARS,
+            'max_binary_hex_bytes': Config.MAX_BINARY_HEX_BYTES,
+        }
+    
+    def cache_key(self) -> Optional[str]:
+        """
+        Build the extraction cache key for this file
+        
+        The key uses the stat signature (path, inode, size, mtime), like
+        incremental runs, not the checksum: looking it up reads nothing, so
+        on a miss the checksum is still hashed alongside extraction
+        (Config.CHECKSUM_CONCURRENT), and a hit carries the stored checksum.
+        
+        Returns:
+            SHA-256 hex digest of stat signature, extractor name and settings,
+            or None if the file could not be stat'ed or is over MAX_FILE_SIZE_MB
+        """
+        import json
+        from config import Config
+        
         try:
-            md5_hash = hashlib.md5()
-            with open(self.file_path, 'rb') as f:
-                # Read in chunks for memory efficiency
-                for chunk in iter(lambda: f.read(4096), b''):
-                    md5_hash.update(chunk)
-            return md5_hash.hexdigest()
-        except Exception as e:
-            self.logger.error(f"Error calculating MD5 for {self.file_path}: {e}")
-            return "error_calculating_checksum"
+            stat = self.source.stat
+        except OSError:
+            return None
+        # Sampled results of oversized files are not worth keeping
+        if self.source.too_large:
+            return None
+        
+        key_data = json.dumps({
+            'path': str(self.file_path.absolute()),
+            'signature': [stat.st_ino, stat.st_size, stat.st_mtime_ns],
+            'checksum_algorithm': resolve_algorithm(),
+            'extractor': self.__class__.__name__,
+            'settings': self.cache_settings(),
+            'version': Config.CACHE_VERSION
+        }, sort_keys=True)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
     
-    def read_file_content(self, encoding: Optional[str] = None) -> str:
+    def read_file_content(self, encoding: Optional[str] = None, field: str = 'text',
+                          max_chars: Optional[int] = None) -> str:
         """
         Read file content with encoding detection
         
         Args:
             encoding: Specific encoding to use, or None for auto-detect
-            
+            field: Output field the content goes to, for 'truncated'
+            max_chars: Character cap (defaults to Config.MAX_TEXT_CHARS, 0 = none);
+                       only as many bytes as the cap can need are read
+        
         Returns:
             File content as string
         """
         from config import Config
+        max_chars = Config.MAX_TEXT_CHARS if max_chars is None else max_chars
+        if max_chars:
+            self.source.limit(max_chars * MAX_BYTES_PER_CHAR)
         
+        # Detection and every decode attempt work on the same buffer
         if encoding:
             encodings_to_try = [encoding]
-        elif Config.AUTO_DETECT_ENCODING:
-            # Try to detect encoding
-            import chardet
-            with open(self.file_path, 'rb') as f:
-                raw_data = f.read()
-                detected = chardet.detect(raw_data)
-                encodings_to_try = [detected['encoding']] + Config.FALLBACK_ENCODINGS
         else:
-            encodings_to_try = Config.FALLBACK_ENCODINGS
+            encodings_to_try = self.source.candidate_encodings()
         
         # Try each encoding until one works
         for enc in encodings_to_try:
             try:
-                with open(self.file_path, 'r', encoding=enc) as f:
-                    content = f.read()
+                content = self.source.decode(enc)
                 self.logger.debug(f"Successfully read {self.file_path} with encoding: {enc}")
-                return content
+                return self.cap_text(field, content, max_chars)
             except (UnicodeDecodeError, UnicodeError):
                 continue
             except Exception as e:
@@ -130,8 +273,80 @@ class BaseExtractor:
         
         # If all encodings fail, read as binary and return hex
         self.logger.warning(f"Could not decode {self.file_path} with any encoding, reading as binary")
-        with open(self.file_path, 'rb') as f:
-            return f"<binary_content>{f.read().hex()}</binary_content>"
+        max_bytes = Config.MAX_BINARY_HEX_BYTES
+        if max_bytes and len(self.source.data) > max_bytes:
+            self.truncated_fields[field] = max_bytes * 2  # Two hex digits per byte
+        return f"<binary_content>{self.source.hex(max_bytes)}</binary_content>"
+    
+    def cap_text(self, field: str, text: str, max_chars: int) -> str:
+        """
+        Cut text to max_chars characters, noting the field in 'truncated'
+        
+        Args:
+            field: Output field name (e.g. 'text', 'files[].content')
+            text: Text to cap
+            max_chars: Character cap (0 = none)
+        
+        Returns:
+            The text, at most max_chars long
+        """
+        if max_chars and len(text) > max_chars:
+            self.truncated_fields[field] = max_chars
+            return text[:max_chars]
+        return text
+    
+    def read_text_capped(self, stream, field: str = 'files[].content',
+                         max_chars: Optional[int] = None) -> Tuple[str, bool]:
+        """
+        Read a stream (e.g. an archive member) as text, capped
+        
+        Binary streams are decoded as UTF-8 and only max_chars * 4 bytes are
+        read; text streams read max_chars characters. A huge member is never
+        loaded whole.
+        
+        Args:
+            stream: File-like object (binary, or text mode with its own decoding)
+            field: Output field name for 'truncated'
+            max_chars: Character cap (defaults to Config.MAX_MEMBER_CHARS, 0 = none)
+        
+        Returns:
+            (text, whether it was cut)
+        """
+        from config import Config
+        max_chars = Config.MAX_MEMBER_CHARS if max_chars is None else max_chars
+        text_mode = isinstance(stream, io.TextIOBase)
+        if not max_chars:
+            data = stream.read()
+            return (data if text_mode else data.decode('utf-8', errors='replace')), False
+        
+        if text_mode:
+            text = stream.read(max_chars + 1)
+            more = False
+        else:
+            max_bytes = max_chars * MAX_BYTES_PER_CHAR
+            data = stream.read(max_bytes + 1)
+            more = len(data) > max_bytes
+            text = codecs.getincrementaldecoder('utf-8')(errors='replace').decode(data[:max_bytes], final=not more)
+        if more or len(text) > max_chars:
+            self.truncated_fields[field] = max_chars
+            return text[:max_chars], True
+        return text, False
+    
+    def truncation(self) -> Optional[Dict[str, Any]]:
+        """
+        What was left out of the result, for its 'truncated' field
+        
+        Returns:
+            {'read': {'policy', 'bytes_read'}} if only part of the file was
+            read and/or {'fields': {field: cap}} for capped fields, or None
+        """
+        truncated = {}
+        partial_read = self.partial_read or self.source.truncation
+        if partial_read:
+            truncated['read'] = dict(partial_read)
+        if self.truncated_fields:
+            truncated['fields'] = dict(self.truncated_fields)
+        return truncated or None
     
     def create_result_dict(self, content: Any, status: str = "success", 
                           error_message: Optional[str] = None) -> Dict[str, Any]:
@@ -142,7 +357,7 @@ class BaseExtractor:
             content: Extracted content
             status: Extraction status (success/error/partial)
             error_message: Error message if applicable
-            
+        
         Returns:
             Standardized result dictionary
         """
@@ -159,6 +374,10 @@ class BaseExtractor:
         if error_message:
             result['error_message'] = error_message
         
+        truncated = self.truncation()
+        if truncated:
+            result['truncated'] = truncated
+        
         return result
     
     def safe_extract(self) -> Dict[str, Any]:
@@ -168,15 +387,43 @@ class BaseExtractor:
         Returns:
             Result dictionary with content or error
         """
+        self.check_cancelled()
+        
+        from config import Config
+        if self.source.too_large and not (self.partial_reads and Config.LARGE_FILE_POLICY in SAMPLING_POLICIES):
+            result = self.create_result_dict(
+                content=None,
+                status='skipped',
+                error_message=f"Larger than MAX_FILE_SIZE_MB ({Config.MAX_FILE_SIZE_MB} MB)"
+            )
+            self.close()
+            return result
+        
+        # Overlap hashing with extraction instead of hashing afterwards, unless
+        # the extractor reads the whole file into the buffer the hash can reuse
+        if Config.CHECKSUM_CONCURRENT and checksums_enabled(self.file_path) and not self.source.too_large and (
+                not self.reads_source or self.source.size >= Config.MMAP_THRESHOLD_MB * 1024 * 1024):
+            self.source.start_checksum()
+        
         try:
-            return self.extract()
+            # Time inside extract() not claimed by a named stage
+            with self.stage('extract'):
+                result = self.extract()
         except Exception as e:
             self.logger.error(f"Extraction failed for {self.file_path}: {e}", exc_info=True)
-            return self.create_result_dict(
+            result = self.create_result_dict(
                 content=None,
                 status="error",
                 error_message=str(e)
             )
+        finally:
+            self.close()
+        
+        return result
+    
+    def close(self):
+        """Release the file buffer (metadata and checksum stay cached)"""
+        self.source.close()
 
 
 # ============================================================================
@@ -40,7 +40,8 @@ class DOCXExtractor(BaseExtractor):
         try:
             from docx import Document
             
-            doc = Document(self.file_path)
+            with self.stage('docx_parse', self.source.size):
+                doc = Document(self.file_path)
             
             # Extract all components
             content = {
@@ -115,18 +116,19 @@ class DOCXExtractor(BaseExtractor):
     def _extract_tables(self, doc) -> List[Dict]:
         """Extract all tables"""
         tables = []
-        for table_idx, table in enumerate(doc.tables):
-            table_data = []
-            for row in table.rows:
-                row_data = [cell.text for cell in row.cells]
-                table_data.append(row_data)
-            
-            tables.append({
-                'table_index': table_idx + 1,
-                'rows': len(table.rows),
-                'columns': len(table.columns),
-                'data': table_data
-            })
+        with self.stage('docx_tables'):
+            for table_idx, table in enumerate(doc.tables):
+                table_data = []
+                for row in table.rows:
+                    row_data = [cell.text for cell in row.cells]
+                    table_data.append(row_data)
+                
+                tables.append({
+                    'table_index': table_idx + 1,
+                    'rows': len(table.rows),
+                    'columns': len(table.columns),
+                    'data': table_data
+                })
         return tables
     
     def _extract_styles(self, doc) -> List[str]:
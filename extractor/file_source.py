@@ -0,0 +1,300 @@
+# ============================================================================
+# FILE SOURCE - Read a file once, share the bytes across extraction steps
+# ============================================================================
+
+import os
+import mmap
+import codecs
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from utils.checksum import resolve_algorithm, checksum_bytes, checksum_file, submit_checksum
+from utils.timings import StageTimings
+
+# LARGE_FILE_POLICY values that extract part of a large file instead of skipping it
+SAMPLING_POLICIES = ('head', 'head_tail')
+
+# Most bytes one character takes in any supported encoding (UTF-8, UTF-32)
+MAX_BYTES_PER_CHAR = 4
+
+# Put between head and tail where the middle of a file was not read
+OMISSION_MARKER = "\n\n[... {omitted} bytes not read ...]\n\n"
+
+
+def is_too_large(size: int) -> bool:
+    """Whether a file of this size is over Config.MAX_FILE_SIZE_MB"""
+    return bool(Config.MAX_FILE_SIZE_MB) and size > Config.MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+class FileSource:
+    """
+    The bytes and stat of one file, loaded at most once.
+    
+    Checksum, encoding detection and decoding all work on the same buffer
+    instead of re-opening the file each time. Small files are read into
+    memory in one call; files above Config.MMAP_THRESHOLD_MB are memory
+    mapped, so the OS pages them in once and nothing is copied up front.
+    The stat result is cached for the life of the extractor.
+    
+    Only part of the file is read when it is over Config.MAX_FILE_SIZE_MB
+    under a sampling LARGE_FILE_POLICY, or when the caller set a byte
+    limit; 'truncation' then says what was read.
+    """
+    
+    def __init__(self, file_path: Path, stat: Optional[os.stat_result] = None,
+                 timings: Optional[StageTimings] = None):
+        """
+        Initialize source (nothing is read until needed)
+        
+        Args:
+            file_path: File to read
+            stat: Stat result already known from scanning, if any
+            timings: Records the stat, read, checksum, encoding_detection
+                     and decode stages
+        """
+        self.file_path = Path(file_path)
+        self.timings = timings or StageTimings(enabled=False)
+        self._stat = stat
+        self._data = None
+        self._mmap = None
+        self._checksums: Dict[str, str] = {}
+        self._pending_checksums: Dict[str, Future] = {}
+        self._encodings = None
+        self._tail = None  # End of the file under the 'head_tail' policy
+        self._max_bytes = None  # See limit()
+        self.truncation = None  # {'policy', 'bytes_read'} once only part was read
+    
+    @property
+    def stat(self) -> os.stat_result:
+        """Cached stat result"""
+        if self._stat is None:
+            with self.timings.stage('stat'):
+                self._stat = os.stat(self.file_path)
+        return self._stat
+    
+    @property
+    def size(self) -> int:
+        """File size in bytes"""
+        return self.stat.st_size
+    
+    @property
+    def too_large(self) -> bool:
+        """Whether the file is over Config.MAX_FILE_SIZE_MB"""
+        return is_too_large(self.size)
+    
+    def limit(self, max_bytes: Optional[int]):
+        """
+        Read at most max_bytes from the start of the file
+        
+        Only takes effect if the content has not been read yet.
+        
+        Args:
+            max_bytes: Byte limit, or None for no limit
+        """
+        self._max_bytes = max_bytes
+    
+    def _window(self) -> Optional[Tuple[int, int]]:
+        """
+        Bytes to read from the start and from the end of the file
+        
+        Returns:
+            (head, tail) byte counts, or None to read the whole file
+        """
+        size = self.size
+        budget = self._max_bytes
+        policy = 'head'
+        if Config.LARGE_FILE_POLICY in SAMPLING_POLICIES and self.too_large:
+            sample = int(Config.LARGE_FILE_SAMPLE_MB * 1024 * 1024)
+            budget = sample if budget is None else min(budget, sample)
+            policy = Config.LARGE_FILE_POLICY
+        if budget is None or budget >= size:
+            return None
+        if policy == 'head':
+            return budget, 0
+        
+        # The tail starts on a multiple of 4 bytes, so UTF-16/32 stay aligned
+        tail_start = size - budget // 2
+        tail_start += -tail_start % MAX_BYTES_PER_CHAR
+        return budget - budget // 2, size - tail_start
+    
+    @property
+    def data(self):
+        """File content as a bytes-like object (bytes or mmap; only the head if truncated)"""
+        if self._data is None:
+            window = self._window()
+            if window is not None:
+                self._read_window(*window)
+                return self._data
+            with self.timings.stage('read', self.size), open(self.file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= Config.MMAP_THRESHOLD_MB * 1024 * 1024:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._data = self._mmap
+                else:
+                    self._data = f.read()
+        return self._data
+    
+    def _read_window(self, head: int, tail: int):
+        """Read only the head (and tail) of the file"""
+        with self.timings.stage('read', head + tail), open(self.file_path, 'rb') as f:
+            self._data = f.read(head)
+            if tail:
+                f.seek(-tail, os.SEEK_END)
+                self._tail = f.read(tail)
+        self.truncation = {
+            'policy': 'head_tail' if tail else 'head',
+            'bytes_read': head + tail,
+        }
+    
+    def checksum(self, algorithm: Optional[str] = None) -> str:
+        """
+        Checksum of the content (computed once per algorithm)
+        
+        Small files are hashed from the shared buffer that decoding reuses;
+        large ones are streamed, unless the buffer is already mapped. A
+        truncated buffer is never hashed: the checksum covers the whole file.
+        
+        Args:
+            algorithm: Algorithm name (defaults to Config.CHECKSUM_ALGORITHM)
+        """
+        algorithm = resolve_algorithm(algorithm)
+        if algorithm not in self._checksums:
+            pending = self._pending_checksums.pop(algorithm, None)
+            # For a background hash, only the wait for its result is timed
+            with self.timings.stage('checksum', self.size):
+                if pending is not None:
+                    value = pending.result()
+                elif self.truncation is None and self._window() is None and (
+                        self._data is not None or self.size < Config.MMAP_THRESHOLD_MB * 1024 * 1024):
+                    value = checksum_bytes(self.data, algorithm)
+                else:
+                    value = checksum_file(self.file_path, algorithm)
+            self._checksums[algorithm] = value
+        return self._checksums[algorithm]
+    
+    def set_checksum(self, value: str, algorithm: Optional[str] = None):
+        """Use a checksum known from elsewhere (the extraction cache) instead of hashing"""
+        self._checksums[resolve_algorithm(algorithm)] = value
+    
+    def start_checksum(self, algorithm: Optional[str] = None):
+        """Start hashing in the background; checksum() picks up the result"""
+        algorithm = resolve_algorithm(algorithm)
+        if algorithm not in self._checksums and algorithm not in self._pending_checksums:
+            self._pending_checksums[algorithm] = submit_checksum(self.file_path, algorithm)
+    
+    def md5(self) -> str:
+        """MD5 hex digest of the content"""
+        return self.checksum('md5')
+    
+    def candidate_encodings(self) -> List[str]:
+        """
+        Encodings to try, best guess first
+        
+        chardet looks at most Config.ENCODING_DETECTION_BYTES from the start
+        of the file; its confidence does not improve on huge inputs. Plain
+        ASCII and UTF-8 samples without a BOM are recognized directly, giving
+        the answer chardet would, without loading it (its import and model
+        setup dominate the run time of small text-only runs).
+        """
+        if self._encodings is None:
+            encodings = []
+            if Config.AUTO_DETECT_ENCODING:
+                sample = bytes(self.data[:Config.ENCODING_DETECTION_BYTES])
+                with self.timings.stage('encoding_detection', len(sample)):
+                    detected = _detect_utf8(sample)
+                    if detected is None:
+                        import chardet
+                        detected = chardet.detect(sample)['encoding']
+                if detected:
+                    encodings.append(detected)
+            encodings.extend(e for e in Config.FALLBACK_ENCODINGS if e not in encodings)
+            self._encodings = encodings
+        return self._encodings
+    
+    def decode(self, encoding: str) -> str:
+        """
+        Decode the content with universal newlines, like open(..., 'r')
+        
+        If only part of the file was read, a character cut at the end of the
+        head or the start of the tail is dropped, and the tail follows the
+        head after an OMISSION_MARKER.
+        
+        Raises:
+            UnicodeDecodeError: If the content is not valid in this encoding
+            LookupError: If the encoding is unknown
+        """
+        data = self.data
+        tail = self._tail
+        with self.timings.stage('decode', len(data) + len(tail or b'')):
+            if self.truncation is None:
+                text = str(data, encoding)
+            else:
+                text = codecs.getincrementaldecoder(encoding)().decode(data, final=False)
+                if tail is not None:
+                    omitted = self.size - len(data) - len(tail)
+                    text += OMISSION_MARKER.format(omitted=omitted) + _decode_tail(data, tail, encoding)
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def hex(self, max_bytes: Optional[int] = None) -> str:
+        """
+        Content as a hex string (fallback for undecodable files)
+        
+        Args:
+            max_bytes: Only dump this many bytes from the start (None = all that was read)
+        """
+        data = memoryview(self.data)
+        return (data[:max_bytes] if max_bytes else data).hex()
+    
+    def close(self):
+        """Release the buffer (the cached stat and checksums stay valid)"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._data = None
+        self._tail = None
+
+
+# Byte order marks chardet reports as their own encodings (UTF-8-SIG, UTF-16, ...)
+_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+
+def _detect_utf8(sample: bytes) -> Optional[str]:
+    """'ascii' or 'utf-8' if the sample is valid as such, else None (ask chardet)"""
+    if sample.startswith(_BOMS) or b'\x00' in sample:  # BOM, or likely BOM-less UTF-16
+        return None
+    if sample.isascii():
+        return 'ascii' if sample else 'utf-8'
+    try:
+        # Incremental, so a multi-byte character cut by the sample end is fine
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return None
+    return 'utf-8'
+
+
+def _decode_tail(head: bytes, tail: bytes, encoding: str) -> str:
+    """
+    Decode the end of a file, which may start inside a character
+    
+    Raises:
+        UnicodeDecodeError: If no start offset gives valid text in this encoding
+    """
+    # The byte order mark is only at the start of the file
+    name = codecs.lookup(encoding).name
+    if name in ('utf-16', 'utf-32'):
+        big_endian = head.startswith((codecs.BOM_UTF16_BE, codecs.BOM_UTF32_BE))
+        encoding = f"{name}-be" if big_endian else f"{name}-le"
+    elif name == 'utf-8-sig':
+        encoding = 'utf-8'
+    
+    error = None
+    for offset in range(MAX_BYTES_PER_CHAR):
+        try:
+            return str(tail[offset:], encoding)
+        except UnicodeDecodeError as e:
+            error = error or e
+    raise error
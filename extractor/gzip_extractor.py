@@ -3,7 +3,10 @@
 # ============================================================================
 
 from .base_extractor import BaseExtractor
-from typing import Dict, Any, List
+from .file_source import MAX_BYTES_PER_CHAR, OMISSION_MARKER
+from config import Config
+from typing import Dict, Any, List, Optional, Tuple
+import codecs
 import logging
 import gzip
 import tarfile
@@ -14,6 +17,18 @@ from pathlib import Path
 class GZIPExtractor(BaseExtractor):
     """Extract content from GZIP and TAR.GZ files"""
     
+    # Decompressed data is streamed in chunks of this size when the middle is skipped
+    CHUNK_BYTES = 1024 * 1024
+    
+    @property
+    def partial_reads(self) -> bool:
+        """A single .gz can be cut short; a .tar.gz is skipped when too large"""
+        return not self._is_tar_gz()
+    
+    def _is_tar_gz(self) -> bool:
+        """Whether the file is a tar.gz/tgz archive"""
+        return str(self.file_path).lower().endswith(('.tar.gz', '.tgz'))
+    
     def extract(self) -> Dict[str, Any]:
         """
         Extract GZIP compressed files
@@ -22,10 +37,8 @@ class GZIPExtractor(BaseExtractor):
             Dictionary with extracted content
         """
         try:
-            file_path_lower = str(self.file_path).lower()
-            
             # Check if it's a tar.gz/tgz file
-            if file_path_lower.endswith(('.tar.gz', '.tgz')):
+            if self._is_tar_gz():
                 return self._extract_tar_gz()
             else:
                 return self._extract_gzip()
@@ -42,27 +55,36 @@ class GZIPExtractor(BaseExtractor):
         """Extract single .gz file"""
         try:
             with gzip.open(self.file_path, 'rb') as gz_file:
-                # Read decompressed content
-                decompressed_data = gz_file.read()
+                # Read decompressed content (only as much as the caps keep)
+                with self.stage('archive_unpack', self.source.size):
+                    decompressed_data, tail, size_decompressed = self._read_decompressed(gz_file)
+                
+                # None if reading stopped before the end
+                compression_ratio = (f"{self.source.size / size_decompressed:.2%}"
+                                     if size_decompressed else None)
                 
                 # Try to decode as text
                 try:
-                    text_content = decompressed_data.decode('utf-8', errors='replace')
+                    text_content = codecs.getincrementaldecoder('utf-8')(errors='replace').decode(
+                        decompressed_data, final=self.partial_read is None)
+                    if tail is not None:
+                        omitted = size_decompressed - len(decompressed_data) - len(tail)
+                        text_content += OMISSION_MARKER.format(omitted=omitted) + tail.decode('utf-8', errors='replace')
                     content = {
                         'type': 'gzip_text',
-                        'text': text_content,
-                        'size_compressed': self.file_path.stat().st_size,
-                        'size_decompressed': len(decompressed_data),
-                        'compression_ratio': f"{self.file_path.stat().st_size / len(decompressed_data):.2%}"
+                        'text': self.cap_text('text', text_content, Config.MAX_TEXT_CHARS),
+                        'size_compressed': self.source.size,
+                        'size_decompressed': size_decompressed,
+                        'compression_ratio': compression_ratio
                     }
                 except:
                     # Binary content
                     content = {
                         'type': 'gzip_binary',
                         'note': 'Binary content - not text',
-                        'size_compressed': self.file_path.stat().st_size,
-                        'size_decompressed': len(decompressed_data),
-                        'compression_ratio': f"{self.file_path.stat().st_size / len(decompressed_data):.2%}"
+                        'size_compressed': self.source.size,
+                        'size_decompressed': size_decompressed,
+                        'compression_ratio': compression_ratio
                     }
             
             return self.create_result_dict(content)
@@ -75,6 +97,57 @@ class GZIPExtractor(BaseExtractor):
                 error_message=str(e)
             )
     
+    def _read_decompressed(self, gz_file) -> Tuple[bytes, Optional[bytes], Optional[int]]:
+        """
+        Read the decompressed content, keeping only what the limits allow
+        
+        Config.MAX_TEXT_CHARS bounds the head; a file over MAX_FILE_SIZE_MB
+        keeps LARGE_FILE_SAMPLE_MB, split between head and tail under the
+        'head_tail' policy. Sets partial_read if anything was left out.
+        
+        Returns:
+            (head, tail, decompressed size); tail is None unless the middle
+            was skipped, and the size is None if reading stopped early
+        """
+        head_limit = Config.MAX_TEXT_CHARS * MAX_BYTES_PER_CHAR or None
+        tail_limit = 0
+        if self.source.too_large:  # Only extracted at all under a sampling policy
+            sample = int(Config.LARGE_FILE_SAMPLE_MB * 1024 * 1024)
+            if Config.LARGE_FILE_POLICY == 'head_tail':
+                tail_limit = sample // 2
+                sample -= tail_limit
+            head_limit = sample if head_limit is None else min(head_limit, sample)
+        
+        if head_limit is None:
+            data = gz_file.read()
+            return data, None, len(data)
+        
+        head = gz_file.read(head_limit)
+        if not tail_limit:
+            if not gz_file.read(1):
+                return head, None, len(head)
+            self.partial_read = {'policy': 'head', 'bytes_read': len(head)}
+            return head, None, None
+        
+        # Stream the rest, keeping only its last tail_limit bytes
+        size = len(head)
+        tail = bytearray()
+        while True:
+            self.check_cancelled()
+            chunk = gz_file.read(self.CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            tail += chunk
+            if len(tail) > 2 * tail_limit:
+                del tail[:-tail_limit]
+        
+        if size - len(head) <= tail_limit:
+            return head + bytes(tail), None, size
+        del tail[:-tail_limit]
+        self.partial_read = {'policy': 'head_tail', 'bytes_read': len(head) + len(tail)}
+        return head, bytes(tail), size
+    
     def _extract_tar_gz(self) -> Dict[str, Any]:
         """Extract tar.gz archive"""
         try:
@@ -84,21 +157,24 @@ class GZIPExtractor(BaseExtractor):
                 extracted_files = []
                 for member in members:
                     if member.isfile():
+                        self.check_cancelled()
                         try:
                             # Extract file content
                             file_obj = tar.extractfile(member)
                             if file_obj:
-                                file_content = file_obj.read()
+                                # Decode as UTF-8, reading at most Config.MAX_MEMBER_CHARS characters
+                                with self.stage('archive_unpack', member.size):
+                                    text_content, cut = self.read_text_capped(file_obj)
                                 
-                                # Try to decode as text
                                 try:
-                                    text_content = file_content.decode('utf-8', errors='replace')
                                     extracted_files.append({
                                         'filename': member.name,
                                         'size': member.size,
                                         'type': 'text',
                                         'content': text_content
                                     })
+                                    if cut:
+                                        extracted_files[-1]['truncated'] = True
                                 except:
                                     extracted_files.append({
                                         'filename': member.name,
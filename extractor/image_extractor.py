@@ -10,6 +10,8 @@ import logging
 class ImageExtractor(BaseExtractor):
     """Extract text from images using OCR"""
     
+    cpu_bound = True
+    
     def extract(self) -> Dict[str, Any]:
         """
         Extract text from image using Tesseract OCR
@@ -42,7 +44,9 @@ class ImageExtractor(BaseExtractor):
             pytesseract.pytesseract.tesseract_cmd = Config.TESSERACT_PATH
             
             # Load image
-            image = Image.open(self.file_path)
+            with self.stage('image_decode', self.source.size):
+                image = Image.open(self.file_path)
+                image.load()
             
             # Get image metadata
             image_metadata = {
@@ -54,25 +58,31 @@ class ImageExtractor(BaseExtractor):
             }
             
             # Enhance image if configured
+            self.check_cancelled()
             if Config.OCR_ENHANCE_IMAGES:
-                # Convert PIL to OpenCV format
-                img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-                
-                # Preprocess for better OCR
-                img_cv = self._preprocess_image(img_cv)
-                
-                # Convert back to PIL
-                image = Image.fromarray(cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB))
+                with self.stage('image_preprocess'):
+                    # Convert PIL to OpenCV format
+                    img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+                    
+                    # Preprocess for better OCR
+                    img_cv = self._preprocess_image(img_cv)
+                    
+                    # Convert back to PIL
+                    image = Image.fromarray(cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB))
             
             # Perform OCR
-            text = pytesseract.image_to_string(
-                image,
-                lang=Config.OCR_LANGUAGE,
-                config=Config.OCR_CONFIG
-            )
+            self.check_cancelled()
+            with self.stage('ocr'):
+                text = pytesseract.image_to_string(
+                    image,
+                    lang=Config.OCR_LANGUAGE,
+                    config=Config.OCR_CONFIG
+                )
             
             # Get OCR confidence data
-            ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+            self.check_cancelled()
+            with self.stage('ocr'):
+                ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
             
             # Calculate average confidence
             confidences = [int(conf) for conf in ocr_data['conf'] if conf != '-1']
@@ -103,6 +113,16 @@ class ImageExtractor(BaseExtractor):
                 error_message=str(e)
             )
     
+    def cache_settings(self) -> Dict[str, Any]:
+        """OCR settings that affect the extracted text"""
+        from config import Config
+        return {
+            **super().cache_settings(),
+            'ocr_language': Config.OCR_LANGUAGE,
+            'ocr_config': Config.OCR_CONFIG,
+            'ocr_enhance_images': Config.OCR_ENHANCE_IMAGES,
+        }
+    
     def _preprocess_image(self, img):
         """
         Preprocess image for better OCR results
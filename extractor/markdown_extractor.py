@@ -9,6 +9,9 @@ import logging
 class MarkdownExtractor(BaseExtractor):
     """Extract and parse Markdown files"""
     
+    cpu_bound = True
+    reads_source = True
+    
     def extract(self) -> Dict[str, Any]:
         """
         Extract Markdown content with frontmatter and structure
@@ -21,17 +24,18 @@ class MarkdownExtractor(BaseExtractor):
             import frontmatter
             
             # Read file
-            raw_content = self.read_file_content()
-            
-            # Parse frontmatter (YAML header)
-            post = frontmatter.loads(raw_content)
+            raw_content = self.read_file_content(field='raw_markdown')
             
-            # Convert markdown to HTML
-            md = markdown.Markdown(extensions=[
-                'meta', 'tables', 'fenced_code', 'codehilite',
-                'toc', 'nl2br', 'sane_lists'
-            ])
-            html_content = md.convert(post.content)
+            with self.stage('markdown_render', len(raw_content)):
+                # Parse frontmatter (YAML header)
+                post = frontmatter.loads(raw_content)
+                
+                # Convert markdown to HTML
+                md = markdown.Markdown(extensions=[
+                    'meta', 'tables', 'fenced_code', 'codehilite',
+                    'toc', 'nl2br', 'sane_lists'
+                ])
+                html_content = md.convert(post.content)
             
             # Extract structure (headings)
             headings = self._extract_headings(post.content)
@@ -58,14 +62,14 @@ class MarkdownExtractor(BaseExtractor):
             # Fallback to plain text
             return self.create_result_dict(
                 content={
-                    'raw_markdown': self.read_file_content(),
+                    'raw_markdown': self.read_file_content(field='raw_markdown'),
                     'extraction_method': 'plain_text_fallback'
                 }
             )
         except Exception as e:
             self.logger.error(f"Markdown extraction failed: {e}")
             return self.create_result_dict(
-                content={'error': str(e), 'raw_text': self.read_file_content()},
+                content={'error': str(e), 'raw_text': self.read_file_content(field='raw_text')},
                 status='partial',
                 error_message=str(e)
             )
@@ -9,6 +9,8 @@ import logging
 class PDFExtractor(BaseExtractor):
     """Extract content from PDF files with 100% accuracy"""
     
+    cpu_bound = True
+    
     def extract(self) -> Dict[str, Any]:
         """
         Extract all content from PDF with AI training optimizations
@@ -21,13 +23,15 @@ class PDFExtractor(BaseExtractor):
             import pdfplumber
             
             # Log for large files
-            file_size_mb = self.file_path.stat().st_size / (1024 * 1024)
+            file_size_mb = self.source.size / (1024 * 1024)
             if file_size_mb > 10:
                 self.logger.info(f"Processing large PDF: {file_size_mb:.2f} MB")
             
             # Extract with both libraries for complete coverage
-            pypdf_content = self._extract_with_pypdf2()
-            pdfplumber_content = self._extract_with_pdfplumber()
+            with self.stage('pdf_text', self.source.size):
+                pypdf_content = self._extract_with_pypdf2()
+            with self.stage('pdf_layout', self.source.size):
+                pdfplumber_content = self._extract_with_pdfplumber()
             
             # Combine results for best AI training data
             content = {
@@ -52,6 +56,16 @@ class PDFExtractor(BaseExtractor):
                 error_message=str(e)
             )
     
+    def cache_settings(self) -> Dict[str, Any]:
+        """PDF options that affect the extracted content"""
+        from config import Config
+        return {
+            **super().cache_settings(),
+            'pdf_extract_images': Config.PDF_EXTRACT_IMAGES,
+            'pdf_extract_tables': Config.PDF_EXTRACT_TABLES,
+            'pdf_preserve_layout': Config.PDF_PRESERVE_LAYOUT,
+        }
+    
     def _extract_with_pypdf2(self) -> Dict[str, Any]:
         """Extract using PyPDF2"""
         import PyPDF2
@@ -77,6 +91,7 @@ class PDFExtractor(BaseExtractor):
                 # Extract text from all pages
                 full_text = []
                 for page_num, page in enumerate(reader.pages, 1):
+                    self.check_cancelled()
                     try:
                         page_text = page.extract_text()
                         if page_text:
@@ -105,6 +120,7 @@ class PDFExtractor(BaseExtractor):
                 all_tables = []
                 
                 for page_num, page in enumerate(pdf.pages, 1):
+                    self.check_cancelled()
                     try:
                         # Extract text
                         page_text = page.extract_text()
@@ -112,7 +128,8 @@ class PDFExtractor(BaseExtractor):
                             full_text.append(f"=== Page {page_num} ===\n{page_text}")
                         
                         # Extract tables
-                        tables = page.extract_tables()
+                        with self.stage('pdf_tables'):
+                            tables = page.extract_tables()
                         if tables:
                             for table_idx, table in enumerate(tables, 1):
                                 all_tables.append({
@@ -5,13 +5,14 @@
 from .base_extractor import BaseExtractor
 from typing import Dict, Any, List
 import logging
-import rarfile
 import tempfile
 from pathlib import Path
 
 class RARExtractor(BaseExtractor):
     """Extract content from RAR archive files"""
     
+    isolated = True  # Drives the external unrar tool
+    
     def extract(self) -> Dict[str, Any]:
         """
         Extract RAR archive files
@@ -20,6 +21,8 @@ class RARExtractor(BaseExtractor):
             Dictionary with extracted content
         """
         try:
+            import rarfile
+            
             with rarfile.RarFile(self.file_path, 'r') as rar:
                 # Get file list
                 file_list = rar.namelist()
@@ -28,18 +31,20 @@ class RARExtractor(BaseExtractor):
                 
                 # Extract to temp directory
                 with tempfile.TemporaryDirectory() as temp_dir:
-                    rar.extractall(path=temp_dir)
+                    with self.stage('archive_unpack', self.source.size):
+                        rar.extractall(path=temp_dir)
                     
                     # Read extracted files
                     for filename in file_list:
                         file_path = Path(temp_dir) / filename
                         
                         if file_path.is_file():
+                            self.check_cancelled()
                             try:
-                                # Try to read as text
+                                # Try to read as text (at most Config.MAX_MEMBER_CHARS characters)
                                 try:
                                     with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                                        content = f.read()
+                                        content, cut = self.read_text_capped(f)
                                     
                                     extracted_files.append({
                                         'filename': filename,
@@ -47,6 +52,8 @@ class RARExtractor(BaseExtractor):
                                         'type': 'text',
                                         'content': content
                                     })
+                                    if cut:
+                                        extracted_files[-1]['truncated'] = True
                                 except:
                                     # Binary file
                                     extracted_files.append({
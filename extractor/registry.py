@@ -0,0 +1,117 @@
+# ============================================================================
+# EXTRACTOR REGISTRY - File type to extractor dispatch
+# ============================================================================
+
+import os
+import importlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Type
+
+from config import Config
+
+# Extractor class name -> module inside the extractor package. Modules (and
+# the libraries they import) are loaded on first lookup of a matching file.
+EXTRACTOR_MODULES = {
+    'PDFExtractor': 'pdf_extractor',
+    'ImageExtractor': 'image_extractor',
+    'DOCXExtractor': 'docx_extractor',
+    'MarkdownExtractor': 'markdown_extractor',
+    'ZIPExtractor': 'zip_extractor',
+    'TextExtractor': 'text_extractor',
+    'GZIPExtractor': 'gzip_extractor',
+    'SevenZipExtractor': 'sevenzip_extractor',
+    'TARExtractor': 'tar_extractor',
+    'RARExtractor': 'rar_extractor',
+}
+
+# Whole file categories from Config.SUPPORTED_EXTENSIONS
+CATEGORY_EXTRACTORS = {
+    'images': 'ImageExtractor',
+    'pdf': 'PDFExtractor',
+    'markdown': 'MarkdownExtractor',
+    'text': 'TextExtractor',
+}
+
+# Single extensions and compound suffixes (these override the categories)
+SUFFIX_EXTRACTORS = {
+    '.docx': 'DOCXExtractor',
+    '.doc': 'DOCXExtractor',
+    '.zip': 'ZIPExtractor',
+    '.gz': 'GZIPExtractor',
+    '.tgz': 'GZIPExtractor',
+    '.tar.gz': 'GZIPExtractor',
+    '.7z': 'SevenZipExtractor',
+    '.tar': 'TARExtractor',
+    '.tar.bz2': 'TARExtractor',  # tarfile detects the compression
+    '.rar': 'RARExtractor',
+}
+
+_table: Optional[Dict[str, str]] = None
+_classes: Dict[str, Type] = {}
+_lock = threading.Lock()
+
+
+def _build_table() -> Dict[str, str]:
+    """Build the suffix -> class name lookup table"""
+    table = {}
+    for category, class_name in CATEGORY_EXTRACTORS.items():
+        for ext in Config.SUPPORTED_EXTENSIONS.get(category, ()):
+            table[ext] = class_name
+    table.update(SUFFIX_EXTRACTORS)
+    return table
+
+
+def lookup(file_path) -> Optional[str]:
+    """
+    Find the extractor class name for a file without importing anything
+    
+    Compound suffixes ('.tar.gz') win over the last suffix ('.gz'). Works on
+    the name string, so the scanner can call it for every directory entry
+    without building Path objects.
+    
+    Args:
+        file_path: Path or file name
+    
+    Returns:
+        Class name, or None if the file type is unsupported
+    """
+    global _table
+    if _table is None:
+        _table = _build_table()
+    
+    # Suffixes as pathlib sees them: leading dots start no suffix
+    name = os.path.basename(file_path).lower().lstrip('.')
+    last = name.rfind('.')
+    if last <= 0 or last == len(name) - 1:
+        return None
+    previous = name.rfind('.', 0, last)
+    if previous > 0:
+        class_name = _table.get(name[previous:])
+        if class_name:
+            return class_name
+    return _table.get(name[last:])
+
+
+def load_class(class_name: str) -> Type:
+    """Import an extractor class by name (module imported on first use)"""
+    cls = _classes.get(class_name)
+    if cls is None:
+        with _lock:
+            cls = _classes.get(class_name)
+            if cls is None:
+                module = importlib.import_module(f".{EXTRACTOR_MODULES[class_name]}", __package__)
+                cls = _classes[class_name] = getattr(module, class_name)
+    return cls
+
+
+def get_extractor_class(file_path: Path) -> Optional[Type]:
+    """Get extractor class for file type (None if unsupported)"""
+    class_name = lookup(file_path)
+    return load_class(class_name) if class_name else None
+
+
+def is_supported(file_path: Path) -> bool:
+    """Whether any extractor handles this file"""
+    return lookup(file_path) is not None
+
@@ -5,7 +5,6 @@
 from .base_extractor import BaseExtractor
 from typing import Dict, Any, List
 import logging
-import py7zr
 import tempfile
 import os
 from pathlib import Path
@@ -13,6 +12,8 @@ from pathlib import Path
 class SevenZipExtractor(BaseExtractor):
     """Extract content from 7-Zip compressed files"""
     
+    isolated = True  # Native LZMA/BCJ/PPMd codecs
+    
     def extract(self) -> Dict[str, Any]:
         """
         Extract 7z compressed files
@@ -21,6 +22,8 @@ class SevenZipExtractor(BaseExtractor):
             Dictionary with extracted content
         """
         try:
+            import py7zr
+            
             with py7zr.SevenZipFile(self.file_path, mode='r') as archive:
                 # Get file list
                 file_list = archive.getnames()
@@ -29,18 +32,20 @@ class SevenZipExtractor(BaseExtractor):
                 
                 # Extract to temp directory
                 with tempfile.TemporaryDirectory() as temp_dir:
-                    archive.extractall(path=temp_dir)
+                    with self.stage('archive_unpack', self.source.size):
+                        archive.extractall(path=temp_dir)
                     
                     # Read extracted files
                     for filename in file_list:
                         file_path = Path(temp_dir) / filename
                         
                         if file_path.is_file():
+                            self.check_cancelled()
                             try:
-                                # Try to read as text
+                                # Try to read as text (at most Config.MAX_MEMBER_CHARS characters)
                                 try:
                                     with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                                        content = f.read()
+                                        content, cut = self.read_text_capped(f)
                                     
                                     extracted_files.append({
                                         'filename': filename,
@@ -48,6 +53,8 @@ class SevenZipExtractor(BaseExtractor):
                                         'type': 'text',
                                         'content': content
                                     })
+                                    if cut:
+                                        extracted_files[-1]['truncated'] = True
                                 except:
                                     # Binary file
                                     extracted_files.append({
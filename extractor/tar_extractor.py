@@ -26,21 +26,24 @@ class TARExtractor(BaseExtractor):
                 extracted_files = []
                 for member in members:
                     if member.isfile():
+                        self.check_cancelled()
                         try:
                             # Extract file content
                             file_obj = tar.extractfile(member)
                             if file_obj:
-                                file_content = file_obj.read()
+                                # Decode as UTF-8, reading at most Config.MAX_MEMBER_CHARS characters
+                                with self.stage('archive_unpack', member.size):
+                                    text_content, cut = self.read_text_capped(file_obj)
                                 
-                                # Try to decode as text
                                 try:
-                                    text_content = file_content.decode('utf-8', errors='replace')
                                     extracted_files.append({
                                         'filename': member.name,
                                         'size': member.size,
                                         'type': 'text',
                                         'content': text_content
                                     })
+                                    if cut:
+                                        extracted_files[-1]['truncated'] = True
                                 except:
                                     extracted_files.append({
                                         'filename': member.name,
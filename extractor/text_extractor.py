@@ -9,6 +9,11 @@ import logging
 class TextExtractor(BaseExtractor):
     """Extract content from plain text files"""
     
+    # The start (and end) of a huge log is still a useful record
+    partial_reads = True
+    reads_source = True
+    cacheable = False
+    
     def extract(self) -> Dict[str, Any]:
         """
         Extract text content with encoding detection and large file support
@@ -18,11 +23,11 @@ class TextExtractor(BaseExtractor):
         """
         try:
             # Check file size for large file handling
-            file_size_mb = self.file_path.stat().st_size / (1024 * 1024)
+            file_size_mb = self.source.size / (1024 * 1024)
             if file_size_mb > 50:
                 self.logger.info(f"Processing large text file: {file_size_mb:.2f} MB")
             
-            # Read file with auto-detected encoding
+            # Read file with auto-detected encoding (capped at Config.MAX_TEXT_CHARS)
             text_content = self.read_file_content()
             
             # Basic text statistics
@@ -43,14 +48,15 @@ class TextExtractor(BaseExtractor):
             }
             
             # Add specialized parsing for certain file types
-            if ext == '.csv':
-                content['csv_data'] = self._parse_csv(text_content)
-            elif ext in ['.json', '.jsonl', '.jsn']:
-                content['json_data'] = self._parse_json(text_content)
-            elif ext == '.xml':
-                content['xml_structure'] = self._parse_xml_simple(text_content)
-            elif ext == '.log':
-                content['log_entries'] = self._parse_log(text_content)
+            with self.stage('text_parse'):
+                if ext == '.csv':
+                    content['csv_data'] = self._parse_csv(text_content)
+                elif ext in ['.json', '.jsonl', '.jsn']:
+                    content['json_data'] = self._parse_json(text_content)
+                elif ext == '.xml':
+                    content['xml_structure'] = self._parse_xml_simple(text_content)
+                elif ext == '.log':
+                    content['log_entries'] = self._parse_log(text_content)
             
             return self.create_result_dict(content)
             
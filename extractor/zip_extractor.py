@@ -13,8 +13,10 @@ from pathlib import Path
 class ZIPExtractor(BaseExtractor):
     """Extract and process ZIP archives recursively"""
     
-    def __init__(self, file_path: Path, depth: int = 0):
-        super().__init__(file_path)
+    isolated = True  # Members go through the PDF/image extractors in-process
+    
+    def __init__(self, file_path: Path, depth: int = 0, stat=None):
+        super().__init__(file_path, stat=stat)
         self.depth = depth  # Track nesting level
     
     def extract(self) -> Dict[str, Any]:
@@ -39,12 +41,13 @@ class ZIPExtractor(BaseExtractor):
                 temp_path = Path(temp_dir)
                 
                 # Extract ZIP
-                with zipfile.ZipFile(self.file_path, 'r') as zip_ref:
+                with self.stage('archive_unpack', self.source.size), zipfile.ZipFile(self.file_path, 'r') as zip_ref:
                     zip_ref.extractall(temp_path)
                     zip_info = self._get_zip_info(zip_ref)
                 
                 # Process all extracted files
-                extracted_files = self._process_extracted_files(temp_path)
+                with self.stage('archive_members'):
+                    extracted_files = self._process_extracted_files(temp_path)
                 
                 content = {
                     'zip_info': zip_info,
@@ -71,6 +74,19 @@ class ZIPExtractor(BaseExtractor):
                 error_message=str(e)
             )
     
+    def cache_settings(self) -> Dict[str, Any]:
+        """Nesting and member-extraction settings that affect the content"""
+        from config import Config
+        return {
+            **super().cache_settings(),
+            'depth': self.depth,
+            'max_zip_depth': Config.MAX_ZIP_DEPTH,
+            'ocr_language': Config.OCR_LANGUAGE,
+            'ocr_config': Config.OCR_CONFIG,
+            'ocr_enhance_images': Config.OCR_ENHANCE_IMAGES,
+            'pdf_extract_tables': Config.PDF_EXTRACT_TABLES,
+        }
+    
     def _get_zip_info(self, zip_ref: zipfile.ZipFile) -> Dict:
         """Get ZIP metadata"""
         file_list = zip_ref.namelist()
@@ -82,35 +98,24 @@ class ZIPExtractor(BaseExtractor):
     
     def _process_extracted_files(self, extract_dir: Path) -> List[Dict]:
         """Process all extracted files"""
-        from config import Config
-        from . import (PDFExtractor, ImageExtractor, DOCXExtractor,
-                       MarkdownExtractor, TextExtractor)
+        from .registry import get_extractor_class
         
         processed_files = []
         
         # Recursively find all files
         for file_path in extract_dir.rglob('*'):
             if file_path.is_file():
+                self.check_cancelled()
                 try:
-                    # Get file extension
-                    ext = file_path.suffix.lower()
-                    
-                    # Choose appropriate extractor
+                    # Choose appropriate extractor (same dispatch as top-level files)
+                    extractor_class = get_extractor_class(file_path)
                     extractor = None
                     
-                    if ext == '.zip':
+                    if extractor_class is ZIPExtractor:
                         # Recursive ZIP extraction
                         extractor = ZIPExtractor(file_path, depth=self.depth + 1)
-                    elif ext == '.pdf':
-                        extractor = PDFExtractor(file_path)
-                    elif ext in Config.SUPPORTED_EXTENSIONS['images']:
-                        extractor = ImageExtractor(file_path)
-                    elif ext == '.docx':
-                        extractor = DOCXExtractor(file_path)
-                    elif ext == '.md':
-                        extractor = MarkdownExtractor(file_path)
-                    elif ext in Config.SUPPORTED_EXTENSIONS['text']:
-                        extractor = TextExtractor(file_path)
+                    elif extractor_class:
+                        extractor = extractor_class(file_path)
                     
                     # Extract content
                     if extractor:
@@ -124,7 +129,7 @@ class ZIPExtractor(BaseExtractor):
                         processed_files.append({
                             'relative_path': str(file_path.relative_to(extract_dir.parent)),
                             'status': 'skipped',
-                            'reason': f'Unsupported file type: {ext}'
+                            'reason': f'Unsupported file type: {file_path.suffix.lower()}'
                         })
                 
                 except Exception as e:
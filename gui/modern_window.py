@@ -7,6 +7,9 @@ from datetime import datetime
 import queue
 import ctypes
 
+from config import Config
+from utils.cancellation import CancellationToken
+
 # Fix blurry text on Windows - Enable DPI awareness
 try:
     ctypes.windll.shcore.SetProcessDpiAwareness(1)  # Windows 8.1+
@@ -17,6 +20,14 @@ except:
         pass
 
 class ModernWindow:
+    # Log levels of extraction messages -> log tag names
+    LOG_LEVELS = {
+        'ERROR': 'error',
+        'WARNING': 'warning',
+        'SUCCESS': 'success',
+        'INFO': 'info'
+    }
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Universal Document Extractor v1.0")
@@ -43,7 +54,10 @@ class ModernWindow:
         self.selected_files = None
         self.selected_directory = None
         self.is_running = False
-        self.msg_queue = queue.Queue()
+        self.cancel_token = None
+        # Bounded: the extraction sends coalesced updates and holds them back
+        # while the GUI is behind
+        self.msg_queue = queue.Queue(maxsize=Config.GUI_QUEUE_SIZE)
         
         self.build_ui()
         
@@ -287,6 +301,7 @@ class ModernWindow:
             return
         
         self.is_running = True
+        self.cancel_token = CancellationToken()
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         self.add_log("🚀 Starting extraction...", 'info')
@@ -294,10 +309,12 @@ class ModernWindow:
         threading.Thread(target=self.run_extraction, daemon=True).start()
     
     def stop_extraction(self):
-        self.is_running = False
-        self.start_btn.config(state=tk.NORMAL)
+        # Running files stop at their next checkpoint; the extraction thread
+        # re-enables Start once partial results are saved
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
         self.stop_btn.config(state=tk.DISABLED)
-        self.add_log("⏸️ Stopped", 'warning')
+        self.add_log("⏸️ Stopping...", 'warning')
     
     def clear_log(self):
         self.log.config(state=tk.NORMAL)
@@ -314,11 +331,11 @@ class ModernWindow:
             source = self.selected_files if self.selected_files else self.selected_directory
             
             # Run extraction with message queue for updates
-            output_file = extract_documents(source, self.msg_queue)
+            output_file = extract_documents(source, self.msg_queue, cancel_token=self.cancel_token)
             
             if output_file:
                 self.add_log(f"✅ Output saved to: {output_file}", 'success')
-            
+        
         except Exception as e:
             self.add_log(f"❌ Extraction error: {str(e)}", 'error')
         finally:
@@ -327,9 +344,14 @@ class ModernWindow:
             self.stop_btn.config(state=tk.DISABLED)
     
     def add_log(self, msg, level='info'):
+        self.add_logs([(msg, level)])
+    
+    def add_logs(self, lines):
+        """Append (message, level) lines with one widget update"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.log.config(state=tk.NORMAL)
-        self.log.insert(tk.END, f"[{timestamp}] {msg}\n", level)
+        for msg, level in lines:
+            self.log.insert(tk.END, f"[{timestamp}] {msg}\n", level)
         self.log.see(tk.END)
         self.log.config(state=tk.DISABLED)
     
@@ -354,7 +376,13 @@ class ModernWindow:
             progress_data = message[1]
             percent = progress_data.get('progress_percent', 0)
             self.prog_var.set(percent)
-            self.prog_label.config(text=f"{percent:.1f}%")
+            if progress_data.get('scan_complete', True):
+                self.prog_label.config(text=f"{percent:.1f}% | {progress_data.get('mb_per_second', 0):.1f} MB/s"
+                                            f" | ETA {progress_data.get('eta', '')}")
+            else:
+                # The total is still growing while the scan runs
+                self.prog_label.config(text=f"{progress_data.get('processed', 0)} / "
+                                            f"{progress_data.get('total', 0)} (scanning)")
             
             # Update stats in log
             if progress_data.get('current_file'):
@@ -363,14 +391,11 @@ class ModernWindow:
         
         elif msg_type == 'log':
             text, level = message[1], message[2]
-            # Convert level to our tag names
-            level_map = {
-                'ERROR': 'error',
-                'WARNING': 'warning',
-                'SUCCESS': 'success',
-                'INFO': 'info'
-            }
-            self.add_log(text, level_map.get(level, 'info'))
+            self.add_log(text, self.LOG_LEVELS.get(level, 'info'))
+        
+        elif msg_type == 'logs':
+            # Log lines collected since the last update
+            self.add_logs([(text, self.LOG_LEVELS.get(level, 'info')) for text, level in message[1]])
         
         elif msg_type == 'complete':
             output_file = message[1]
@@ -380,6 +405,16 @@ class ModernWindow:
             self.stop_btn.config(state=tk.DISABLED)
             self.prog_var.set(100)
             self.prog_label.config(text="100%")
+        
+        elif msg_type == 'stopped':
+            output_file = message[1]
+            if output_file:
+                self.add_log(f"⏸️ Stopped - partial results saved to: {output_file}", 'warning')
+            else:
+                self.add_log("⏸️ Stopped", 'warning')
+            self.is_running = False
+            self.start_btn.config(state=tk.NORMAL)
+            self.stop_btn.config(state=tk.DISABLED)
     
     def run(self):
         self.root.mainloop()
@@ -2,210 +2,714 @@
 # MAIN - Application entry point and orchestration
 # ============================================================================
 
+import os
 import sys
+import time
+import signal
+import argparse
+import logging
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import json
 from datetime import datetime
-from typing import List, Optional
+from concurrent.futures import CancelledError
+from typing import TYPE_CHECKING, Callable, Optional
 import queue
 
 from config import Config
 from utils.logger import setup_logger
-from utils.progress import ProgressTracker
-from utils.file_scanner import FileScanner
-from extractor import (
-    PDFExtractor, ImageExtractor, DOCXExtractor,
-    MarkdownExtractor, ZIPExtractor, TextExtractor,
-    GZIPExtractor, SevenZipExtractor, TARExtractor, RARExtractor
-)
+from utils.progress import ProgressTracker, ProgressPublisher
+from utils.file_scanner import FileScanner, ScanQueue
+from utils.output_writer import StreamingJSONLWriter
+from utils.executor import HybridExecutor
+from utils.checksum import checksum_field
+from utils.timings import TimingTotals
+from utils.cancellation import CancellationToken, ExtractionCancelled
+from extractor import BaseExtractor, get_extractor_class
+from extractor.file_source import is_too_large
 
-# Setup logger
-logger = setup_logger()
+# The run manifest, state database, cache, deduplicator, profiler and worker
+# supervisor are imported where they are used, so that --help and small runs
+# do not pay for the features they leave off (see benchmarks/startup.py)
+if TYPE_CHECKING:
+    from utils.dedup import Deduplicator
+    from utils.state_db import FileStateDB
+    from utils.supervisor import WorkerFailure
 
+# Handlers are attached by setup_logger() when a run starts, not on import
+# (worker processes import this module too)
+logger = logging.getLogger('DocumentExtractor')
 
-def get_extractor(file_path: Path):
+
+def get_extractor(file_path: Path, stat: Optional[os.stat_result] = None):
     """Get appropriate extractor for file type"""
-    ext = file_path.suffix.lower()
-    file_path_lower = str(file_path).lower()
-    
-    # Check for .tar.gz and .tgz first
-    if file_path_lower.endswith(('.tar.gz', '.tgz')):
-        return GZIPExtractor(file_path)
-    elif ext == '.pdf':
-        return PDFExtractor(file_path)
-    elif ext in Config.SUPPORTED_EXTENSIONS['images']:
-        return ImageExtractor(file_path)
-    elif ext in ['.docx', '.doc']:
-        return DOCXExtractor(file_path)
-    elif ext in Config.SUPPORTED_EXTENSIONS['markdown']:
-        return MarkdownExtractor(file_path)
-    elif ext == '.zip':
-        return ZIPExtractor(file_path)
-    elif ext == '.gz':
-        return GZIPExtractor(file_path)
-    elif ext == '.7z':
-        return SevenZipExtractor(file_path)
-    elif ext == '.tar':
-        return TARExtractor(file_path)
-    elif ext == '.rar':
-        return RARExtractor(file_path)
-    elif ext in Config.SUPPORTED_EXTENSIONS['text']:
-        return TextExtractor(file_path)
-    else:
+    extractor_class = get_extractor_class(file_path)
+    return extractor_class(file_path, stat=stat) if extractor_class else None
+
+
+def run_extractor(file_path: Path, stat: Optional[os.stat_result] = None) -> Optional[dict]:
+    """
+    Run the matching extractor on one file
+    
+    Executed inside a worker thread or worker process, so it must stay a
+    module-level function and only touch picklable arguments.
+    
+    Args:
+        file_path: File to extract
+        stat: Stat result from the scan (saves statting the file again)
+    
+    Returns:
+        Result dictionary (with per-stage 'timings' if Config.RECORD_TIMINGS),
+        or None if the file type is unsupported
+    """
+    extractor = get_extractor(file_path, stat)
+    if not extractor:
         return None
+    
+    # Reuse content extracted by an earlier run if the file is unchanged
+    cache = None
+    if Config.CACHE_ENABLED and extractor.cacheable:
+        from utils.cache import ExtractionCache
+        cache = ExtractionCache.get_instance()
+    cache_key = extractor.cache_key() if cache else None
+    if cache_key:
+        with extractor.stage('cache_lookup'):
+            cached = cache.get(cache_key)
+        if cached is not None:
+            # The key is the stat signature; the checksum was stored with the content
+            if cached.get('checksum'):
+                extractor.source.set_checksum(cached['checksum'])
+            result = extractor.create_result_dict(
+                cached['content'],
+                status=cached['status'],
+                error_message=cached['error_message']
+            )
+            if cached.get('truncated'):
+                result['truncated'] = cached['truncated']
+            result['from_cache'] = True
+            extractor.close()
+            return extractor.attach_timings(result)
+    
+    result = extractor.safe_extract()
+    
+    # Errors and skips may be transient (missing dependency), so only cache real content
+    if cache_key and result.get('extraction_status') in ('success', 'partial'):
+        with extractor.stage('cache_store'):
+            cache.put(cache_key, result.get('content'), result['extraction_status'],
+                      result.get('error_message'), result.get('truncated'),
+                      checksum=result.get(checksum_field()))
+    
+    return extractor.attach_timings(result)
 
 
-def extract_single_file(file_path: Path, progress: ProgressTracker, msg_queue: Optional[queue.Queue] = None) -> dict:
-    """Extract content from a single file"""
-    try:
-        # Get extractor
-        extractor = get_extractor(file_path)
-        
-        if not extractor:
-            logger.warning(f"No extractor for {file_path}")
-            progress.update(skipped=True, filename=str(file_path))
-            if msg_queue:
-                msg_queue.put(('log', f"Skipped: {file_path.name} (unsupported type)", "WARNING"))
-            return None
-        
-        # Extract content
-        result = extractor.safe_extract()
-        
-        # Update progress
-        success = result.get('extraction_status') == 'success'
-        progress.update(success=success, filename=str(file_path))
-        
-        # Send progress update to GUI
-        if msg_queue:
-            stats = progress.get_stats()
-            msg_queue.put(('progress', stats))
-            
-            if not success:
-                msg_queue.put(('log', f"Error: {file_path.name} - {result.get('error_message')}", "ERROR"))
+def failure_result(file_path: Path, error: 'WorkerFailure', stat: Optional[os.stat_result] = None) -> dict:
+    """
+    Build the result record of a file whose worker timed out or crashed
+    
+    The record is built from the scan's stat result, without opening the
+    file on the main thread: it is what just hung or crashed a worker, so it
+    is not checksummed either and the record has no checksum field.
+    
+    Args:
+        file_path: File the worker was extracting
+        error: WorkerTimeout or WorkerCrashed
+        stat: Stat result from the scan, if any
+    
+    Returns:
+        Result dictionary without content
+    """
+    import uuid
+    
+    if stat is not None:
+        metadata = BaseExtractor.stat_metadata(file_path, stat)
+    else:
+        metadata = {'file_name': file_path.name, 'file_path': str(file_path.absolute())}
+    
+    return {
+        'file_id': str(uuid.uuid4()),
+        **metadata,
+        'content': None,
+        'extraction_status': error.status,
+        'extraction_timestamp': datetime.now().isoformat(),
+        'error_message': str(error)
+    }
+
+
+def report_result(file_path: Path, result: Optional[dict], progress: ProgressTracker,
+                  updates: Optional[ProgressPublisher] = None, error: Optional[Exception] = None,
+                  size: int = 0):
+    """Record a finished file in the progress tracker and notify the GUI"""
+    if result:
+        size = result.get('file_size_bytes') or size
+    
+    if error is not None:
+        logger.error(f"Error processing {file_path}: {error}")
+        progress.update(success=False, filename=str(file_path), size=size)
         
-        return result
+        if updates:
+            updates.log(f"Error: {file_path.name} - {str(error)}", "ERROR")
+            updates.file_done()
+        return
+    
+    if result is None:
+        logger.warning(f"No extractor for {file_path}")
+        progress.update(skipped=True, filename=str(file_path), size=size)
+        if updates:
+            updates.log(f"Skipped: {file_path.name} (unsupported type)", "WARNING")
+            updates.file_done()
+        return
+    
+    if result.get('extraction_status') == 'duplicate':
+        progress.update(duplicate=True, filename=str(file_path), size=size)
+        if updates:
+            updates.file_done()
+        return
     
-    except Exception as e:
-        logger.error(f"Error processing {file_path}: {e}")
-        progress.update(success=False, filename=str(file_path))
+    # Update progress
+    success = result.get('extraction_status') == 'success'
+    progress.update(success=success, filename=str(file_path), size=size)
+    if Config.CACHE_ENABLED and get_extractor_class(file_path).cacheable:
+        progress.record_cache(hit=result.get('from_cache', False))
+    
+    # Progress reaches the GUI with the next coalesced update
+    if updates:
+        if not success:
+            updates.log(f"Error: {file_path.name} - {result.get('error_message')}", "ERROR")
+        updates.file_done()
+
+
+def _iter_tasks(scan: ScanQueue, admit: Callable[[Path], bool], file_stats: dict,
+                progress: ProgressTracker, updates: Optional[ProgressPublisher] = None,
+                deduplicator: Optional['Deduplicator'] = None):
+    """
+    Yield (file_path, args, isolated, memory) tasks for the executor as the scan finds files
+    
+    Yields None while the scan has nothing new, so finished results keep being
+    written in the meantime. Unsupported files are reported as skipped (and
+    their stat results released); supported files rejected by admit() produce
+    no task. Files the deduplicator held back for hashing are yielded once it
+    releases them as distinct.
+    """
+    def build_task(file_path: Path, extractor_class):
+        file_stat = file_stats.get(file_path)
+        size = file_stat.st_size if file_stat else 0
+        isolated = extractor_class.cpu_bound or extractor_class.isolated
+        return file_path, (file_path, file_stat), isolated, scan.scanner.estimate_memory(file_path, size)
+    
+    while True:
+        if deduplicator:
+            for file_path in deduplicator.take_released():
+                yield build_task(file_path, get_extractor_class(file_path))
         
-        if msg_queue:
-            msg_queue.put(('log', f"Error: {file_path.name} - {str(e)}", "ERROR"))
+        file_path = scan.get(timeout=HybridExecutor.STARVED_POLL_INTERVAL)
+        if file_path is None:
+            if scan.exhausted:
+                if not (deduplicator and deduplicator.held):
+                    return
+                deduplicator.wait_decided(HybridExecutor.STARVED_POLL_INTERVAL)
+            yield None
+            continue
         
-        return None
+        extractor_class = get_extractor_class(file_path)
+        if extractor_class is None:
+            file_stat = file_stats.pop(file_path, None)
+            report_result(file_path, None, progress, updates, size=file_stat.st_size if file_stat else 0)
+            continue
+        if not admit(file_path):
+            continue
+        yield build_task(file_path, extractor_class)
+
+
+def _write_record(writer: StreamingJSONLWriter, state: Optional['FileStateDB'], file_states: dict,
+                  delta_counts: dict, record_path: Path, record: dict,
+                  timing_totals: Optional[TimingTotals] = None):
+    """Write a result record (in incremental mode only if the content changed)"""
+    if timing_totals is not None:
+        timing_totals.add(record.get('timings'))
+    
+    if state:
+        change = _record_file_state(state, str(record_path), file_states, record)
+        if change is None:
+            # Only the timestamps changed - nothing to emit
+            delta_counts['unchanged'] += 1
+            return
+        record['change'] = change
+        delta_counts[change] += 1
+    
+    writer.write_result(record, source_path=str(record_path))
 
 
-def extract_documents(source, msg_queue: Optional[queue.Queue] = None) -> Path:
+def extract_documents(source, msg_queue: Optional[queue.Queue] = None,
+                      resume_run_id: Optional[str] = None,
+                      incremental: bool = False, snapshot: bool = False,
+                      cancel_token: Optional[CancellationToken] = None, profile: bool = False) -> Path:
     """
     Main extraction function
     
+    Files are extracted while the source is still being scanned: the scan
+    runs in a background thread and every file is handed to the executor as
+    soon as it is found.
+    
     Args:
         source: Either a Path to directory or a List[Path] of specific files
-        msg_queue: Queue for GUI updates
-        
+                (ignored when resuming - the run's original source is used)
+        msg_queue: Queue for GUI updates (progress is sent every
+                   Config.PROGRESS_UPDATE_INTERVAL seconds, not per file)
+        resume_run_id: Run ID of an interrupted run to continue
+        incremental: Only extract files that are new or changed since the last
+                     incremental run of this directory and write a delta output
+        snapshot: After an incremental run, also write the full merged snapshot
+        cancel_token: Token that stops the run; pending files are dropped,
+                      running extractions stop at their next checkpoint and
+                      the results finished so far are still written
+        profile: Sample the CPU and memory of every extractor and write the
+                 profiles next to the output (see ExtractionProfiler);
+                 needs Config.USE_PROCESS_POOL off
+    
     Returns:
-        Path to output JSON file
+        Path to output JSON Lines file (the delta file in incremental mode)
+    
+    Raises:
+        ValueError: For a file list in incremental mode, or profile with
+                    Config.USE_PROCESS_POOL on
     """
+    if not logger.handlers:
+        setup_logger()
+    
+    # The profiler wraps each task in this process; it cannot be sent to workers
+    if profile and Config.USE_PROCESS_POOL:
+        raise ValueError("Profiling needs USE_PROCESS_POOL = False (files are profiled in this process)")
+    
+    cancel_token = cancel_token or CancellationToken()
+    
+    from utils.checkpoint import RunManifest
+    from utils.supervisor import WorkerFailure
+    
+    manifest = None
+    if resume_run_id:
+        manifest = RunManifest.load(resume_run_id)
+        if manifest.is_complete:
+            logger.info(f"Run {resume_run_id} already completed: {manifest.output_file}")
+            if msg_queue:
+                msg_queue.put(('complete', manifest.output_file))
+            return manifest.output_file
+        
+        source = manifest.source
+        incremental = manifest.options.get('incremental', False)
+        snapshot = manifest.options.get('snapshot', False)
+        logger.info(f"Resuming run {resume_run_id} ({len(manifest.completed)} files already done)")
+    
+    # Keeps the stat result of every file from the scan on
+    scanner = FileScanner()
+    
     # Determine if we're processing a directory or file list
     if isinstance(source, list):
+        if incremental:
+            raise ValueError("Incremental mode requires a source directory")
+        
         # File list mode
-        files = source
+        files = [Path(f).absolute() for f in source]
         source_dir = files[0].parent if files else Path.cwd()
+        run_source = [str(f) for f in files]
+        paths = scanner.iter_files(files)
         logger.info(f"Starting extraction from {len(files)} selected files")
         
         if msg_queue:
             msg_queue.put(('log', f"Processing {len(files)} selected files...", "INFO"))
     else:
         # Directory mode
-        source_dir = source
+        source_dir = Path(source).absolute()
+        run_source = str(source_dir)
+        paths = scanner.iter_directory(source_dir, cancel_token=cancel_token)
         logger.info(f"Starting extraction from: {source_dir}")
         
         if msg_queue:
             msg_queue.put(('log', f"Scanning {source_dir}...", "INFO"))
-        
-        # Scan for files
-        scanner = FileScanner()
-        files = scanner.scan_directory(source_dir)
-        
-        if not files:
-            logger.warning("No supported files found!")
-            if msg_queue:
-                msg_queue.put(('log', "No supported files found!", "WARNING"))
-            return None
     
-    logger.info(f"Found {len(files)} files to process")
+    # The total grows while the scan runs and is final once it has finished
+    progress = ProgressTracker()
     
-    # Calculate total size
-    scanner = FileScanner()
-    stats = scanner.get_file_stats(files)
+    # Per-file progress and log lines reach the GUI as one update per interval
+    updates = ProgressPublisher(msg_queue, progress) if msg_queue else None
     
-    if msg_queue:
-        msg_queue.put(('log', f"Found {len(files)} files ({stats['total_size_human']})", "SUCCESS"))
+    def scan_finished(finished: ScanQueue):
+        progress.set_total()
+        found = f"{finished.found} files ({scanner._human_readable_size(finished.found_bytes)})"
+        logger.info(f"Scan finished: {found}")
+        if updates:
+            updates.log(f"Found {found}", "SUCCESS")
     
-    # Initialize progress tracker
-    progress = ProgressTracker(len(files))
+    scan = ScanQueue(scanner, paths, on_found=progress.add_discovered, on_finished=scan_finished).start()
     
-    # Process files with thread pool
-    results = []
+    # Nothing is created on disk until the scan has found something
+    if not scan.wait_for_files():
+        if cancel_token.cancelled:
+            logger.warning("Extraction cancelled before it started")
+            if updates:
+                updates.put(('stopped', None))
+            return None
+        logger.warning("No supported files found!")
+        if updates:
+            updates.log("No supported files found!", "WARNING")
+            updates.flush(block=True)
+        return None
     
-    with ThreadPoolExecutor(max_workers=Config.MAX_THREADS) as executor:
-        # Submit all tasks
-        future_to_file = {
-            executor.submit(extract_single_file, file_path, progress, msg_queue): file_path
-            for file_path in files
-        }
+    # Incremental mode: skip files whose inode/size/mtime match the last run
+    state = None
+    if incremental:
+        from utils.state_db import FileStateDB
+        state = FileStateDB(source_dir)
+    file_states = {}
+    seen_paths = set()
+    delta_counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+    
+    # Extract each distinct content once; copies are written as duplicate records
+    deduplicator = None
+    if Config.DEDUPLICATE_FILES:
+        from utils.dedup import Deduplicator
+        deduplicator = Deduplicator()
+    
+    # Stream results to disk as they complete instead of holding them in memory;
+    # the run manifest is checkpointed after every sync so the run can be resumed
+    # (state changes are committed at the same points, after the output is on disk)
+    on_sync = state.commit if state else None
+    if manifest:
+        output_file = manifest.output_file
+        writer = StreamingJSONLWriter(output_file, manifest=manifest, on_sync=on_sync).resume(
+            manifest.output_offset,
+            records_written=len(manifest.completed),
+            metadata={'run_id': manifest.run_id},
+            position=manifest.output_position
+        )
+    else:
+        now = datetime.now()
+        run_id = now.strftime(Config.RUN_ID_FORMAT)
+        filename_format = Config.DELTA_FILENAME_FORMAT if incremental else Config.JSON_FILENAME_FORMAT
+        output_file = Path(Config.OUTPUT_FOLDER) / now.strftime(filename_format)
+        manifest = RunManifest.create(run_id, run_source, output_file,
+                                      options={'incremental': incremental, 'snapshot': snapshot})
+        writer = StreamingJSONLWriter(output_file, manifest=manifest, on_sync=on_sync).open({
+            'run_id': run_id,
+            'source_directory': str(source_dir),
+            'mode': 'incremental' if incremental else 'full'
+        })
+        logger.info(f"Run ID: {run_id} (resume with: python main.py --resume {run_id})")
+    
+    def admit(file_path: Path) -> bool:
+        """
+        Decide whether a file found by the scan is extracted in this run
         
-        # Process completed tasks
-        for future in as_completed(future_to_file):
-            file_path = future_to_file[future]
-            try:
-                result = future.result()
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"Error in future for {file_path}: {e}")
-    
-    # Save results to JSON
-    output_file = save_results(results, source_dir)
-    
-    # Final stats
-    final_stats = progress.get_stats()
+        The scan keeps the stat result of every file until its record is
+        written; files that get no record in this run release it here.
+        """
+        path = str(file_path)
+        file_stat = scanner.file_stats.get(file_path)
+        size = file_stat.st_size if file_stat else 0
+        
+        if state:
+            seen_paths.add(path)
+            if file_stat and state.is_unchanged(path, file_stat):
+                delta_counts['unchanged'] += 1
+                progress.remove_discovered(file_path, size)
+                scanner.file_stats.pop(file_path, None)
+                return False
+            file_states[path] = file_stat
+        
+        # Skip files an interrupted run already finished
+        if path in manifest.completed:
+            progress.remove_discovered(file_path, size)
+            scanner.file_stats.pop(file_path, None)
+            return False
+        
+        # Files sharing a size are held back while a background pool compares
+        # them; copies are written (and keep their stat result until then) when,
+        # or as soon as, their representative is. Files over MAX_FILE_SIZE_MB
+        # are never hashed in full, so they are not compared
+        return not (deduplicator and file_stat and not is_too_large(size)
+                    and deduplicator.add(file_path, size))
+    
+    completed = False
+    cancelled_count = 0
+    timing_totals = TimingTotals()
+    profiler = None
+    if profile:
+        from utils.profiler import ExtractionProfiler
+        profiler = ExtractionProfiler().start()
+    next_status = time.monotonic() + Config.CLI_PROGRESS_INTERVAL
+    try:
+        with HybridExecutor(cancel_token=cancel_token) as executor:
+            # Submit a bounded window of tasks as the scan finds them, routing
+            # CPU-bound and crash-prone extractors to supervised worker
+            # processes, and write each result as soon as it completes
+            tasks = _iter_tasks(scan, admit, scanner.file_stats, progress, updates, deduplicator)
+            task = profiler.wrap(run_extractor) if profiler else run_extractor
+            for file_path, future in executor.map_unordered(task, tasks):
+                # The CLI has no progress bar; log the throughput and ETA instead
+                if not updates and Config.CLI_PROGRESS_INTERVAL and time.monotonic() >= next_status:
+                    logger.info(f"Progress: {progress.format_status()}")
+                    next_status = time.monotonic() + Config.CLI_PROGRESS_INTERVAL
+                
+                # The record of this file is written (or left for --resume) below
+                file_stat = scanner.file_stats.pop(file_path, None)
+                
+                try:
+                    result = future.result()
+                except (ExtractionCancelled, CancelledError):
+                    # Left for a --resume run
+                    cancelled_count += 1
+                    continue
+                except WorkerFailure as e:
+                    # Recorded in the output; the worker has already been replaced
+                    result = failure_result(file_path, e, file_stat)
+                except Exception as e:
+                    # Copies are byte-identical, so they have the same size
+                    size = file_stat.st_size if file_stat else 0
+                    copies = deduplicator.resolve(file_path, None) if deduplicator else []
+                    for failed_path in [file_path] + copies:
+                        scanner.file_stats.pop(failed_path, None)
+                        report_result(failed_path, None, progress, updates, error=e, size=size)
+                    continue
+                
+                report_result(file_path, result, progress, updates)
+                if not result:
+                    continue
+                _write_record(writer, state, file_states, delta_counts, file_path, result, timing_totals)
+                
+                # Identical copies share the result of the file that was extracted
+                if deduplicator:
+                    copies = [(copy_path, result) for copy_path in deduplicator.resolve(file_path, result)]
+                    for copy_path, canonical in copies + deduplicator.take_ready():
+                        record = deduplicator.duplicate_record(copy_path, canonical,
+                                                               scanner.file_stats.pop(copy_path, None))
+                        report_result(copy_path, record, progress, updates)
+                        _write_record(writer, state, file_states, delta_counts, copy_path, record, timing_totals)
+            
+            # Copies found after their representative's result was written
+            for copy_path, canonical in (deduplicator.take_ready() if deduplicator else []):
+                record = deduplicator.duplicate_record(copy_path, canonical,
+                                                       scanner.file_stats.pop(copy_path, None))
+                report_result(copy_path, record, progress, updates)
+                _write_record(writer, state, file_states, delta_counts, copy_path, record, timing_totals)
+        
+        # Deletions can only be told once the whole tree has been walked; the
+        # state forgets them at the next sync
+        if state and not cancel_token.cancelled:
+            for removed_path, removed_file_id in state.find_removed(seen_paths):
+                writer.write_record('removed', {'file_path': removed_path, 'file_id': removed_file_id})
+                state.remove(removed_path)
+                delta_counts['removed'] += 1
+        
+        completed = not cancel_token.cancelled
+    finally:
+        # Unblocks the scan thread if the run stopped before taking every file
+        scan.close()
+        scan.join()
+        if deduplicator:
+            deduplicator.close()
+        
+        # Cache stores are written in batches; write the last one now
+        if Config.CACHE_ENABLED:
+            from utils.cache import ExtractionCache
+            ExtractionCache.flush_instance()
+        
+        # Final stats (also written when the run is interrupted)
+        final_stats = progress.get_stats()
+        summary = {
+            'statistics': final_stats,
+            'files_found': scan.found,
+            'total_size_bytes': scan.found_bytes
+        }
+        if cancel_token.cancelled:
+            summary['cancelled'] = True
+        if state:
+            summary['delta'] = delta_counts
+        if Config.RECORD_TIMINGS:
+            # Serialization of a record cannot be timed inside the record itself
+            timing_totals.add_stage('serialize', writer.serialize_seconds * 1000,
+                                    writer.bytes_written, files=writer.records_written)
+            summary['timings'] = timing_totals.summary()
+        writer.close(summary)
+        if completed:
+            manifest.mark_complete()
+        manifest.close()
+        if state:
+            state.close()
+        if profiler:
+            profiler.stop()
+            for line in profiler.summary_lines():
+                logger.info(f"Profile {line}")
+            logger.info(f"Profiles saved to: {profiler.write(output_file)}")
+        if updates:
+            updates.flush(block=True)
+    
+    if cancel_token.cancelled:
+        logger.warning(f"Extraction cancelled: {final_stats['processed']} files processed, "
+                       f"{cancelled_count} stopped or not started. Partial results saved to: {output_file}")
+        logger.warning(f"Finish the rest with: python main.py --resume {manifest.run_id}")
+        if updates:
+            updates.put(('stopped', output_file))
+        return output_file
+    
     logger.info(f"Extraction complete! Processed: {final_stats['processed']}, "
-                f"Success: {final_stats['successful']}, Failed: {final_stats['failed']}")
+                f"Success: {final_stats['successful']}, Failed: {final_stats['failed']}, "
+                f"Duplicates: {final_stats['duplicates']}")
+    logger.info(f"Processed {scanner._human_readable_size(final_stats['bytes_processed'])} "
+                f"in {final_stats['elapsed_time']}")
+    if Config.CACHE_ENABLED:
+        logger.info(f"Cache hits: {final_stats['cache_hits']}, misses: {final_stats['cache_misses']}")
+    if executor.memory_waits:
+        logger.info(f"Memory budget of {Config.MEMORY_BUDGET_MB} MB held files back {executor.memory_waits} times "
+                    f"(peak estimate {scanner._human_readable_size(executor.memory_peak)})")
+    if Config.RECORD_TIMINGS and timing_totals.stages:
+        logger.info(f"Time by stage: {timing_totals.format_top()}")
+    
+    if incremental:
+        logger.info(f"Delta: {delta_counts['added']} added, {delta_counts['changed']} changed, "
+                    f"{delta_counts['removed']} removed, {delta_counts['unchanged']} unchanged")
+        if snapshot:
+            write_snapshot(source_dir)
     
-    if msg_queue:
-        msg_queue.put(('complete', output_file))
+    if updates:
+        updates.put(('complete', output_file))
     
     return output_file
 
 
-def save_results(results: List[dict], source_dir: Path) -> Path:
-    """Save extraction results to JSON"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = Path(Config.OUTPUT_FOLDER) / f"extraction_{timestamp}.json"
+def _record_file_state(state: 'FileStateDB', path: str, file_states: dict, result: dict) -> Optional[str]:
+    """
+    Update the file state after an incremental extraction
     
-    # Create comprehensive output
-    output_data = {
-        'metadata': {
-            'extraction_date': datetime.now().isoformat(),
-            'source_directory': str(source_dir),
-            'total_files': len(results),
-            'version': '1.0.0'
-        },
-        'results': results
-    }
+    Failed results are stored too (the snapshot shows the error), but marked
+    for retry, so the next run extracts the file again.
+    
+    Returns:
+        'added', 'changed', or None if the content is identical to the last
+        run and the last run did not fail on it
+    """
+    from utils.state_db import FINAL_STATUSES
+    
+    file_stat = file_states.pop(path, None) or Path(path).stat()
+    previous = state.lookup(path)
+    
+    if previous and previous[3] and previous[3] == result.get(checksum_field()):
+        # A retried file that fails again stays marked for retry
+        if not previous[5] or result.get('extraction_status') not in FINAL_STATUSES:
+            state.touch(path, file_stat)
+            return None
+    
+    if 'duplicate_of' in result:
+        result = _standalone_duplicate(state, result)
+    state.upsert(path, file_stat, result)
+    return 'changed' if previous else 'added'
+
+
+def _standalone_duplicate(state: 'FileStateDB', record: dict) -> dict:
+    """
+    Full record of a duplicate, as kept in the state for later snapshots
+    
+    The written record only points to its representative's file_id. The
+    representative may change or be deleted while the copy stays the same,
+    so the state keeps the copy with the representative's content.
+    """
+    canonical = state.get_record(record.get('duplicate_of_path'))
+    if canonical is None:
+        return record
+    own_fields = {key: value for key, value in record.items()
+                  if key not in ('duplicate_of', 'duplicate_of_path', 'extraction_status')}
+    return {**canonical, **own_fields}
+
+
+def write_snapshot(source_dir: Path) -> Path:
+    """
+    Materialise the full merged snapshot of an incrementally extracted directory
     
-    # Save to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    Writes the latest record of every file known to the state database,
+    without extracting anything.
     
-    logger.info(f"Results saved to: {output_file}")
+    Returns:
+        Path to snapshot JSON Lines file
+    """
+    from utils.state_db import FileStateDB
+    
+    state = FileStateDB(source_dir)
+    output_file = Path(Config.OUTPUT_FOLDER) / datetime.now().strftime(Config.SNAPSHOT_FILENAME_FORMAT)
+    
+    writer = StreamingJSONLWriter(output_file).open({
+        'source_directory': str(source_dir),
+        'mode': 'snapshot',
+        'files_found': state.count()
+    })
+    try:
+        for record in state.iter_records():
+            writer.write_result(record)
+    finally:
+        writer.close()
+        state.close()
+    
+    logger.info(f"Snapshot saved to: {output_file}")
     return output_file
 
 
+def _install_interrupt_handler(cancel_token: CancellationToken):
+    """Make the first Ctrl+C cancel the run gracefully; a second one aborts"""
+    def handle_interrupt(signum, frame):
+        logger.warning("Cancelling - finishing in-flight files (press Ctrl+C again to abort)")
+        cancel_token.cancel()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    
+    signal.signal(signal.SIGINT, handle_interrupt)
+
+
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Extract content from documents, images and archives to JSON Lines. "
+                    "Starts the GUI when no source is given."
+    )
+    parser.add_argument('source', nargs='?', help="Directory to extract")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help="Continue an interrupted run, skipping files it already finished")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only extract new or changed files since the last incremental run "
+                             "and write a delta output")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="With --incremental, also write the full merged snapshot")
+    parser.add_argument('--config', metavar='FILE',
+                        help=f"JSON file of settings overriding config.py (default: ${Config.CONFIG_FILE_ENV})")
+    parser.add_argument('--output', metavar='DIR',
+                        help="Output folder (overrides OUTPUT_FOLDER)")
+    parser.add_argument('--set', metavar='NAME=VALUE', action='append', default=[],
+                        help="Override any config.py setting, e.g. --set MAX_THREADS=4")
+    parser.add_argument('--profile', action='store_true',
+                        help="Write sampled CPU profiles and memory peaks per extractor and for the "
+                             "slowest files next to the output")
+    args = parser.parse_args()
+    
+    if args.snapshot and not args.incremental:
+        parser.error("--snapshot requires --incremental")
+    
+    # Resolve settings: config.py < config file < environment < command line
+    overrides = {}
+    for item in args.set:
+        name, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"--set expects NAME=VALUE, got {item!r}")
+        overrides[name.strip().upper()] = value
+    if args.output:
+        overrides['OUTPUT_FOLDER'] = args.output
+    if args.profile:
+        # Profile every file in this process (the sampler and tracemalloc do not
+        # see worker processes), one at a time so memory peaks are per file, and
+        # without cached results; --set still overrides these
+        overrides = {'USE_PROCESS_POOL': False, 'MAX_THREADS': 1, 'CACHE_ENABLED': False, **overrides}
+    try:
+        Config.load(args.config, overrides)
+    except (OSError, ValueError) as e:
+        parser.error(f"Invalid configuration: {e}")
+    if args.profile and Config.USE_PROCESS_POOL:
+        parser.error("--profile cannot be combined with USE_PROCESS_POOL=true: "
+                     "files are profiled in this process, not in worker processes")
+    
+    setup_logger()
+    
     # Validate Tesseract installation
     tesseract_valid, tesseract_msg = Config.validate_tesseract()
     if not tesseract_valid:
@@ -213,15 +717,28 @@ def main():
         logger.warning(f"Please install Tesseract and update TESSERACT_PATH in config.py")
     
     # Check if running in GUI or CLI mode
-    if len(sys.argv) > 1:
+    if args.resume:
+        # CLI resume mode
+        cancel_token = CancellationToken()
+        _install_interrupt_handler(cancel_token)
+        try:
+            extract_documents(None, resume_run_id=args.resume, cancel_token=cancel_token)
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            sys.exit(1)
+    
+    elif args.source:
         # CLI mode
-        source_dir = Path(sys.argv[1])
+        source_dir = Path(args.source)
         
         if not source_dir.exists():
             logger.error(f"Directory not found: {source_dir}")
             sys.exit(1)
         
-        extract_documents(source_dir)
+        cancel_token = CancellationToken()
+        _install_interrupt_handler(cancel_token)
+        extract_documents(source_dir, incremental=args.incremental, snapshot=args.snapshot,
+                          cancel_token=cancel_token, profile=args.profile)
     
     else:
         # GUI mode
@@ -233,4 +750,8 @@ def main():
 
 
 if __name__ == '__main__':
+    # Required for worker processes in the frozen (PyInstaller) build
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
@@ -1,6 +1,37 @@
 # Utility modules
-from .logger import setup_logger
-from .progress import ProgressTracker
-from .file_scanner import FileScanner
+#
+# Names are imported on first access, so `from utils.progress import ...`
+# does not also load sqlite3, multiprocessing, ... for the other modules.
+import importlib
 
-__all__ = ['setup_logger', 'ProgressTracker', 'FileScanner']
+_EXPORTS = {
+    'setup_logger': 'logger',
+    'ProgressTracker': 'progress',
+    'FileScanner': 'file_scanner',
+    'StreamingJSONLWriter': 'output_writer',
+    'HybridExecutor': 'executor',
+    'ExtractionCache': 'cache',
+    'RunManifest': 'checkpoint',
+    'FileStateDB': 'state_db',
+    'Deduplicator': 'dedup',
+    'CancellationToken': 'cancellation',
+    'ExtractionCancelled': 'cancellation',
+    'SupervisedProcessPool': 'supervisor',
+    'WorkerFailure': 'supervisor',
+    'WorkerTimeout': 'supervisor',
+    'WorkerCrashed': 'supervisor',
+}
+
+__all__ = ['setup_logger', 'ProgressTracker', 'FileScanner', 'StreamingJSONLWriter',
+           'HybridExecutor', 'ExtractionCache',
+           'RunManifest', 'FileStateDB', 'Deduplicator',
+           'CancellationToken', 'ExtractionCancelled',
+           'SupervisedProcessPool', 'WorkerFailure', 'WorkerTimeout', 'WorkerCrashed']
+
+
+def __getattr__(name):
+    """Import utilities lazily: `from utils import FileScanner`"""
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
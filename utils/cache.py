@@ -0,0 +1,253 @@
+# ============================================================================
+# EXTRACTION CACHE - Persistent cache of extracted content
+# ============================================================================
+
+import json
+import atexit
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from config import Config
+from utils.checksum import CHECKSUM_ERROR
+
+class ExtractionCache:
+    """
+    SQLite-backed cache of extracted content.
+    
+    Entries are keyed by a hash of the file's stat signature, the extractor
+    class and the settings that influence its output (see
+    BaseExtractor.cache_key), so an unchanged file is never extracted twice,
+    and carry the file's checksum, so a hit needs no hashing either. The database is shared by all
+    threads and worker processes; the least recently used entries are evicted
+    once the stored size exceeds Config.CACHE_MAX_SIZE_MB.
+    
+    Lookups read through a connection per thread. New entries and the access
+    times of hits are collected in memory and written by one writer
+    connection, Config.CACHE_WRITE_BATCH at a time or every
+    Config.CACHE_FLUSH_INTERVAL seconds, so extraction threads do not queue
+    for SQLite's write lock. Whatever is still pending is written by flush()
+    at the end of a run or process; a worker that is killed loses its
+    unwritten entries, which only costs a re-extraction later.
+    """
+    
+    _instance = None
+    _instance_lock = threading.Lock()
+    
+    # Check the size bound every N stores instead of on every write
+    EVICT_CHECK_INTERVAL = 50
+    
+    def __init__(self, cache_dir: Optional[Path] = None, max_size_mb: Optional[int] = None):
+        """
+        Initialize cache
+        
+        Args:
+            cache_dir: Folder holding the database (defaults to Config.CACHE_FOLDER)
+            max_size_mb: Size bound for stored entries (defaults to Config.CACHE_MAX_SIZE_MB)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir or Config.CACHE_FOLDER)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / 'extraction_cache.db'
+        self.max_size_bytes = (max_size_mb or Config.CACHE_MAX_SIZE_MB) * 1024 * 1024
+        self._local = threading.local()
+        self._stores_since_check = 0
+        
+        # Writes waiting for the next flush; _pending_lock guards them,
+        # _write_lock the writer connection
+        self._pending: Dict[str, tuple] = {}  # cache_key -> (payload, size, stored at)
+        self._accessed: Dict[str, float] = {}  # cache_key -> time of the last hit
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        
+        conn = self._writer = self._open(check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                cache_key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)')
+        conn.commit()
+        atexit.register(self.flush)
+    
+    @classmethod
+    def get_instance(cls) -> Optional['ExtractionCache']:
+        """Get the per-process cache, or None if caching is disabled"""
+        if not Config.CACHE_ENABLED:
+            return None
+        
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+    
+    @classmethod
+    def flush_instance(cls):
+        """Write the pending entries of the per-process cache, if it was opened"""
+        with cls._instance_lock:
+            instance = cls._instance
+        if instance is not None:
+            instance.flush()
+    
+    def _open(self, check_same_thread: bool = True) -> 'sqlite3.Connection':
+        """Open a connection to the database"""
+        import sqlite3
+        
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=check_same_thread)
+        # WAL stays consistent without a sync per commit; a crash loses only recent entries
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def _connect(self) -> 'sqlite3.Connection':
+        """Get this thread's read connection (sqlite connections are not thread-safe)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+    
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached extraction
+        
+        Args:
+            cache_key: Key from BaseExtractor.cache_key()
+        
+        Returns:
+            Dictionary with 'content', 'status', 'error_message' and (if
+            anything was cut, or the file was checksummed) 'truncated' and
+            'checksum', or None on a miss
+        """
+        try:
+            with self._pending_lock:
+                pending = self._pending.get(cache_key)
+            if pending is not None:
+                payload = pending[0]
+            else:
+                row = self._connect().execute(
+                    'SELECT payload FROM entries WHERE cache_key = ?', (cache_key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                payload = row[0]
+            
+            with self._pending_lock:
+                self._accessed[cache_key] = time.time()
+            self._flush_if_due()
+            return json.loads(zlib.decompress(payload).decode('utf-8'))
+        
+        except Exception as e:
+            self.logger.warning(f"Cache lookup failed: {e}")
+            return None
+    
+    def put(self, cache_key: str, content: Any, status: str, error_message: Optional[str] = None,
+            truncated: Optional[Dict[str, Any]] = None, checksum: Optional[str] = None):
+        """Store extracted content (and the result's 'truncated' field and checksum, if any)"""
+        try:
+            entry = {
+                'content': content,
+                'status': status,
+                'error_message': error_message
+            }
+            if truncated:
+                entry['truncated'] = truncated
+            if checksum and checksum != CHECKSUM_ERROR:
+                entry['checksum'] = checksum
+            payload = zlib.compress(json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        
+        except Exception as e:
+            self.logger.warning(f"Cache store failed: {e}")
+            return
+        
+        with self._pending_lock:
+            self._pending[cache_key] = (payload, len(payload), time.time())
+        self._flush_if_due()
+    
+    def _flush_if_due(self):
+        """Flush once a batch is full or the flush interval has passed"""
+        with self._pending_lock:
+            waiting = len(self._pending) + len(self._accessed)
+            due = waiting >= Config.CACHE_WRITE_BATCH or (
+                waiting and time.monotonic() - self._last_flush >= Config.CACHE_FLUSH_INTERVAL)
+        if due:
+            # Another thread already writing takes the next batch with it
+            self.flush(block=False)
+    
+    def flush(self, block: bool = True):
+        """
+        Write pending entries and access times in one transaction
+        
+        Args:
+            block: Wait for a flush running in another thread instead of
+                   leaving the pending writes to the next one
+        """
+        if not self._write_lock.acquire(blocking=block):
+            return
+        try:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+                accessed, self._accessed = self._accessed, {}
+                self._last_flush = time.monotonic()
+            if not pending and not accessed:
+                return
+            
+            try:
+                with self._writer:
+                    self._writer.executemany(
+                        'INSERT OR REPLACE INTO entries (cache_key, payload, size, last_access) '
+                        'VALUES (?, ?, ?, ?)',
+                        [(cache_key, *entry) for cache_key, entry in pending.items()]
+                    )
+                    self._writer.executemany(
+                        'UPDATE entries SET last_access = ? WHERE cache_key = ?',
+                        [(accessed_at, cache_key) for cache_key, accessed_at in accessed.items()]
+                    )
+            except Exception as e:
+                self.logger.warning(f"Cache store failed: {e}")
+                return
+            
+            self._stores_since_check += len(pending)
+            if self._stores_since_check >= self.EVICT_CHECK_INTERVAL:
+                self._stores_since_check = 0
+                self._evict()
+        finally:
+            self._write_lock.release()
+    
+    def evict(self):
+        """Drop least recently used entries until the cache fits its size bound"""
+        with self._write_lock:
+            self._evict()
+    
+    def _evict(self):
+        """evict() for the holder of the write lock"""
+        try:
+            conn = self._writer
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_size_bytes:
+                return
+            
+            # Free down to 90% of the bound so eviction does not run on every store
+            to_free = total - int(self.max_size_bytes * 0.9)
+            freed = 0
+            victims = []
+            for cache_key, size in conn.execute(
+                'SELECT cache_key, size FROM entries ORDER BY last_access'
+            ):
+                victims.append((cache_key,))
+                freed += size
+                if freed >= to_free:
+                    break
+            
+            conn.executemany('DELETE FROM entries WHERE cache_key = ?', victims)
+            conn.commit()
+            self.logger.info(f"Evicted {len(victims)} cache entries ({freed / (1024 * 1024):.1f} MB)")
+        
+        except Exception as e:
+            self.logger.warning(f"Cache eviction failed: {e}")
@@ -0,0 +1,76 @@
+# ============================================================================
+# CANCELLATION - Cooperative cancellation shared by threads and processes
+# ============================================================================
+
+import threading
+from typing import Optional
+
+class ExtractionCancelled(BaseException):
+    """
+    Raised at a cancellation checkpoint inside an extractor.
+    
+    Derives from BaseException (like KeyboardInterrupt) so the extractors'
+    broad `except Exception` handlers do not turn it into an error result.
+    """
+
+
+class _LocalFlag:
+    """In-process stand-in for a shared ctypes value"""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self):
+        self.value = 0
+
+
+class CancellationToken:
+    """
+    Flag that tells running extractions to stop at their next checkpoint.
+    
+    Once shared, backed by a lock-free shared-memory flag so worker processes
+    see the same value as worker threads, and a worker killed mid-check can
+    never leave a lock held. The token reaches the workers when they are
+    started (see install_token), never through task arguments.
+    """
+    
+    def __init__(self):
+        # Plain flag until a process pool needs it; thread-only runs never
+        # import multiprocessing
+        self._flag = _LocalFlag()
+    
+    def share(self):
+        """Move the flag to shared memory (call before starting worker processes)"""
+        local = self._flag
+        if isinstance(local, _LocalFlag):
+            import multiprocessing
+            self._flag = multiprocessing.get_context('spawn').RawValue('b', local.value)
+            if local.value:  # Cancelled while switching
+                self._flag.value = 1
+    
+    def cancel(self):
+        """Request cancellation"""
+        self._flag.value = 1
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested"""
+        return bool(self._flag.value)
+    
+    def raise_if_cancelled(self):
+        """Raise ExtractionCancelled if cancellation was requested"""
+        if self._flag.value:
+            raise ExtractionCancelled()
+
+
+# Token of the run the current worker thread/process belongs to
+_local = threading.local()
+
+
+def install_token(token: Optional[CancellationToken]):
+    """Pool initializer: bind a token to the current worker"""
+    _local.token = token
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Get the token bound to the current worker (None outside a run)"""
+    return getattr(_local, 'token', None)
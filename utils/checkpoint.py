@@ -0,0 +1,142 @@
+# ============================================================================
+# CHECKPOINT - Run manifest for crash-safe resume
+# ============================================================================
+
+import os
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Union
+import logging
+
+from config import Config
+
+class RunManifest:
+    """
+    Append-only record of the files a run has finished.
+    
+    The manifest lives in Config.RUNS_FOLDER as <run_id>.manifest.jsonl. Its
+    first line describes the run (source, output file); every later line is a
+    checkpoint written right after the output file was fsynced, listing the
+    files completed since the previous checkpoint and the output position at
+    that moment (shard, its size, index size). A resumed run truncates the
+    output back to the last checkpoint, so a crash can lose at most the
+    records written since the last sync and never leaves duplicates behind.
+    """
+    
+    def __init__(self, run_id: str):
+        """
+        Initialize manifest
+        
+        Args:
+            run_id: Run identifier (timestamp of the original run)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.run_id = run_id
+        self.manifest_path = Path(Config.RUNS_FOLDER) / f"{run_id}.manifest.jsonl"
+        self.source: Union[str, List[str], None] = None
+        self.options: Dict[str, Any] = {}  # Run mode flags restored on resume
+        self.output_file: Optional[Path] = None
+        self.completed: Set[str] = set()
+        self.output_offset = 0
+        self.output_position: Dict[str, Any] = {}  # Shard and index position, see StreamingJSONLWriter.resume
+        self.is_complete = False
+        self._pending: List[str] = []
+        self._file = None
+    
+    @classmethod
+    def create(cls, run_id: str, source: Union[str, List[str]], output_file: Path,
+               options: Optional[Dict[str, Any]] = None) -> 'RunManifest':
+        """Start a manifest for a new run"""
+        manifest = cls(run_id)
+        manifest.source = source
+        manifest.options = options or {}
+        manifest.output_file = Path(output_file)
+        manifest.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest._file = open(manifest.manifest_path, 'w', encoding='utf-8')
+        manifest._write_line({
+            'type': 'run',
+            'run_id': run_id,
+            'source': source,
+            'output_file': str(output_file),
+            'options': manifest.options,
+            'started': datetime.now().isoformat()
+        })
+        return manifest
+    
+    @classmethod
+    def load(cls, run_id: str) -> 'RunManifest':
+        """
+        Load an existing manifest for resuming
+        
+        Raises:
+            FileNotFoundError: If no manifest exists for run_id
+        """
+        manifest = cls(run_id)
+        if not manifest.manifest_path.exists():
+            raise FileNotFoundError(f"No manifest for run {run_id}: {manifest.manifest_path}")
+        
+        with open(manifest.manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash - the checkpoint never happened
+                    break
+                
+                if entry['type'] == 'run':
+                    manifest.source = entry['source']
+                    manifest.output_file = Path(entry['output_file'])
+                    manifest.options = entry.get('options', {})
+                elif entry['type'] == 'checkpoint':
+                    manifest.completed.update(entry['completed'])
+                    manifest.output_offset = entry['output_offset']
+                    manifest.output_position = entry.get('output_position', {})
+                elif entry['type'] == 'complete':
+                    manifest.is_complete = True
+        
+        # Continue appending checkpoints to the same manifest
+        manifest._file = open(manifest.manifest_path, 'a', encoding='utf-8')
+        return manifest
+    
+    def add(self, file_path: str):
+        """Record a file whose result has been written (made durable at the next checkpoint)"""
+        self._pending.append(file_path)
+    
+    def checkpoint(self, output_offset: int, output_position: Optional[Dict[str, Any]] = None):
+        """
+        Persist pending completions
+        
+        Must be called only after the output file has been fsynced up to output_offset.
+        
+        Args:
+            output_offset: Byte size of the shard being written
+            output_position: Shard number, records per shard and index size
+        """
+        self._write_line({
+            'type': 'checkpoint',
+            'completed': self._pending,
+            'output_offset': output_offset,
+            'output_position': output_position or {}
+        })
+        self.completed.update(self._pending)
+        self.output_offset = output_offset
+        self.output_position = output_position or {}
+        self._pending = []
+    
+    def mark_complete(self):
+        """Record that the run finished every file"""
+        self._write_line({'type': 'complete', 'finished': datetime.now().isoformat()})
+        self.is_complete = True
+    
+    def close(self):
+        """Close the manifest file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _write_line(self, entry: dict):
+        """Append one entry and force it to disk"""
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
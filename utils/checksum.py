@@ -0,0 +1,125 @@
+# ============================================================================
+# CHECKSUM - Pluggable file checksums
+# ============================================================================
+
+import sys
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+import logging
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cryptographic algorithms from hashlib, plus non-crypto ones from the
+# optional xxhash package
+HASHLIB_ALGORITHMS = {'md5', 'sha1', 'sha256', 'sha512', 'blake2b', 'blake2s'}
+XXHASH_ALGORITHMS = {'xxh64', 'xxh3_64', 'xxh3_128'}
+
+# Fallback when the configured algorithm is not available
+FALLBACK_ALGORITHM = 'blake2b'
+
+# Error marker kept from the original MD5 implementation
+CHECKSUM_ERROR = 'error_calculating_checksum'
+
+_resolved = {}
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def resolve_algorithm(algorithm: Optional[str] = None) -> str:
+    """
+    Get the checksum algorithm to use
+    
+    Args:
+        algorithm: Algorithm name (defaults to Config.CHECKSUM_ALGORITHM)
+    
+    Returns:
+        The algorithm, or FALLBACK_ALGORITHM if it is unknown or its
+        package is not installed (warned once)
+    """
+    algorithm = (algorithm or Config.CHECKSUM_ALGORITHM).lower()
+    if algorithm not in _resolved:
+        resolved = algorithm
+        if algorithm in XXHASH_ALGORITHMS:
+            try:
+                import xxhash  # noqa: F401
+            except ImportError:
+                logger.warning(f"{algorithm} needs the xxhash package (pip install xxhash) - "
+                               f"using {FALLBACK_ALGORITHM}")
+                resolved = FALLBACK_ALGORITHM
+        elif algorithm not in HASHLIB_ALGORITHMS:
+            logger.warning(f"Unknown checksum algorithm '{algorithm}' - using {FALLBACK_ALGORITHM}")
+            resolved = FALLBACK_ALGORITHM
+        _resolved[algorithm] = resolved
+    return _resolved[algorithm]
+
+
+def checksum_field(algorithm: Optional[str] = None) -> str:
+    """Result key holding the checksum, e.g. 'md5_checksum' (unchanged for MD5)"""
+    return f"{resolve_algorithm(algorithm)}_checksum"
+
+
+def checksums_enabled(file_path: Path) -> bool:
+    """Whether result records for this file carry a checksum"""
+    if not Config.CALCULATE_CHECKSUMS:
+        return False
+    category = Config.get_file_type_category(file_path.suffix)
+    return category not in Config.CHECKSUM_SKIP_TYPES
+
+
+def new_hasher(algorithm: Optional[str] = None):
+    """Create a hash object with update()/hexdigest()"""
+    algorithm = resolve_algorithm(algorithm)
+    if algorithm in XXHASH_ALGORITHMS:
+        import xxhash
+        return getattr(xxhash, algorithm)()
+    return hashlib.new(algorithm)
+
+
+def checksum_bytes(data, algorithm: Optional[str] = None) -> str:
+    """Checksum of an in-memory buffer (bytes, bytearray, mmap)"""
+    hasher = new_hasher(algorithm)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def checksum_file(file_path: Path, algorithm: Optional[str] = None) -> str:
+    """
+    Checksum a file by streaming it with a large buffer
+    
+    Uses hashlib.file_digest on Python 3.11+ for hashlib algorithms, which
+    reads straight into the hash without Python-level chunk copies.
+    """
+    algorithm = resolve_algorithm(algorithm)
+    with open(file_path, 'rb', buffering=0) as f:
+        if algorithm in HASHLIB_ALGORITHMS and sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, algorithm).hexdigest()
+        
+        hasher = new_hasher(algorithm)
+        buffer = bytearray(Config.CHECKSUM_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            hasher.update(view[:size])
+        return hasher.hexdigest()
+
+
+def submit_checksum(file_path: Path, algorithm: Optional[str] = None) -> Future:
+    """
+    Hash a file on the background checksum pool
+    
+    Hashing releases the GIL, so it overlaps with the extraction running in
+    the calling thread. The pool is created per process on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=Config.CHECKSUM_THREADS,
+                                       thread_name_prefix='checksum')
+    return _pool.submit(checksum_file, file_path, algorithm)
@@ -0,0 +1,300 @@
+# ============================================================================
+# DEDUPLICATION - Find byte-identical files as they are discovered
+# ============================================================================
+
+import os
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+from config import Config
+from utils.checksum import checksum_field
+
+class _Group:
+    """Files of one size and extension, hashed by one pool task at a time"""
+    
+    def __init__(self, size: int, first: Path):
+        self.size = size
+        self.first: Optional[Path] = first  # Not hashed until a second file arrives
+        self.queue: List[Path] = []  # Files waiting for the group's hashing task
+        self.busy = False  # A hashing task is running for the group
+        self.representatives: Dict[str, List[Path]] = {}  # Fast hash -> representatives
+        self.full_hashes: Dict[Path, Optional[str]] = {}
+
+
+class Deduplicator:
+    """
+    Find byte-identical files as they are discovered, so each distinct
+    content is extracted once.
+    
+    Files are grouped by size and extension (known from the scan, so free;
+    the extension picks the extractor, so identical bytes named .txt and .md
+    are still extracted separately). A file is only hashed when an earlier
+    file shares its group. Representatives are then indexed by a fast hash
+    of a few sampled blocks, so each file takes one lookup however large
+    its group, and only a fast-hash match is confirmed with a full-content
+    hash. Each file is hashed at most once per kind.
+    
+    Hashing runs on a small thread pool (one task per group at a time, so
+    a group is only touched by one thread), not in the thread that calls
+    add(): that thread also writes results and submits extractions. A file
+    that needs hashing is held back until it is decided; take_released()
+    returns the held files that turned out to be distinct.
+    
+    The first file of each content is extracted (the representative); later
+    copies are written as lightweight 'duplicate' records pointing to its
+    file_id, either when its result arrives or, if it has already been
+    written, right away (see take_ready).
+    """
+    
+    def __init__(self, sample_bytes: Optional[int] = None):
+        """
+        Initialize deduplicator
+        
+        Args:
+            sample_bytes: Size of each sampled block (defaults to Config.DEDUP_SAMPLE_BYTES)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.sample_bytes = sample_bytes or Config.DEDUP_SAMPLE_BYTES
+        self.duplicate_count = 0
+        self.held = 0  # Files held back whose decision has not been taken yet
+        self._groups: Dict[Tuple[int, str], _Group] = {}
+        self._decided: List[Tuple[Path, Optional[Path]]] = []  # (file, representative or None) from the pool
+        self._lock = threading.Lock()  # Guards held, _decided and the group queues
+        self._decision = threading.Condition(self._lock)  # Notified when a file is decided
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._waiting: Dict[Path, List[Path]] = {}  # Copies whose representative is running
+        self._canonical: Dict[Path, dict] = {}  # Finished representatives (fields copies need)
+        self._failed: Set[Path] = set()  # Representatives without a result
+        self._ready: List[Tuple[Path, dict]] = []  # Copies of finished representatives
+    
+    def add(self, file_path: Path, size: int) -> bool:
+        """
+        Register a discovered file
+        
+        Args:
+            file_path: File about to be extracted
+            size: File size in bytes
+        
+        Returns:
+            Whether the file is held back for hashing (do not extract it now;
+            it comes back from take_released() unless it is a copy)
+        """
+        key = (size, file_path.suffix.lower())
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                # Nothing to compare with yet, so the file is not hashed until a second one arrives
+                self._groups[key] = _Group(size, file_path)
+                return False
+            
+            group.queue.append(file_path)
+            self.held += 1
+            if group.busy:
+                return True  # Picked up by the task already running for the group
+            group.busy = True
+            
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=Config.DEDUP_HASH_THREADS,
+                                                thread_name_prefix='dedup')
+        self._pool.submit(self._hash_group, group)
+        return True
+    
+    def take_released(self) -> List[Path]:
+        """
+        Take the decisions made by the hashing pool
+        
+        Copies are queued for resolve()/take_ready() like copies found by
+        add() used to be; the other held files are returned.
+        
+        Returns:
+            Held files that are distinct (or whose representative failed):
+            extract them now
+        """
+        with self._lock:
+            decided, self._decided = self._decided, []
+            self.held -= len(decided)
+        
+        released = []
+        for file_path, representative in decided:
+            if representative is None or representative in self._failed:
+                released.append(file_path)
+                continue
+            
+            self.duplicate_count += 1
+            canonical = self._canonical.get(representative)
+            if canonical is None:
+                self._waiting.setdefault(representative, []).append(file_path)
+            else:
+                self._ready.append((file_path, canonical))
+        return released
+    
+    def wait_decided(self, timeout: float):
+        """Block until a held file is decided (or the timeout passes)"""
+        with self._decision:
+            if not self._decided:
+                self._decision.wait(timeout)
+    
+    def close(self):
+        """Stop the hashing pool (files still held back are dropped)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _hash_group(self, group: _Group):
+        """Pool task: decide the queued files of a group, one after another"""
+        while True:
+            with self._lock:
+                if not group.queue:
+                    group.busy = False
+                    return
+                file_path = group.queue.pop(0)
+                first, group.first = group.first, None
+            
+            try:
+                if first is not None:
+                    self._index(group, first)
+                representative = self._match(group, file_path)
+            except Exception as e:
+                self.logger.warning(f"Could not compare {file_path}: {e}")
+                representative = None  # Extracted on its own
+            
+            with self._decision:
+                self._decided.append((file_path, representative))
+                self._decision.notify_all()
+    
+    def _index(self, group: _Group, file_path: Path):
+        """Index the first file of a group by its fast hash, once a second file joins it"""
+        fast = self.fast_hash(file_path, group.size)
+        if fast is not None:
+            group.representatives.setdefault(fast, []).append(file_path)
+    
+    def _match(self, group: _Group, file_path: Path) -> Optional[Path]:
+        """Representative the file is a copy of, or None (it becomes a representative)"""
+        fast = self.fast_hash(file_path, group.size)
+        if fast is None:
+            return None  # Unreadable files are extracted on their own
+        
+        # More than one representative per key only if the sampled blocks match but the content differs
+        candidates = group.representatives.setdefault(fast, [])
+        for representative in candidates:
+            if representative in self._failed or not self._same_content(group, representative, file_path):
+                continue
+            return representative
+        
+        candidates.append(file_path)
+        return None
+    
+    def resolve(self, representative: Path, result: Optional[dict]) -> List[Path]:
+        """
+        Record the result of a representative
+        
+        Args:
+            representative: File that was extracted
+            result: Its result record, or None if it failed without one
+        
+        Returns:
+            Copies found while it was running (write them with duplicate_record,
+            or as failed if result is None)
+        """
+        if result is None:
+            self._failed.add(representative)
+        else:
+            field = checksum_field()
+            self._canonical[representative] = {
+                key: result[key]
+                for key in ('file_id', 'file_path', 'file_size_bytes', field)
+                if key in result
+            }
+        return self._waiting.pop(representative, [])
+    
+    def take_ready(self) -> List[Tuple[Path, dict]]:
+        """Copies found after their representative was written: [(path, canonical)]"""
+        ready, self._ready = self._ready, []
+        return ready
+    
+    def _same_content(self, group: _Group, first: Path, second: Path) -> bool:
+        """Confirm that two files with the same fast hash have the same full hash"""
+        digests = []
+        for file_path in (first, second):
+            if file_path not in group.full_hashes:
+                group.full_hashes[file_path] = self.full_hash(file_path, group.size)
+            digests.append(group.full_hashes[file_path])
+        return digests[0] is not None and digests[0] == digests[1]
+    
+    def fast_hash(self, file_path: Path, size: int) -> Optional[str]:
+        """
+        Hash the first, middle and last sample blocks of a file
+        
+        Small files are hashed completely, so their full_hash is free.
+        """
+        try:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(file_path, 'rb') as f:
+                if size <= 3 * self.sample_bytes:
+                    digest.update(f.read())
+                else:
+                    for offset in (0, size // 2, size - self.sample_bytes):
+                        f.seek(offset)
+                        digest.update(f.read(self.sample_bytes))
+            return digest.hexdigest()
+        except OSError as e:
+            self.logger.warning(f"Could not hash {file_path}: {e}")
+            return None
+    
+    def full_hash(self, file_path: Path, size: int) -> Optional[str]:
+        """Hash the complete content of a file"""
+        if size <= 3 * self.sample_bytes:
+            return 'sampled'  # fast_hash already covered every byte
+        
+        try:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        except OSError as e:
+            self.logger.warning(f"Could not hash {file_path}: {e}")
+            return None
+    
+    def duplicate_record(self, file_path: Path, canonical: dict,
+                         stat: Optional[os.stat_result] = None) -> dict:
+        """
+        Build the result record of a duplicate file
+        
+        Args:
+            file_path: Path of the duplicate
+            canonical: Result record of the extracted representative
+            stat: Stat result from the scan, if any
+        
+        Returns:
+            Result dictionary without content, pointing to the canonical file_id
+        """
+        import uuid
+        
+        record = {
+            'file_id': str(uuid.uuid4()),
+            'file_name': file_path.name,
+            'file_path': str(file_path.absolute()),
+            'file_size_bytes': canonical.get('file_size_bytes'),
+            'file_extension': file_path.suffix.lower(),
+        }
+        try:
+            stat = stat or os.stat(file_path)
+            record['modified_date'] = datetime.fromtimestamp(stat.st_mtime).isoformat()
+        except OSError:
+            pass
+        field = checksum_field()
+        if field in canonical:
+            record[field] = canonical[field]
+        
+        record.update({
+            'duplicate_of': canonical.get('file_id'),
+            'duplicate_of_path': canonical.get('file_path'),
+            'extraction_status': 'duplicate',
+            'extraction_timestamp': datetime.now().isoformat()
+        })
+        return record
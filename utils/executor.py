@@ -0,0 +1,201 @@
+# ============================================================================
+# EXECUTOR - Hybrid thread + process execution engine
+# ============================================================================
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+import logging
+
+from config import Config
+from utils.cancellation import CancellationToken, install_token
+
+class HybridExecutor:
+    """
+    Run extraction tasks on threads or processes depending on the work.
+    
+    I/O-heavy work (text decoding, hashing, archive reads) stays on a thread
+    pool. CPU-heavy extractors (OCR preprocessing, PDF layout analysis,
+    markdown rendering) hold the GIL, and crash-prone ones run native code
+    that can hang or segfault, so both are sent to a supervised process pool
+    sized to the number of cores, where every file runs under a time and
+    memory limit. Both pools hand back standard futures, so callers can wait
+    on them together.
+    
+    Tasks carry an estimate of the memory they need. map_unordered only
+    starts a task while the estimates of all running tasks fit into the
+    memory budget, so a few huge files cannot run at once and exhaust memory;
+    one task always runs, however large.
+    """
+    
+    # How long to collect results before asking a starved task source again
+    STARVED_POLL_INTERVAL = 0.1
+    
+    def __init__(self, max_threads: Optional[int] = None, max_processes: Optional[int] = None,
+                 cancel_token: Optional[CancellationToken] = None, memory_budget_mb: Optional[int] = None):
+        """
+        Initialize executor
+        
+        Args:
+            max_threads: Thread pool size (defaults to Config.MAX_THREADS)
+            max_processes: Process pool size (defaults to Config.MAX_PROCESSES)
+            cancel_token: Token bound to every worker; once cancelled, no new
+                          tasks are started and queued ones are dropped
+            memory_budget_mb: Estimated memory of the running tasks allowed at
+                              once (defaults to Config.MEMORY_BUDGET_MB; 0 = no limit)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_threads = max_threads or Config.MAX_THREADS
+        self.max_processes = max_processes or Config.MAX_PROCESSES
+        self.cancel_token = cancel_token
+        budget_mb = Config.MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb
+        self.memory_budget = budget_mb * 1024 * 1024
+        self.memory_in_flight = 0  # Estimated bytes of the running tasks
+        self.memory_peak = 0
+        self.memory_waits = 0  # Times a task waited for memory
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=self.max_threads,
+            initializer=install_token,
+            initargs=(cancel_token,)
+        )
+        self.process_pool = None  # Created on first isolated task
+    
+    def _uses_process_pool(self, isolated: bool) -> bool:
+        return (isolated or Config.ISOLATE_ALL_FILES) and Config.USE_PROCESS_POOL
+    
+    def submit(self, fn: Callable, *args, isolated: bool = False) -> Future:
+        """
+        Submit a task to the pool that suits it
+        
+        Args:
+            fn: Module-level callable (must be picklable for the process pool)
+            *args: Arguments for fn
+            isolated: Run in a supervised worker process instead of the thread pool
+        
+        Returns:
+            Future for the task result (fails with WorkerTimeout/WorkerCrashed
+            if an isolated task breaches its limits or kills its worker)
+        """
+        if self._uses_process_pool(isolated):
+            return self._get_process_pool().submit(fn, *args)
+        return self.thread_pool.submit(fn, *args)
+    
+    def map_unordered(self, fn: Callable, tasks: Iterable[Tuple[Any, tuple, bool, int]],
+                      window: Optional[int] = None) -> Iterator[Tuple[Any, Future]]:
+        """
+        Run tasks with bounded submission and yield them as they finish
+        
+        Tasks are pulled from the iterable lazily and at most `window` of them
+        are in flight at once; a new task is submitted each time one completes.
+        This bounds scheduler memory for huge inputs and lets the first results
+        come back before the whole input has been submitted.
+        
+        The iterable may yield None when it has no task ready yet (a scan
+        still walking); finished tasks are then collected for a short while
+        before it is asked again.
+        
+        A task whose memory estimate does not fit into what is left of the
+        memory budget waits (and the tasks behind it with it) until enough
+        running tasks have finished, or runs alone if it needs more than the
+        whole budget. Tasks sent to worker processes count at most their
+        worker's memory limit, beyond which the worker is killed anyway.
+        
+        Args:
+            fn: Module-level callable run for every task
+            tasks: Iterable of (key, args, isolated, memory_bytes) tuples, or
+                   None for "not yet"
+            window: Max tasks in flight (defaults to Config.CHUNK_SIZE)
+        
+        Yields:
+            (key, future) pairs for finished tasks, in completion order
+        """
+        window = max(window or Config.CHUNK_SIZE, self.max_threads + self.max_processes)
+        tasks = iter(tasks)
+        in_flight = {}  # Future -> (key, memory estimate)
+        held = None  # Task waiting for memory
+        exhausted = False
+        
+        while True:
+            # Stop feeding work once cancelled; tasks that have not started are
+            # dropped, running ones stop at their next checkpoint
+            if not exhausted and self.cancel_token and self.cancel_token.cancelled:
+                exhausted = True
+                held = None
+                for future in in_flight:
+                    future.cancel()
+            
+            # Refill the window while the memory budget allows
+            starved = False
+            while not exhausted and len(in_flight) < window:
+                if held is not None:
+                    task, held = held, None
+                else:
+                    try:
+                        task = next(tasks)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if task is None:
+                        starved = True
+                        break
+                
+                key, args, isolated, memory = task
+                memory = self._memory_estimate(memory, isolated)
+                if in_flight and not self._fits(memory):
+                    held = task
+                    self.memory_waits += 1
+                    break
+                
+                future = self.submit(fn, *args, isolated=isolated)
+                in_flight[future] = (key, memory)
+                self.memory_in_flight += memory
+                self.memory_peak = max(self.memory_peak, self.memory_in_flight)
+            
+            if not in_flight:
+                if exhausted:
+                    return
+                continue  # The iterable waits for its next task itself
+            
+            done, _ = wait(in_flight, timeout=self.STARVED_POLL_INTERVAL if starved else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                key, memory = in_flight.pop(future)
+                self.memory_in_flight -= memory
+                yield key, future
+    
+    def _memory_estimate(self, memory: int, isolated: bool) -> int:
+        """A task's estimate, capped at the worker memory limit if it runs in a worker process"""
+        if self._uses_process_pool(isolated) and Config.WORKER_MEMORY_LIMIT_MB:
+            return min(memory, Config.WORKER_MEMORY_LIMIT_MB * 1024 * 1024)
+        return memory
+    
+    def _fits(self, memory: int) -> bool:
+        """Whether a task fits into what is left of the memory budget"""
+        return not self.memory_budget or self.memory_in_flight + memory <= self.memory_budget
+    
+    def _get_process_pool(self) -> 'SupervisedProcessPool':
+        """Create the process pool lazily so text-only runs never spawn workers"""
+        if self.process_pool is None:
+            from utils.supervisor import SupervisedProcessPool
+            
+            self.logger.info(f"Starting process pool with {self.max_processes} workers")
+            self.process_pool = SupervisedProcessPool(
+                max_workers=self.max_processes,
+                timeout=Config.EXTRACTION_TIMEOUT_SECONDS,
+                memory_limit_mb=Config.WORKER_MEMORY_LIMIT_MB,
+                cancel_token=self.cancel_token
+            )
+        return self.process_pool
+    
+    def shutdown(self, wait: bool = True):
+        """Shut down both pools"""
+        self.thread_pool.shutdown(wait=wait)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=wait)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=True)
+        return False
+
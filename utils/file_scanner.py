@@ -2,17 +2,36 @@
 # FILE SCANNER - Recursive directory scanning
 # ============================================================================
 
+import os
+import re
+import heapq
+import threading
+import stat as stat_module
+import fnmatch
 from pathlib import Path
-from typing import List, Set
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from config import Config
+from extractor import registry as extractor_registry
+from extractor.file_source import SAMPLING_POLICIES, is_too_large
 import logging
 
+# Hidden/system attribute bits (Windows only; dotfiles are hidden everywhere)
+_WINDOWS_HIDDEN = (stat_module.FILE_ATTRIBUTE_HIDDEN | stat_module.FILE_ATTRIBUTE_SYSTEM
+                   if os.name == 'nt' else 0)
+
 class FileScanner:
     """Scan directories and collect supported files"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.supported_extensions = self._get_all_extensions()
+        self.file_stats: Dict[Path, os.stat_result] = {}  # Filled while scanning, emptied as records are written
+        self.skipped: Dict[str, int] = {}  # Skip counts of the last scan, by reason
+        
+        # All SKIP_PATTERNS (lower-case globs) as one compiled regex
+        patterns = [fnmatch.translate(p.lower()) for p in Config.SKIP_PATTERNS]
+        self._skip_regex = re.compile('|'.join(patterns) if patterns else r'(?!)')
     
     def _get_all_extensions(self) -> Set[str]:
         """Get all supported file extensions"""
@@ -28,80 +47,258 @@ class FileScanner:
         Args:
             directory: Directory to scan
             recursive: Scan subdirectories
-            
+        
         Returns:
             List of file paths
         """
-        files = []
+        return list(self.iter_directory(directory, recursive))
+    
+    def iter_directory(self, directory: Path, recursive: bool = True, cancel_token=None,
+                       threads: Optional[int] = None, deterministic: Optional[bool] = None) -> Iterator[Path]:
+        """
+        Yield supported files while the directory is being walked
         
-        try:
-            if recursive:
-                # Recursive scan - use rglob with wildcard
-                for file_path in directory.rglob('*'):
-                    if file_path.is_file():
-                        if self._is_supported(file_path):
-                            files.append(file_path)
-                            self.logger.debug(f"Found: {file_path.name}")
-            else:
-                # Only immediate directory
-                for file_path in directory.glob('*'):
-                    if file_path.is_file():
-                        if self._is_supported(file_path):
-                            files.append(file_path)
-                            self.logger.debug(f"Found: {file_path.name}")
-            
-            self.logger.info(f"Found {len(files)} supported files in {directory}")
+        Walks with os.scandir and filters while walking: skipped directories
+        (SKIP_PATTERNS, hidden ones with SKIP_SYSTEM_FILES) are never
+        entered, and empty, oversized, hidden and unsupported files are
+        dropped before they are yielded. The stat result of every yielded
+        file is stored in file_stats first.
         
-        except PermissionError as e:
-            self.logger.warning(f"Permission denied: {directory}")
-        except Exception as e:
-            self.logger.error(f"Error scanning {directory}: {e}")
+        With more than one thread, several directories are listed at once,
+        which hides the per-directory round trip of network drives.
         
-        return files
-    
-    def _is_supported(self, file_path: Path) -> bool:
-        """Check if file type is supported"""
-        file_path_lower = str(file_path).lower()
+        Args:
+            directory: Directory to scan
+            recursive: Scan subdirectories
+            cancel_token: Stops the walk at the next directory once cancelled
+            threads: Directory listing threads (defaults to Config.SCAN_THREADS)
+            deterministic: Keep the single-threaded order when walking with
+                           threads (defaults to Config.SCAN_DETERMINISTIC)
         
-        # Check for multi-part extensions first (.tar.gz, .tar.bz2, etc.)
-        if file_path_lower.endswith(('.tar.gz', '.tar.bz2')):
-            self.logger.debug(f"Supported (multi-ext): {file_path.name}")
-            return True
+        Yields:
+            File paths, depth-first in name order (directories in listing
+            completion order with threads, unless deterministic)
+        """
+        threads = threads or Config.SCAN_THREADS
+        if deterministic is None:
+            deterministic = Config.SCAN_DETERMINISTIC
         
-        # Check standard extension
-        ext = file_path.suffix.lower()
-        is_supported = ext in self.supported_extensions
+        found = 0
+        skipped = {'pattern': 0, 'hidden': 0, 'empty': 0, 'too_large': 0, 'unsupported': 0}
+        self.skipped = skipped
         
-        if is_supported:
-            self.logger.debug(f"Supported ({ext}): {file_path.name}")
+        if threads > 1:
+            listings = self._walk_parallel(str(directory), recursive, cancel_token, threads, deterministic)
         else:
-            self.logger.debug(f"Unsupported ({ext}): {file_path.name}")
+            listings = self._walk(str(directory), recursive, cancel_token)
         
-        return is_supported
-    
-    def get_file_stats(self, files: List[Path]) -> dict:
-        """Get statistics about scanned files"""
-        stats = {
-            'total_files': len(files),
-            'by_type': {},
-            'total_size': 0
-        }
+        for files, _, listing_skipped in listings:
+            for reason, count in listing_skipped.items():
+                skipped[reason] += count
+            for file_path, stat in files:
+                self.file_stats[file_path] = stat
+                found += 1
+                yield file_path
         
-        for file_path in files:
-            # Count by extension
-            ext = file_path.suffix.lower()
-            stats['by_type'][ext] = stats['by_type'].get(ext, 0) + 1
+        self.logger.info(f"Found {found} supported files in {directory}")
+        if any(skipped.values()):
+            self.logger.info("Skipped: " + ", ".join(f"{count} {reason.replace('_', ' ')}"
+                                                   for reason, count in skipped.items() if count))
+    
+    def _walk(self, root: str, recursive: bool, cancel_token=None) -> Iterator[tuple]:
+        """Single-threaded walk: yield the listing of every directory, depth-first in name order"""
+        pending = [root]
+        while pending:
+            if cancel_token is not None and cancel_token.cancelled:
+                return
             
-            # Add size
+            listing = self._list_directory(pending.pop(), recursive)
+            yield listing
+            pending.extend(reversed(listing[1]))
+    
+    def _walk_parallel(self, root: str, recursive: bool, cancel_token, threads: int,
+                       deterministic: bool) -> Iterator[tuple]:
+        """
+        Walk with a pool of listing threads
+        
+        At most 2 x threads listings are in flight or waiting to be consumed,
+        so memory stays bounded however wide the tree is. In deterministic
+        mode the walk order is the single-threaded one and the threads only
+        list the directories it visits next ahead of time; otherwise each
+        listing is used as soon as it completes.
+        
+        Args:
+            root: Directory to walk
+            recursive: Walk subdirectories
+            cancel_token: Stops the walk at the next directory once cancelled
+            threads: Listing threads
+            deterministic: Keep the single-threaded order
+        
+        Yields:
+            (files, subdirectories, skip counts) of every directory
+        """
+        limit = threads * 2
+        pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='scan')
+        pending = [root]
+        in_flight: Dict[str, Future] = {}  # Directory -> listing
+        
+        try:
+            while pending or in_flight:
+                if cancel_token is not None and cancel_token.cancelled:
+                    return
+                
+                if deterministic:
+                    # List the directories the walk reaches next (top of the stack first)
+                    for path in reversed(pending[-limit:]):
+                        if len(in_flight) >= limit:
+                            break
+                        if path not in in_flight:
+                            in_flight[path] = pool.submit(self._list_directory, path, recursive)
+                    
+                    current = pending.pop()
+                    future = in_flight.pop(current, None)
+                    listing = future.result() if future else self._list_directory(current, recursive)
+                    done = [listing]
+                else:
+                    while pending and len(in_flight) < limit:
+                        path = pending.pop()
+                        in_flight[path] = pool.submit(self._list_directory, path, recursive)
+                    
+                    finished, _ = wait(in_flight.values(), return_when=FIRST_COMPLETED)
+                    done = [in_flight.pop(path).result() for path, future in list(in_flight.items())
+                            if future in finished]
+                
+                for listing in done:
+                    yield listing
+                    pending.extend(reversed(listing[1]))
+        finally:
+            for future in in_flight.values():
+                future.cancel()
+            pool.shutdown(wait=False)
+    
+    def _list_directory(self, directory: str, recursive: bool) -> Tuple[list, List[str], Dict[str, int]]:
+        """
+        List and filter one directory (thread-safe)
+        
+        Args:
+            directory: Directory to list
+            recursive: Also return its subdirectories
+        
+        Returns:
+            ([(file_path, stat_result)], [subdirectory], {skip reason: count}),
+            both lists in name order
+        """
+        files = []
+        subdirs = []
+        skipped = {}
+        try:
+            with os.scandir(directory) as entries:
+                # Sorted for a stable scan order across platforms
+                entries = sorted(entries, key=lambda e: e.name)
+        except PermissionError:
+            self.logger.warning(f"Permission denied: {directory}")
+            return files, subdirs, skipped
+        except OSError as e:
+            self.logger.error(f"Error scanning {directory}: {e}")
+            return files, subdirs, skipped
+        
+        for entry in entries:
             try:
-                stats['total_size'] += file_path.stat().st_size
-            except:
-                pass
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and self._skip_reason(entry) is None:
+                        subdirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+                
+                reason = self._skip_reason(entry)
+                if reason is None and not extractor_registry.lookup(entry.name):
+                    reason = 'unsupported'
+                if reason is None:
+                    stat = entry.stat()  # Cached by scandir on Windows, one call elsewhere
+                    reason = self._skip_size(stat.st_size)
+            except OSError as e:
+                self.logger.debug(f"Cannot stat {entry.path}: {e}")
+                continue
+            
+            if reason:
+                skipped[reason] = skipped.get(reason, 0) + 1
+                self.logger.debug(f"Skipped ({reason}): {entry.name}")
+                continue
+            
+            self.logger.debug(f"Found: {entry.name}")
+            files.append((Path(entry.path), stat))
         
-        # Convert size to human readable
-        stats['total_size_human'] = self._human_readable_size(stats['total_size'])
+        return files, subdirs, skipped
+    
+    def iter_files(self, files: Iterable[Path]) -> Iterator[Path]:
+        """Yield selected files, storing their stat results (missing files fail at extraction)"""
+        for file_path in files:
+            if file_path not in self.file_stats:
+                try:
+                    self.file_stats[file_path] = file_path.stat()
+                except OSError:
+                    pass
+            yield file_path
+    
+    def _skip_reason(self, entry: os.DirEntry) -> Optional[str]:
+        """Why a file or directory is excluded by name/attributes (None if it is not)"""
+        name = entry.name
+        if self._skip_regex.match(name.lower()):
+            return 'pattern'
         
-        return stats
+        if Config.SKIP_SYSTEM_FILES:
+            if name.startswith('.'):
+                return 'hidden'
+            if _WINDOWS_HIDDEN:
+                try:
+                    # Free on Windows: scandir already returned the attributes
+                    if entry.stat(follow_symlinks=False).st_file_attributes & _WINDOWS_HIDDEN:
+                        return 'hidden'
+                except OSError:
+                    pass
+        return None
+    
+    def _skip_size(self, size: int) -> Optional[str]:
+        """Why a file is excluded by size (None if it is not)"""
+        if size == 0 and Config.SKIP_EMPTY_FILES:
+            return 'empty'
+        # Under the 'head'/'head_tail' policies, large files are extracted in part
+        if Config.LARGE_FILE_POLICY not in SAMPLING_POLICIES and is_too_large(size):
+            return 'too_large'
+        return None
+    
+    def estimate_cost(self, file_path: Path, size: int) -> float:
+        """
+        Estimate relative extraction cost of a file
+        
+        Args:
+            file_path: File path (extension selects the cost weight)
+            size: File size in bytes
+        
+        Returns:
+            Cost in weighted bytes
+        """
+        category = Config.get_file_type_category(file_path.suffix)
+        weight = Config.EXTRACTION_COST_WEIGHTS.get(category, 1)
+        return weight * (size + Config.COST_FIXED_OVERHEAD_BYTES)
+    
+    def estimate_memory(self, file_path: Path, size: int) -> int:
+        """
+        Estimate the peak memory of extracting a file
+        
+        Args:
+            file_path: File path (extension selects the memory factor)
+            size: File size in bytes
+        
+        Returns:
+            Estimated bytes
+        """
+        category = Config.get_file_type_category(file_path.suffix)
+        factor = Config.MEMORY_COST_FACTORS.get(category, 1)
+        if Config.LARGE_FILE_POLICY in SAMPLING_POLICIES and is_too_large(size):
+            size = int(Config.LARGE_FILE_SAMPLE_MB * 1024 * 1024)  # Only the sample is read
+        return int(factor * size) + Config.MEMORY_COST_OVERHEAD_MB * 1024 * 1024
     
     def _human_readable_size(self, size_bytes: int) -> str:
         """Convert bytes to human readable format"""
@@ -110,3 +307,136 @@ class FileScanner:
                 return f"{size_bytes:.2f} {unit}"
             size_bytes /= 1024.0
         return f"{size_bytes:.2f} PB"
+
+
+class ScanQueue:
+    """
+    Files found by a scan running in a background thread.
+    
+    Extraction takes files from the queue while the walk is still going, so
+    workers start on the first file found instead of idling until a slow
+    (network) tree has been walked completely. Files waiting in the queue
+    are handed out most expensive first when Config.SCHEDULE_LARGEST_FIRST
+    is set, otherwise in scan order.
+    
+    The queue holds at most Config.SCAN_QUEUE_MAX_FILES files; the scan
+    thread waits while it is full, so paths and stat results are only kept
+    for the files near the front of the run.
+    """
+    
+    def __init__(self, scanner: FileScanner, paths: Iterable[Path],
+                 on_found: Optional[Callable[[Path, int], None]] = None,
+                 on_finished: Optional[Callable[['ScanQueue'], None]] = None):
+        """
+        Initialize queue (call start() to begin scanning)
+        
+        Args:
+            scanner: Scanner that stores the stat results (sizes give the cost)
+            paths: Iterable of files, usually scanner.iter_directory(...)
+            on_found: Called from the scan thread with every file found and its size
+            on_finished: Called from the scan thread once the scan has ended
+        """
+        self.logger = logging.getLogger(__name__)
+        self.scanner = scanner
+        self.paths = paths
+        self.on_found = on_found
+        self.on_finished = on_finished
+        self.found = 0
+        self.found_bytes = 0
+        self.finished = False
+        self.max_files = max(1, Config.SCAN_QUEUE_MAX_FILES)
+        self._closed = False
+        self._heap = []
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._scan, name='file-scan', daemon=True)
+    
+    def start(self) -> 'ScanQueue':
+        """Start the scan thread"""
+        self._thread.start()
+        return self
+    
+    def _scan(self):
+        """Scan thread: push every file found onto the queue"""
+        try:
+            for file_path in self.paths:
+                file_stat = self.scanner.file_stats.get(file_path)
+                size = file_stat.st_size if file_stat else 0
+                if self.on_found:
+                    self.on_found(file_path, size)
+                
+                priority = 0
+                if Config.SCHEDULE_LARGEST_FIRST:
+                    priority = -self.scanner.estimate_cost(file_path, size)
+                
+                with self._condition:
+                    self._condition.wait_for(lambda: len(self._heap) < self.max_files or self._closed)
+                    if self._closed:
+                        self.scanner.file_stats.pop(file_path, None)
+                        break
+                    # The running count keeps equal priorities in scan order
+                    heapq.heappush(self._heap, (priority, self.found, file_path))
+                    self.found += 1
+                    self.found_bytes += size
+                    self._condition.notify()
+            
+            # Shuts the directory listing threads down when the run stopped early
+            if self._closed and hasattr(self.paths, 'close'):
+                self.paths.close()
+        except Exception as e:
+            self.logger.error(f"Scan failed: {e}")
+        finally:
+            with self._condition:
+                self.finished = True
+                self._condition.notify_all()
+            if self.on_finished:
+                self.on_finished(self)
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[Path]:
+        """
+        Take the next file
+        
+        Args:
+            timeout: Seconds to wait for a file while the scan is running
+        
+        Returns:
+            File path, or None if nothing arrived in time (or the scan is done
+            and the queue empty - see exhausted)
+        """
+        with self._condition:
+            if not self._heap and not self.finished:
+                self._condition.wait(timeout)
+            if self._heap:
+                file_path = heapq.heappop(self._heap)[2]
+                self._condition.notify_all()  # The scan thread may be waiting for room
+                return file_path
+            return None
+    
+    def wait_for_files(self) -> bool:
+        """
+        Block until the first file is queued or the scan has ended
+        
+        Returns:
+            Whether the scan found any file
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._heap or self.finished)
+            return self.found > 0
+    
+    @property
+    def exhausted(self) -> bool:
+        """Whether the scan has finished and every file has been taken"""
+        with self._condition:
+            return self.finished and not self._heap
+    
+    def close(self):
+        """Stop the scan (if it is still running) and drop the files not taken"""
+        with self._condition:
+            self._closed = True
+            for _, _, file_path in self._heap:
+                self.scanner.file_stats.pop(file_path, None)
+            self._heap = []
+            self._condition.notify_all()
+    
+    def join(self):
+        """Wait for the scan thread"""
+        self._thread.join()
@@ -3,7 +3,6 @@
 # ============================================================================
 
 import logging
-import colorlog
 from pathlib import Path
 from config import Config
 
@@ -11,6 +10,9 @@ def setup_logger(name: str = 'DocumentExtractor') -> logging.Logger:
     """
     Setup colored logger with file and console output
     
+    Console colors need the optional colorlog package. The log file is
+    opened on the first record written, not here.
+    
     Args:
         name: Logger name
         
@@ -24,28 +26,29 @@ def setup_logger(name: str = 'DocumentExtractor') -> logging.Logger:
     logger.handlers.clear()
     
     # Console handler with colors
-    console_handler = colorlog.StreamHandler()
+    try:
+        import colorlog
+        console_handler = colorlog.StreamHandler()
+        console_format = colorlog.ColoredFormatter(
+            '%(log_color)s%(levelname)-8s%(reset)s %(blue)s[%(name)s]%(reset)s %(message)s',
+            log_colors={
+                'DEBUG': 'cyan',
+                'INFO': 'green',
+                'WARNING': 'yellow',
+                'ERROR': 'red',
+                'CRITICAL': 'red,bg_white',
+            }
+        )
+    except ImportError:
+        console_handler = logging.StreamHandler()
+        console_format = logging.Formatter('%(levelname)-8s [%(name)s] %(message)s')
     console_handler.setLevel(logging.DEBUG if Config.DEBUG_MODE else logging.INFO)
-    
-    console_format = colorlog.ColoredFormatter(
-        '%(log_color)s%(levelname)-8s%(reset)s %(blue)s[%(name)s]%(reset)s %(message)s',
-        log_colors={
-            'DEBUG': 'cyan',
-            'INFO': 'green',
-            'WARNING': 'yellow',
-            'ERROR': 'red',
-            'CRITICAL': 'red,bg_white',
-        }
-    )
     console_handler.setFormatter(console_format)
     logger.addHandler(console_handler)
     
-    # File handler
-    log_dir = Path(Config.OUTPUT_FOLDER) / 'logs'
-    log_dir.mkdir(parents=True, exist_ok=True)
-    
-    log_file = log_dir / 'extraction.log'
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    # File handler (folder and file are created on the first write)
+    log_file = Path(Config.OUTPUT_FOLDER) / 'logs' / 'extraction.log'
+    file_handler = _LazyFileHandler(log_file, encoding='utf-8', delay=True)
     file_handler.setLevel(logging.DEBUG)
     
     file_format = logging.Formatter(
@@ -56,3 +59,11 @@ def setup_logger(name: str = 'DocumentExtractor') -> logging.Logger:
     logger.addHandler(file_handler)
     
     return logger
+
+
+class _LazyFileHandler(logging.FileHandler):
+    """FileHandler that also creates the log folder when the file is opened"""
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
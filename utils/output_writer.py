@@ -0,0 +1,370 @@
+# ============================================================================
+# OUTPUT WRITER - Streaming JSON Lines output sink (sharded, indexed)
+# ============================================================================
+
+import os
+import json
+import time
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import logging
+
+from config import Config
+
+def shard_path(output_file: Path, shard: int) -> Path:
+    """File of a shard: the output file itself, then <stem>.0001.jsonl, <stem>.0002.jsonl, ..."""
+    output_file = Path(output_file)
+    if shard == 0:
+        return output_file
+    return output_file.with_name(f"{output_file.stem}.{shard:04d}{output_file.suffix}")
+
+
+def index_path(output_file: Path) -> Path:
+    """Record index of an output: <stem>.index.jsonl next to it"""
+    output_file = Path(output_file)
+    return output_file.with_name(f"{output_file.stem}.index.jsonl")
+
+
+def output_manifest_path(output_file: Path) -> Path:
+    """Shard list of an output: <stem>.manifest.json next to it"""
+    output_file = Path(output_file)
+    return output_file.with_name(f"{output_file.stem}.manifest.json")
+
+
+def output_shards(output_file: Path) -> List[Path]:
+    """
+    Shard files of an output, in order
+    
+    Taken from the output manifest; an output without one (the run was
+    interrupted) is probed shard by shard.
+    """
+    output_file = Path(output_file)
+    manifest_file = output_manifest_path(output_file)
+    if manifest_file.exists():
+        manifest = json.loads(manifest_file.read_text(encoding='utf-8'))
+        return [output_file.with_name(shard['file']) for shard in manifest['shards']]
+    
+    shards = []
+    while shard_path(output_file, len(shards)).exists():
+        shards.append(shard_path(output_file, len(shards)))
+    return shards
+
+
+def iter_records(output_file: Path) -> Iterator[dict]:
+    """Every record of an output, shard after shard"""
+    for path in output_shards(output_file):
+        with open(path, 'rb') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def read_record(output_file: Path, entry: Dict[str, Any]) -> dict:
+    """
+    Read one record without parsing anything else
+    
+    Args:
+        output_file: Output file (first shard) the index belongs to
+        entry: Line of the index ({'file_id', 'file_path', 'shard', 'offset', 'length'})
+    
+    Returns:
+        The record
+    """
+    with open(shard_path(output_file, entry['shard']), 'rb') as f:
+        f.seek(entry['offset'])
+        return json.loads(f.read(entry['length']))
+
+
+class StreamingJSONLWriter:
+    """
+    Write extraction results as JSON Lines while the run is in progress.
+    
+    Every line is one self-contained JSON object with a 'record_type' key:
+    a 'header' line with the run metadata, one 'result' line per file and a
+    'footer' line with the final statistics. Only the record being written
+    is held in memory, so peak memory does not grow with the corpus size.
+    
+    The output rolls over to a new shard once one holds
+    Config.OUTPUT_SHARD_MAX_RECORDS results or would grow past
+    OUTPUT_SHARD_MAX_MB. Every shard starts with a header; the last one ends
+    with the footer. With Config.OUTPUT_INDEX, every result's file_id and
+    path go to an index with its shard, byte offset and length. Closing
+    the writer lists the shards in an output manifest. Consumers can seek
+    straight to a record or read the shards in parallel.
+    """
+    
+    def __init__(self, output_file: Path, flush_interval: Optional[int] = None, manifest=None,
+                 on_sync: Optional[Callable[[], None]] = None):
+        """
+        Initialize writer
+        
+        Args:
+            output_file: Path of the .jsonl file to create (the first shard)
+            flush_interval: Flush and fsync every N results (defaults to Config.BATCH_SAVE_INTERVAL)
+            manifest: Optional RunManifest checkpointed after every sync
+            on_sync: Optional callback run after every sync (e.g. committing state)
+        """
+        self.output_file = Path(output_file)
+        self.flush_interval = flush_interval or Config.BATCH_SAVE_INTERVAL
+        self.manifest = manifest
+        self.on_sync = on_sync
+        self.logger = logging.getLogger(__name__)
+        self.max_records = Config.OUTPUT_SHARD_MAX_RECORDS
+        self.max_bytes = int(Config.OUTPUT_SHARD_MAX_MB * 1024 * 1024)
+        self.records_written = 0
+        self.serialize_seconds = 0.0  # Time in json.dumps, for the run's stage totals
+        self.sync_seconds = 0.0  # Time flushing and fsyncing
+        self.bytes_written = 0
+        self.shards: List[dict] = []  # {'file', 'records', 'bytes'} of every shard so far
+        self._header = None  # Run metadata, repeated in the header of every shard
+        self._pending = 0
+        self._file = None
+        self._index = None
+    
+    @property
+    def shard(self) -> int:
+        """Number of the shard being written"""
+        return len(self.shards) - 1
+    
+    def open(self, metadata: dict):
+        """Create the output file and write the header record"""
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._header = {
+            'extraction_date': datetime.now().isoformat(),
+            'version': '1.0.0',
+            **metadata
+        }
+        if Config.OUTPUT_INDEX:
+            self._index = open(index_path(self.output_file), 'wb')
+        self._start_shard()
+        self.sync()
+        return self
+    
+    def resume(self, offset: int, records_written: int, metadata: dict,
+               position: Optional[Dict[str, Any]] = None):
+        """
+        Reopen an interrupted output for appending
+        
+        Args:
+            offset: Byte size of the current shard at the last checkpoint;
+                    anything after it (unsynced records, a torn line, an old
+                    footer, later shards) is dropped
+            records_written: Number of result records already in the output
+            metadata: Extra fields for the 'resume' marker record
+            position: Rest of the checkpoint ({'shard', 'shard_records',
+                      'index_offset'}); missing for runs checkpointed before
+                      output was sharded
+        """
+        position = position or {}
+        shard = position.get('shard', 0)
+        shard_records = position.get('shard_records') or [records_written]
+        
+        # Shards started after the checkpoint are dropped with the rest
+        later = shard + 1
+        while shard_path(self.output_file, later).exists():
+            shard_path(self.output_file, later).unlink()
+            later += 1
+        with open(shard_path(self.output_file, shard), 'r+b') as f:
+            f.truncate(offset)
+        
+        self.shards = [{
+            'file': shard_path(self.output_file, n).name,
+            'records': shard_records[n],
+            'bytes': os.path.getsize(shard_path(self.output_file, n))
+        } for n in range(shard + 1)]
+        self._header = self._read_header()
+        if Config.OUTPUT_INDEX:
+            self._resume_index(position.get('index_offset'))
+        
+        self._file = open(shard_path(self.output_file, shard), 'ab')
+        self.records_written = records_written
+        self._write_line({
+            'record_type': 'resume',
+            'resume_date': datetime.now().isoformat(),
+            **metadata
+        })
+        self.sync()
+        return self
+    
+    def write_result(self, result: dict, source_path: Optional[str] = None):
+        """
+        Append one result record, syncing every flush_interval records
+        
+        Args:
+            result: Result dictionary
+            source_path: Path recorded in the run manifest as completed
+        """
+        offset, length = self._write_line({'record_type': 'result', **result}, roll=True)
+        self.records_written += 1
+        self.shards[-1]['records'] += 1
+        self._pending += 1
+        
+        if self._index is not None:
+            self._write_index(result, offset, length)
+        
+        if self.manifest is not None and source_path is not None:
+            self.manifest.add(source_path)
+        
+        if self._pending >= self.flush_interval:
+            self.sync()
+    
+    def write_record(self, record_type: str, record: dict):
+        """Append a non-result record (e.g. 'removed' in delta output)"""
+        self._write_line({'record_type': record_type, **record}, roll=True)
+        self._pending += 1
+        
+        if self._pending >= self.flush_interval:
+            self.sync()
+    
+    def close(self, summary: Optional[dict] = None):
+        """Write the footer record, close the files and write the output manifest"""
+        if self._file is None:
+            return
+        
+        # Checkpoint before the footer so a resumed run truncates it away
+        self.sync()
+        self._write_line({
+            'record_type': 'footer',
+            'completion_date': datetime.now().isoformat(),
+            'total_files': self.records_written,
+            **(summary or {})
+        })
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        
+        self._write_output_manifest()
+        if len(self.shards) > 1:
+            self.logger.info(f"Results saved to: {self.output_file} and {len(self.shards) - 1} more shards")
+        else:
+            self.logger.info(f"Results saved to: {self.output_file}")
+    
+    def sync(self):
+        """Flush buffered lines (and index entries) to disk, then checkpoint the manifest"""
+        start = time.perf_counter()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self._index is not None:
+            self._index.flush()
+            os.fsync(self._index.fileno())
+        self.sync_seconds += time.perf_counter() - start
+        self._pending = 0
+        
+        if self.manifest is not None:
+            self.manifest.checkpoint(self._file.tell(), {
+                'shard': self.shard,
+                'shard_records': [shard['records'] for shard in self.shards],
+                'index_offset': self._index.tell() if self._index is not None else None
+            })
+        if self.on_sync is not None:
+            self.on_sync()
+    
+    def _start_shard(self):
+        """Open the next shard and write its header"""
+        path = shard_path(self.output_file, len(self.shards))
+        self.shards.append({'file': path.name, 'records': 0, 'bytes': 0})
+        self._file = open(path, 'wb')
+        self._write_line({'record_type': 'header', **self._header, 'shard': self.shard})
+    
+    def _roll(self):
+        """
+        Finish the current shard and start the next
+        
+        The finished shard is fsynced first, so no checkpoint can name the
+        new shard while the old one is not complete on disk.
+        """
+        start = time.perf_counter()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self.sync_seconds += time.perf_counter() - start
+        self._start_shard()
+    
+    def _is_full(self, line_bytes: int) -> bool:
+        """Whether the next line goes to a new shard (a shard always takes one result)"""
+        current = self.shards[-1]
+        if not current['records']:
+            return False
+        if self.max_records and current['records'] >= self.max_records:
+            return True
+        return bool(self.max_bytes) and current['bytes'] + line_bytes > self.max_bytes
+    
+    def _write_line(self, record: dict, roll: bool = False):
+        """
+        Serialize a single record as one line
+        
+        Args:
+            record: Record to write
+            roll: Start a new shard first if the current one is full
+        
+        Returns:
+            (byte offset in its shard, length including the newline)
+        """
+        start = time.perf_counter()
+        line = (json.dumps(record, ensure_ascii=Config.JSON_ENSURE_ASCII) + '\n').encode('utf-8')
+        self.serialize_seconds += time.perf_counter() - start
+        if roll and self._is_full(len(line)):
+            self._roll()
+        
+        current = self.shards[-1]
+        offset = current['bytes']
+        current['bytes'] += len(line)
+        self.bytes_written += len(line)
+        self._file.write(line)
+        return offset, len(line)
+    
+    def _write_index(self, result: dict, offset: int, length: int, shard: Optional[int] = None):
+        """Add a result's location to the index"""
+        entry = {
+            'file_id': result.get('file_id'),
+            'file_path': result.get('file_path'),
+            'shard': self.shard if shard is None else shard,
+            'offset': offset,
+            'length': length
+        }
+        self._index.write((json.dumps(entry, ensure_ascii=Config.JSON_ENSURE_ASCII) + '\n').encode('utf-8'))
+    
+    def _resume_index(self, index_offset: Optional[int]):
+        """Reopen the index at the checkpoint, or rebuild it from the kept shards"""
+        path = index_path(self.output_file)
+        if index_offset is not None and path.exists():
+            with open(path, 'r+b') as f:
+                f.truncate(index_offset)
+            self._index = open(path, 'ab')
+            return
+        
+        # Checkpointed without an index (OUTPUT_INDEX was off, or an older run)
+        self._index = open(path, 'wb')
+        for shard in range(len(self.shards)):
+            offset = 0
+            with open(shard_path(self.output_file, shard), 'rb') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record.get('record_type') == 'result':
+                        self._write_index(record, offset, len(line), shard)
+                    offset += len(line)
+    
+    def _read_header(self) -> dict:
+        """Run metadata from the header of the first shard"""
+        with open(self.output_file, 'rb') as f:
+            header = json.loads(f.readline())
+        header.pop('record_type', None)
+        header.pop('shard', None)
+        return header
+    
+    def _write_output_manifest(self):
+        """List the shards next to the output (written whole, then renamed into place)"""
+        path = output_manifest_path(self.output_file)
+        temp_path = path.with_name(path.name + '.tmp')
+        temp_path.write_text(json.dumps({
+            **self._header,
+            'completion_date': datetime.now().isoformat(),
+            'total_files': self.records_written,
+            'index': index_path(self.output_file).name if Config.OUTPUT_INDEX else None,
+            'shards': self.shards
+        }, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(temp_path, path)
@@ -0,0 +1,372 @@
+# ============================================================================
+# PROFILER - Sampled CPU and tracemalloc profiles per extractor and file
+# ============================================================================
+
+import os
+import sys
+import json
+import time
+import heapq
+import marshal
+import threading
+import tracemalloc
+import functools
+from pathlib import Path
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from extractor import get_extractor_class
+
+# A stack is a tuple of (filename, first line, function) keys, outermost first
+# (the key format of pstats)
+FrameKey = Tuple[str, int, str]
+
+# Threads parked in these modules are waiting, not working
+_IDLE_MODULES = ('threading.py', 'selectors.py', 'queue.py', 'connection.py')
+
+
+class _ProfiledFile:
+    """A file being extracted while the profiler runs"""
+    
+    __slots__ = ('file_path', 'extractor', 'samples', 'start', 'cpu_start', 'memory_base', 'overlapped')
+    
+    def __init__(self, file_path: Path, extractor: str):
+        self.file_path = file_path
+        self.extractor = extractor
+        self.samples = Counter()  # Stack -> samples
+        self.start = 0.0
+        self.cpu_start = 0.0
+        self.memory_base = 0
+        self.overlapped = False  # Ran next to another file, so its memory peak may include that one
+
+
+class _Group:
+    """Totals of all files handled by one extractor class"""
+    
+    __slots__ = ('files', 'wall_seconds', 'cpu_seconds', 'peak_memory', 'samples')
+    
+    def __init__(self):
+        self.files = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory = None
+        self.samples = Counter()
+
+
+class ExtractionProfiler:
+    """
+    Attribute the CPU time and memory of a run to extractor classes and files.
+    
+    cProfile only sees the thread that enabled it, so a thread pool defeats
+    it. Instead a background thread samples the Python stack of every thread
+    that is extracting a file every Config.PROFILE_SAMPLE_INTERVAL seconds.
+    Samples are summed per extractor class and kept per file for the
+    Config.PROFILE_SLOWEST_FILES slowest files. The main thread is sampled
+    as 'main' while it is not waiting, which covers JSON serialization and
+    scheduling.
+    
+    Peak memory comes from tracemalloc. It is exact when files run one at a
+    time (the --profile default); with more threads the peak of a file may
+    include allocations of the files running next to it.
+    
+    Profiles are written as collapsed stacks (flamegraph.pl, speedscope) and
+    pstats files (pstats, snakeviz); sample counts stand in for call counts.
+    """
+    
+    def __init__(self, interval: Optional[float] = None, slowest_files: Optional[int] = None,
+                 trace_memory: Optional[bool] = None):
+        """
+        Initialize profiler
+        
+        Args:
+            interval: Seconds between stack samples (defaults to Config.PROFILE_SAMPLE_INTERVAL)
+            slowest_files: Files profiled individually (defaults to Config.PROFILE_SLOWEST_FILES)
+            trace_memory: Measure peak allocations (defaults to Config.PROFILE_TRACE_MEMORY)
+        """
+        self.interval = interval or Config.PROFILE_SAMPLE_INTERVAL
+        self.slowest_files = Config.PROFILE_SLOWEST_FILES if slowest_files is None else slowest_files
+        self.trace_memory = Config.PROFILE_TRACE_MEMORY if trace_memory is None else trace_memory
+        self.groups: Dict[str, _Group] = {}
+        self._slowest = []  # Min-heap of (wall seconds, sequence, _ProfiledFile, cpu seconds, peak)
+        self._sequence = 0
+        self._active: Dict[int, _ProfiledFile] = {}  # Thread ident -> file
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_tracemalloc = False
+        self._ticks = 0
+        self._sampling_seconds = 0.0
+    
+    # ------------------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------------------
+    
+    def start(self):
+        """Start sampling (and tracing allocations)"""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._thread = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+    
+    def wrap(self, fn: Callable) -> Callable:
+        """Profile every call of a per-file task fn(file_path, *args)"""
+        return functools.partial(self.run, fn)
+    
+    def run(self, fn: Callable, file_path: Path, *args):
+        """Call fn(file_path, *args) on this thread with its samples and memory attributed to the file"""
+        extractor_class = get_extractor_class(file_path)
+        profiled = _ProfiledFile(file_path, extractor_class.__name__ if extractor_class else 'unsupported')
+        ident = threading.get_ident()
+        
+        with self._lock:
+            if self._active:
+                profiled.overlapped = True
+                for other in self._active.values():
+                    other.overlapped = True
+            elif self.trace_memory:
+                tracemalloc.reset_peak()
+            if self.trace_memory:
+                profiled.memory_base = tracemalloc.get_traced_memory()[0]
+            self._active[ident] = profiled
+        
+        profiled.cpu_start = time.thread_time()
+        profiled.start = time.perf_counter()
+        try:
+            return fn(file_path, *args)
+        finally:
+            wall_seconds = time.perf_counter() - profiled.start
+            cpu_seconds = time.thread_time() - profiled.cpu_start
+            with self._lock:
+                del self._active[ident]
+                peak = None
+                if self.trace_memory:
+                    peak = max(tracemalloc.get_traced_memory()[1] - profiled.memory_base, 0)
+                self._finish(profiled, wall_seconds, cpu_seconds, peak)
+    
+    def _finish(self, profiled: _ProfiledFile, wall_seconds: float, cpu_seconds: float,
+                peak: Optional[int]):
+        """Add a finished file to its extractor's totals and the slowest files (lock held)"""
+        group = self._group(profiled.extractor)
+        group.files += 1
+        group.wall_seconds += wall_seconds
+        group.cpu_seconds += cpu_seconds
+        group.samples.update(profiled.samples)
+        if peak is not None:
+            group.peak_memory = max(group.peak_memory or 0, peak)
+        
+        if self.slowest_files:
+            self._sequence += 1
+            entry = (wall_seconds, self._sequence, profiled, cpu_seconds, peak)
+            if len(self._slowest) < self.slowest_files:
+                heapq.heappush(self._slowest, entry)
+            elif wall_seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+    
+    @property
+    def sample_seconds(self) -> float:
+        """Measured time between samples (longer than the interval when the process is busy)"""
+        return self._sampling_seconds / self._ticks if self._ticks else self.interval
+    
+    def _group(self, name: str) -> _Group:
+        group = self.groups.get(name)
+        if group is None:
+            group = self.groups[name] = _Group()
+        return group
+    
+    def _sample_loop(self):
+        """Record the stack of every extracting thread, and of the main thread when busy"""
+        main_ident = threading.main_thread().ident
+        run_code = self.run.__code__
+        
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._ticks += 1
+            self._sampling_seconds += now - last
+            last = now
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, profiled in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stack = self._stack(frame, run_code)
+                        if stack:
+                            profiled.samples[stack] += 1
+                
+                frame = frames.get(main_ident)
+                if frame is not None and main_ident not in self._active:
+                    stack = self._stack(frame)
+                    if stack and os.path.basename(stack[-1][0]) not in _IDLE_MODULES:
+                        self._group('main').samples[stack] += 1
+            del frames
+    
+    @staticmethod
+    def _stack(frame, stop_code=None) -> Tuple[FrameKey, ...]:
+        """Stack of a frame up to (not including) the frame running stop_code, outermost first"""
+        stack = []
+        while frame is not None and frame.f_code is not stop_code:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+    
+    # ------------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------------
+    
+    def write(self, output_file: Path) -> Path:
+        """
+        Write the profiles next to the output file
+        
+        Creates <output stem>_profile/ with <Extractor>.collapsed and
+        <Extractor>.pstats per extractor class (and 'main'), the same pair for
+        each of the slowest files, and profile.json summarising them.
+        
+        Returns:
+            Path of the profile directory
+        """
+        output_file = Path(output_file)
+        directory = output_file.with_name(f"{output_file.stem}_profile")
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        extractors = {}
+        for name, group in sorted(self.groups.items(), key=lambda item: -sum(item[1].samples.values())):
+            self._write_profile(directory / name, group.samples)
+            extractors[name] = {
+                'files': group.files,
+                'wall_seconds': round(group.wall_seconds, 3),
+                'cpu_seconds': round(group.cpu_seconds, 3),
+                'samples': sum(group.samples.values()),
+                'peak_memory_bytes': group.peak_memory,
+                'profile': f"{name}.collapsed",
+                'top_functions': self.top_functions(group.samples)
+            }
+        
+        slowest = []
+        for rank, (wall_seconds, _, profiled, cpu_seconds, peak) in enumerate(
+                sorted(self._slowest, key=lambda entry: entry[0], reverse=True), 1):
+            name = f"slowest_{rank:02d}_{profiled.extractor}"
+            self._write_profile(directory / name, profiled.samples)
+            slowest.append({
+                'file_path': str(profiled.file_path),
+                'extractor': profiled.extractor,
+                'wall_ms': round(wall_seconds * 1000, 1),
+                'cpu_ms': round(cpu_seconds * 1000, 1),
+                'samples': sum(profiled.samples.values()),
+                'peak_memory_bytes': peak,
+                'peak_memory_exact': not profiled.overlapped if peak is not None else None,
+                'profile': f"{name}.collapsed",
+                'top_functions': self.top_functions(profiled.samples)
+            })
+        
+        with open(directory / 'profile.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'sample_interval_ms': round(self.sample_seconds * 1000, 3),
+                'threads': Config.MAX_THREADS,
+                'extractors': extractors,
+                'slowest_files': slowest
+            }, f, indent=2)
+        
+        return directory
+    
+    def summary_lines(self, count: int = 3) -> List[str]:
+        """One line per extractor class: files, samples, memory peak and the top functions"""
+        lines = []
+        for name, group in sorted(self.groups.items(), key=lambda item: -sum(item[1].samples.values())):
+            top = ", ".join(f"{entry['function']} {entry['self_percent']}%"
+                            for entry in self.top_functions(group.samples, count))
+            memory = ""
+            if group.peak_memory is not None:
+                memory = f", peak {group.peak_memory / (1024 * 1024):.1f} MB"
+            files = f"{group.files} files, " if name != 'main' else ""
+            lines.append(f"{name}: {files}{sum(group.samples.values())} samples{memory}"
+                         f"{' - ' + top if top else ''}")
+        return lines
+    
+    def top_functions(self, samples: Counter, count: int = 10) -> List[dict]:
+        """
+        Functions with the most samples on top of the stack
+        
+        Returns:
+            [{'function', 'self_percent', 'total_percent'}], where total counts
+            the samples the function was anywhere on the stack
+        """
+        total = sum(samples.values())
+        if not total:
+            return []
+        
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, hits in samples.items():
+            self_counts[stack[-1]] += hits
+            for key in set(stack):
+                total_counts[key] += hits
+        
+        return [{
+            'function': self._label(key),
+            'self_percent': round(hits / total * 100, 1),
+            'total_percent': round(total_counts[key] / total * 100, 1)
+        } for key, hits in self_counts.most_common(count)]
+    
+    def _write_profile(self, base: Path, samples: Counter):
+        """Write samples as <base>.collapsed and <base>.pstats"""
+        with open(base.with_suffix('.collapsed'), 'w', encoding='utf-8') as f:
+            for stack, hits in sorted(samples.items()):
+                f.write(f"{';'.join(self._label(key) for key in stack)} {hits}\n")
+        
+        with open(base.with_suffix('.pstats'), 'wb') as f:
+            marshal.dump(self._pstats(samples), f)
+    
+    def _pstats(self, samples: Counter) -> dict:
+        """
+        Convert samples to the stats dictionary pstats loads
+        
+        Returns:
+            {function: (calls, calls, self seconds, total seconds, {caller: (calls, calls, self, total)})},
+            with samples as calls and samples * sample_seconds as seconds
+        """
+        hits_total = Counter()
+        hits_self = Counter()
+        callers: Dict[FrameKey, Counter] = {}
+        callers_self: Dict[FrameKey, Counter] = {}
+        
+        for stack, hits in samples.items():
+            hits_self[stack[-1]] += hits
+            for key in set(stack):
+                hits_total[key] += hits
+            for depth in range(1, len(stack)):
+                callee, caller = stack[depth], stack[depth - 1]
+                callers.setdefault(callee, Counter())[caller] += hits
+                if depth == len(stack) - 1:
+                    callers_self.setdefault(callee, Counter())[caller] += hits
+        
+        sample_seconds = self.sample_seconds
+        stats = {}
+        for key, hits in hits_total.items():
+            key_callers = {}
+            for caller, caller_hits in callers.get(key, {}).items():
+                caller_self = callers_self.get(key, {}).get(caller, 0)
+                key_callers[caller] = (caller_hits, caller_hits, caller_self * sample_seconds,
+                                       caller_hits * sample_seconds)
+            stats[key] = (hits, hits, hits_self[key] * sample_seconds, hits * sample_seconds, key_callers)
+        return stats
+    
+    @staticmethod
+    def _label(key: FrameKey) -> str:
+        """'function (package/module.py:line)' - the package shows whose code it is"""
+        filename, line, function = key
+        parts = Path(filename).parts[-2:]
+        return f"{function} ({'/'.join(parts)}:{line})"
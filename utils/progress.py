@@ -2,39 +2,190 @@
 # PROGRESS TRACKER - Thread-safe progress tracking
 # ============================================================================
 
+import os
+import math
+import time
+import queue
 import threading
-from typing import Optional
+from pathlib import Path
+from collections import deque
+from typing import Dict, Optional
 from datetime import datetime, timedelta
 
+from config import Config
+
+class _Throughput:
+    """Files, bytes and weighted cost done, with exponentially smoothed rates"""
+    
+    def __init__(self, start: float):
+        self.files = 0
+        self.bytes = 0
+        self.cost = 0.0
+        self.rates = None  # (files/s, bytes/s, cost/s) once the first window has passed
+        self._start = start
+        self._sampled = (start, 0, 0, 0.0)
+    
+    def add(self, size: int, cost: float):
+        self.files += 1
+        self.bytes += size
+        self.cost += cost
+    
+    def sample(self, now: float):
+        """
+        Fold the rates since the last sample into the smoothed rates
+        
+        Samples closer together than Config.PROGRESS_RATE_WINDOW are skipped.
+        The weight of a sample grows with its length, so the smoothing does
+        not depend on how often files finish.
+        """
+        last, files, size, cost = self._sampled
+        elapsed = now - last
+        if elapsed < Config.PROGRESS_RATE_WINDOW:
+            return
+        
+        current = ((self.files - files) / elapsed, (self.bytes - size) / elapsed,
+                   (self.cost - cost) / elapsed)
+        if self.rates is None:
+            self.rates = current
+        else:
+            alpha = 1 - math.exp(-elapsed / Config.PROGRESS_SMOOTHING_SECONDS)
+            self.rates = tuple(alpha * new + (1 - alpha) * old for new, old in zip(current, self.rates))
+        self._sampled = (now, self.files, self.bytes, self.cost)
+    
+    def get_rates(self, now: float) -> tuple:
+        """Smoothed rates, or the averages so far before the first window has passed"""
+        if self.rates is not None:
+            return self.rates
+        elapsed = now - self._start
+        if elapsed <= 0:
+            return 0.0, 0.0, 0.0
+        return self.files / elapsed, self.bytes / elapsed, self.cost / elapsed
+
+
 class ProgressTracker:
-    """Thread-safe progress tracker for multi-threaded extraction"""
+    """
+    Thread-safe progress tracker for multi-threaded extraction
+    
+    The total can be unknown while files are still being discovered: it
+    then grows with add_discovered() and is fixed by set_total() once the
+    scan has finished.
+    
+    Besides file counts it tracks bytes and extraction cost (size weighted
+    by file type, as in FileScanner.estimate_cost), overall and per file
+    type. Throughput is smoothed exponentially, and the ETA divides the
+    remaining cost by the smoothed cost rate, so a few huge PDFs among
+    thousands of small text files are accounted for.
+    """
     
-    def __init__(self, total_files: int):
-        self.total_files = total_files
+    def __init__(self, total_files: Optional[int] = None):
+        """
+        Initialize tracker
+        
+        Args:
+            total_files: Number of files, or None if the scan is still running
+        """
+        self.total_files = total_files or 0
+        self.scan_complete = total_files is not None
         self.processed_files = 0
         self.successful = 0
         self.failed = 0
         self.skipped = 0
+        self.duplicates = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.start_time = datetime.now()
         self.lock = threading.Lock()
         self.current_file = ""
+        
+        # Bytes and cost: discovered, finished in any way, and extracted (throughput)
+        self.total_bytes = 0
+        self.total_cost = 0.0
+        self.done_bytes = 0
+        self.done_cost = 0.0
+        self._started = time.monotonic()
+        self._throughput = _Throughput(self._started)
+        self._types: Dict[str, dict] = {}  # File type -> counters and _Throughput
     
-    def update(self, success: bool = True, skipped: bool = False, filename: str = ""):
-        """Update progress counters"""
+    def update(self, success: bool = True, skipped: bool = False, filename: str = "",
+               duplicate: bool = False, size: int = 0):
+        """
+        Update progress counters
+        
+        Args:
+            success: Whether the file was extracted successfully
+            skipped: The file was not extracted (unsupported)
+            filename: Path of the file
+            duplicate: The file is a copy of an extracted file
+            size: File size in bytes (counts towards throughput unless skipped or a duplicate)
+        """
         with self.lock:
             self.processed_files += 1
-            if skipped:
+            if duplicate:
+                self.duplicates += 1
+            elif skipped:
                 self.skipped += 1
             elif success:
                 self.successful += 1
             else:
                 self.failed += 1
             self.current_file = filename
+            
+            file_type = self._file_type(filename)
+            cost = self._cost(file_type, size)
+            counters = self._type_counters(file_type)
+            counters['processed'] += 1
+            counters['done_bytes'] += size
+            self.done_bytes += size
+            self.done_cost += cost
+            
+            if not (duplicate or skipped):
+                now = time.monotonic()
+                for throughput in (self._throughput, counters['throughput']):
+                    throughput.add(size, cost)
+                    throughput.sample(now)
+    
+    def add_discovered(self, file_path: Optional[Path] = None, size: int = 0, count: int = 1):
+        """
+        Add a file found by the running scan to the total
+        
+        Args:
+            file_path: The file (its extension selects the file type)
+            size: File size in bytes
+            count: -1 to drop a file again (see remove_discovered)
+        """
+        with self.lock:
+            file_type = self._file_type(file_path)
+            counters = self._type_counters(file_type)
+            counters['files'] += count
+            counters['bytes'] += count * size
+            self.total_files += count
+            self.total_bytes += count * size
+            self.total_cost += count * self._cost(file_type, size)
+    
+    def remove_discovered(self, file_path: Optional[Path] = None, size: int = 0):
+        """Drop a discovered file that will not be processed in this run"""
+        self.add_discovered(file_path, size, count=-1)
+    
+    def set_total(self, total_files: Optional[int] = None):
+        """Mark the scan as finished, optionally fixing the total"""
+        with self.lock:
+            if total_files is not None:
+                self.total_files = total_files
+            self.scan_complete = True
+    
+    def record_cache(self, hit: bool):
+        """Count an extraction cache hit or miss"""
+        with self.lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
     
     def get_stats(self) -> dict:
         """Get current statistics"""
         with self.lock:
             elapsed = (datetime.now() - self.start_time).total_seconds()
+            now = time.monotonic()
             
             # Calculate progress percentage
             progress = (self.processed_files / self.total_files * 100) if self.total_files > 0 else 0
@@ -42,27 +193,66 @@ class ProgressTracker:
             # Calculate speed (files per second)
             speed = self.processed_files / elapsed if elapsed > 0 else 0
             
-            # Estimate time remaining
-            if speed > 0:
-                remaining_files = self.total_files - self.processed_files
-                eta_seconds = remaining_files / speed
+            # Smoothed throughput (decays while nothing finishes)
+            self._throughput.sample(now)
+            files_rate, bytes_rate, cost_rate = self._throughput.get_rates(now)
+            
+            # Estimate time remaining from the weighted cost (unknown until
+            # every file has been found)
+            remaining_cost = max(self.total_cost - self.done_cost, 0)
+            eta_seconds = None
+            if not self.scan_complete:
+                eta = "Scanning..."
+            elif cost_rate > 0:
+                eta_seconds = remaining_cost / cost_rate
                 eta = str(timedelta(seconds=int(eta_seconds)))
             else:
                 eta = "Calculating..."
             
+            by_type = {}
+            for file_type, counters in sorted(self._types.items()):
+                counters['throughput'].sample(now)
+                type_files_rate, type_bytes_rate, _ = counters['throughput'].get_rates(now)
+                by_type[file_type] = {
+                    'files': counters['files'],
+                    'processed': counters['processed'],
+                    'bytes': counters['bytes'],
+                    'bytes_processed': counters['done_bytes'],
+                    'files_per_second': round(type_files_rate, 2),
+                    'mb_per_second': round(type_bytes_rate / (1024 * 1024), 2),
+                }
+            
             return {
                 'total': self.total_files,
+                'scan_complete': self.scan_complete,  # Otherwise 'total' is discovered so far
                 'processed': self.processed_files,
                 'successful': self.successful,
                 'failed': self.failed,
                 'skipped': self.skipped,
+                'duplicates': self.duplicates,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
                 'progress_percent': round(progress, 2),
                 'elapsed_time': str(timedelta(seconds=int(elapsed))),
                 'speed': round(speed, 2),
                 'eta': eta,
+                'eta_seconds': round(eta_seconds, 1) if eta_seconds is not None else None,
+                'bytes_total': self.total_bytes,
+                'bytes_processed': self.done_bytes,
+                'bytes_remaining': max(self.total_bytes - self.done_bytes, 0),
+                'files_per_second': round(files_rate, 2),
+                'mb_per_second': round(bytes_rate / (1024 * 1024), 2),
+                'by_type': by_type,
                 'current_file': self.current_file
             }
     
+    def format_status(self, stats: Optional[dict] = None) -> str:
+        """One-line summary for logs, e.g. '120/5000 files, 1.2 MB/s, ETA 0:03:12'"""
+        stats = stats or self.get_stats()
+        return (f"{stats['processed']}/{stats['total']} files, "
+                f"{stats['files_per_second']:.1f} files/s, {stats['mb_per_second']:.2f} MB/s, "
+                f"ETA {stats['eta']}")
+    
     def get_progress_bar(self, width: int = 50) -> str:
         """Get text-based progress bar"""
         stats = self.get_stats()
@@ -70,3 +260,132 @@ class ProgressTracker:
         filled = int(width * progress)
         bar = '█' * filled + '░' * (width - filled)
         return f"[{bar}] {stats['progress_percent']:.1f}%"
+    
+    @staticmethod
+    def _file_type(file_path) -> str:
+        """File type category of a path ('unknown' for none)"""
+        if not file_path:
+            return 'unknown'
+        return Config.get_file_type_category(os.path.splitext(str(file_path))[1])
+    
+    @staticmethod
+    def _cost(file_type: str, size: int) -> float:
+        """Weighted extraction cost (same weighting as FileScanner.estimate_cost)"""
+        return Config.EXTRACTION_COST_WEIGHTS.get(file_type, 1) * (size + Config.COST_FIXED_OVERHEAD_BYTES)
+    
+    def _type_counters(self, file_type: str) -> dict:
+        """Counters of a file type (call with the lock held)"""
+        counters = self._types.get(file_type)
+        if counters is None:
+            counters = self._types[file_type] = {
+                'files': 0, 'processed': 0, 'bytes': 0, 'done_bytes': 0,
+                'throughput': _Throughput(self._started)
+            }
+        return counters
+
+
+class ProgressPublisher:
+    """
+    Send progress and log messages to the GUI queue at a fixed rate
+    
+    Small files can finish thousands of times per second, but the GUI only
+    needs the latest state every Config.PROGRESS_UPDATE_INTERVAL seconds.
+    Finished files and log lines are collected and sent as one 'progress'
+    and one 'logs' message per interval, so the work of the GUI thread does
+    not grow with the file rate. The queue may be bounded: if it is full,
+    updates stay collected and are retried at the next interval instead of
+    blocking the extraction.
+    """
+    
+    def __init__(self, msg_queue: queue.Queue, progress: ProgressTracker,
+                 interval: Optional[float] = None, max_log_lines: Optional[int] = None):
+        """
+        Initialize publisher
+        
+        Args:
+            msg_queue: GUI message queue
+            progress: Tracker whose stats are sent
+            interval: Seconds between updates (defaults to Config.PROGRESS_UPDATE_INTERVAL)
+            max_log_lines: Log lines kept per update; older ones are only
+                           counted (defaults to Config.PROGRESS_MAX_LOG_LINES)
+        """
+        self.msg_queue = msg_queue
+        self.progress = progress
+        self.interval = Config.PROGRESS_UPDATE_INTERVAL if interval is None else interval
+        self.lock = threading.Lock()
+        self._changed = False
+        self._logs = deque(maxlen=max_log_lines or Config.PROGRESS_MAX_LOG_LINES)
+        self._dropped = 0
+        self._last_sent = 0.0
+        self._timer = None
+    
+    def file_done(self):
+        """Note that the progress changed (sent with the next update)"""
+        with self.lock:
+            self._changed = True
+        self._schedule()
+    
+    def log(self, text: str, level: str = 'INFO'):
+        """Add a line for the GUI log (sent with the next update)"""
+        with self.lock:
+            if len(self._logs) == self._logs.maxlen:
+                self._dropped += 1
+            self._logs.append((text, level))
+        self._schedule()
+    
+    def put(self, message: tuple):
+        """Send a message the GUI must not miss ('complete', 'stopped') after all pending updates"""
+        self.flush(block=True)
+        self.msg_queue.put(message)
+    
+    def flush(self, block: bool = False) -> bool:
+        """
+        Send the collected updates now
+        
+        Args:
+            block: Wait for room in the queue instead of retrying later
+        
+        Returns:
+            Whether everything was sent
+        """
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._last_sent = time.monotonic()
+            
+            try:
+                if self._changed:
+                    self.msg_queue.put(('progress', self.progress.get_stats()), block=block)
+                    self._changed = False
+                
+                if self._logs or self._dropped:
+                    lines = list(self._logs)
+                    if self._dropped:
+                        lines.insert(0, (f"... {self._dropped} more messages (see the log file)", 'WARNING'))
+                    self.msg_queue.put(('logs', lines), block=block)
+                    self._logs.clear()
+                    self._dropped = 0
+            except queue.Full:
+                # The GUI is behind; keep collecting and try again later
+                self._start_timer(self.interval)
+                return False
+        return True
+    
+    def _schedule(self):
+        """Send now if the interval has passed since the last update, else once it has"""
+        with self.lock:
+            if self._timer is not None:
+                return
+            delay = self._last_sent + self.interval - time.monotonic()
+            if delay > 0:
+                self._start_timer(delay)
+                return
+        self.flush()
+    
+    def _start_timer(self, delay: float):
+        """Flush after a delay (call with the lock held)"""
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
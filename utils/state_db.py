@@ -0,0 +1,159 @@
+# ============================================================================
+# FILE STATE DB - Per-source file state for incremental re-extraction
+# ============================================================================
+
+import os
+import json
+import hashlib
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+from config import Config
+from utils.checksum import checksum_field
+
+# Results kept as the file's final state. Errors, timeouts, crashes and skips
+# may be transient (missing dependency or tool), so those files are stored
+# with retry set and extracted again by every run until they succeed.
+FINAL_STATUSES = ('success', 'partial', 'duplicate')
+
+class FileStateDB:
+    """
+    Remember what every file looked like when it was last extracted.
+    
+    One SQLite database per source directory (in Config.STATE_FOLDER) holds
+    (path, inode, size, mtime, checksum) plus the last result record for each
+    file. An incremental run compares the current scan against it to find
+    new, changed and removed files (and files whose last extraction failed),
+    and the stored records let the full merged snapshot be written without
+    extracting anything again.
+    """
+    
+    def __init__(self, source_dir: Path):
+        """
+        Open (or create) the state database for a source directory
+        
+        Args:
+            source_dir: Absolute source directory of the runs
+        """
+        self.logger = logging.getLogger(__name__)
+        self.source_dir = Path(source_dir)
+        
+        state_dir = Path(Config.STATE_FOLDER)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        source_key = hashlib.sha1(str(self.source_dir).encode('utf-8')).hexdigest()[:16]
+        self.db_path = state_dir / f"{source_key}.db"
+        
+        import sqlite3
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                checksum TEXT,
+                file_id TEXT,
+                record BLOB,
+                retry INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # State databases of earlier versions lack the retry column
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(files)')}
+        if 'retry' not in columns:
+            self.conn.execute('ALTER TABLE files ADD COLUMN retry INTEGER NOT NULL DEFAULT 0')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)'
+        )
+        self.conn.execute(
+            'INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)',
+            ('source_dir', str(self.source_dir))
+        )
+        self.conn.commit()
+    
+    def lookup(self, path: str) -> Optional[Tuple[int, int, int, str, str, int]]:
+        """
+        Get the stored state of a file
+        
+        Returns:
+            (inode, size, mtime_ns, checksum, file_id, retry), or None for a new file
+        """
+        return self.conn.execute(
+            'SELECT inode, size, mtime_ns, checksum, file_id, retry FROM files WHERE path = ?',
+            (path,)
+        ).fetchone()
+    
+    def get_record(self, path: str) -> Optional[dict]:
+        """Stored result record of a file, or None"""
+        row = self.conn.execute('SELECT record FROM files WHERE path = ?', (path,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+    
+    def is_unchanged(self, path: str, stat: os.stat_result) -> bool:
+        """
+        Check inode, size and mtime against the stored state (no hashing)
+        
+        Files whose last extraction failed are never unchanged.
+        """
+        state = self.lookup(path)
+        if state is None or state[5]:
+            return False
+        inode, size, mtime_ns = state[:3]
+        return (inode, size, mtime_ns) == (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    
+    def find_removed(self, current_paths: set) -> List[Tuple[str, str]]:
+        """
+        Find files that were extracted before but no longer exist
+        
+        Returns:
+            List of (path, file_id) tuples
+        """
+        return [
+            (path, file_id)
+            for path, file_id in self.conn.execute('SELECT path, file_id FROM files')
+            if path not in current_paths
+        ]
+    
+    def upsert(self, path: str, stat: os.stat_result, result: dict):
+        """Store the state and result record of a freshly extracted file"""
+        record = zlib.compress(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        retry = result.get('extraction_status') not in FINAL_STATUSES
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files '
+            '(path, inode, size, mtime_ns, checksum, file_id, record, retry) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (path, stat.st_ino, stat.st_size, stat.st_mtime_ns,
+             result.get(checksum_field()), result.get('file_id'), record, int(retry))
+        )
+    
+    def touch(self, path: str, stat: os.stat_result):
+        """Update stat fields of a file whose content did not change"""
+        self.conn.execute(
+            'UPDATE files SET inode = ?, size = ?, mtime_ns = ? WHERE path = ?',
+            (stat.st_ino, stat.st_size, stat.st_mtime_ns, path)
+        )
+    
+    def remove(self, path: str):
+        """Forget a deleted file"""
+        self.conn.execute('DELETE FROM files WHERE path = ?', (path,))
+    
+    def iter_records(self) -> Iterator[dict]:
+        """Yield the latest result record of every known file"""
+        for (record,) in self.conn.execute('SELECT record FROM files ORDER BY path'):
+            if record is not None:
+                yield json.loads(zlib.decompress(record).decode('utf-8'))
+    
+    def count(self) -> int:
+        """Number of files in the state"""
+        return self.conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+    
+    def commit(self):
+        """Persist pending changes (called after each output sync)"""
+        self.conn.commit()
+    
+    def close(self):
+        """Commit and close the database"""
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,352 @@
+# ============================================================================
+# SUPERVISOR - Killable worker processes with per-task time and memory limits
+# ============================================================================
+
+import os
+import sys
+import time
+import signal
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Optional, Tuple
+import logging
+
+from utils.cancellation import CancellationToken, install_token
+
+class WorkerFailure(Exception):
+    """A task was lost together with its worker process"""
+    
+    status = 'crashed'
+
+
+class WorkerTimeout(WorkerFailure):
+    """The task ran longer than the wall-clock limit and its worker was killed"""
+    
+    status = 'timeout'
+
+
+class WorkerCrashed(WorkerFailure):
+    """The worker died (native crash, memory limit) while running the task"""
+    
+    status = 'crashed'
+
+
+class _Worker:
+    """One worker process and the task it is running"""
+    
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.future: Optional[Future] = None
+        self.started = 0.0
+    
+    @property
+    def busy(self) -> bool:
+        return self.future is not None
+
+
+class SupervisedProcessPool:
+    """
+    Process pool whose workers can be killed one at a time.
+    
+    Each worker runs one task at a time over its own pipe. A supervisor
+    thread watches the wall-clock time and memory of every busy worker; a
+    worker that exceeds a limit, or dies on its own (segfault in a native
+    library), is killed and replaced, and only its task fails with
+    WorkerTimeout or WorkerCrashed. The other workers keep running, unlike
+    ProcessPoolExecutor, where one dead worker breaks the whole pool.
+    """
+    
+    # Upper bound on how long the supervisor sleeps between limit checks
+    POLL_INTERVAL = 0.5
+    
+    def __init__(self, max_workers: int, timeout: Optional[float] = None,
+                 memory_limit_mb: Optional[int] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        """
+        Initialize pool (workers are started on demand)
+        
+        Args:
+            max_workers: Number of worker processes
+            timeout: Wall-clock limit per task in seconds (None or 0 = no limit)
+            memory_limit_mb: Resident memory limit per worker (None or 0 = no limit)
+            cancel_token: Token installed in every worker
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.timeout = timeout or None
+        self.memory_limit_bytes = (memory_limit_mb or 0) * 1024 * 1024 or None
+        self.cancel_token = cancel_token
+        if cancel_token is not None:
+            cancel_token.share()
+        
+        # Imported here so that importing the failure types stays cheap
+        import multiprocessing
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: List[_Worker] = []
+        self._pending: Deque[Tuple[Future, Callable, tuple]] = deque()
+        self._lock = threading.Lock()
+        self._wake_reader, self._wake_writer = self._context.Pipe(duplex=False)
+        self._shutdown = False
+        
+        if self.memory_limit_bytes and _rss_bytes(os.getpid()) is None:
+            self.logger.warning("Worker memory limit needs psutil on this platform - not enforced")
+            self.memory_limit_bytes = None
+        
+        self._thread = threading.Thread(target=self._supervise, name='worker-supervisor', daemon=True)
+        self._thread.start()
+    
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Queue a task for the next free worker
+        
+        Args:
+            fn: Module-level callable (pickled to the worker)
+            *args: Picklable arguments for fn
+        
+        Returns:
+            Future for the task result
+        """
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot submit after shutdown')
+            self._pending.append((future, fn, args))
+        self._wake()
+        return future
+    
+    def shutdown(self, wait: bool = True):
+        """Finish queued tasks, then stop all workers"""
+        with self._lock:
+            self._shutdown = True
+        self._wake()
+        if wait:
+            self._thread.join()
+    
+    def _wake(self):
+        """Interrupt the supervisor's wait"""
+        try:
+            self._wake_writer.send_bytes(b'')
+        except OSError:
+            pass
+    
+    # ------------------------------------------------------------------------
+    # Supervisor thread
+    # ------------------------------------------------------------------------
+    
+    def _supervise(self):
+        """Dispatch tasks, collect results and enforce limits until shutdown"""
+        from multiprocessing.connection import wait as wait_ready
+        
+        while True:
+            self._dispatch()
+            
+            with self._lock:
+                if self._shutdown and not self._pending and not any(w.busy for w in self._workers):
+                    break
+            
+            waitables = [self._wake_reader]
+            for worker in self._workers:
+                waitables.append(worker.process.sentinel)
+                if worker.busy:
+                    waitables.append(worker.conn)
+            
+            for ready in wait_ready(waitables, timeout=self._next_check()):
+                if ready is self._wake_reader:
+                    while self._wake_reader.poll():
+                        self._wake_reader.recv_bytes()
+            
+            # Results first, so a worker that answered and then exited is not
+            # reported as crashed
+            for worker in list(self._workers):
+                if worker.busy and worker.conn.poll():
+                    self._collect(worker)
+            for worker in list(self._workers):
+                if not worker.process.is_alive():
+                    self._retire(worker, WorkerCrashed(
+                        f"Worker process died (exit code {worker.process.exitcode})"
+                    ))
+            
+            self._enforce_limits()
+        
+        for worker in self._workers:
+            self._stop(worker)
+        self._workers = []
+        self._wake_reader.close()
+        self._wake_writer.close()
+    
+    def _dispatch(self):
+        """Hand queued tasks to idle workers, starting workers as needed"""
+        while True:
+            worker = next((w for w in self._workers if not w.busy), None)
+            if worker is None and len(self._workers) >= self.max_workers:
+                return
+            
+            with self._lock:
+                if not self._pending:
+                    return
+                future, fn, args = self._pending.popleft()
+            
+            # Cancelled while queued
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            if worker is None:
+                worker = self._start_worker()
+            
+            try:
+                worker.conn.send((fn, args))
+            except Exception as e:
+                # Unpicklable task, or the worker died (retired on the next pass)
+                future.set_exception(e)
+                continue
+            
+            worker.future = future
+            worker.started = time.monotonic()
+    
+    def _collect(self, worker: _Worker):
+        """Receive a finished task's result from its worker"""
+        future = worker.future
+        try:
+            ok, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            self._retire(worker, WorkerCrashed("Worker process died while sending its result"))
+            return
+        except Exception as e:
+            # Result could not be unpickled; the worker itself is fine
+            ok, payload = False, e
+        
+        worker.future = None
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(payload)
+    
+    def _enforce_limits(self):
+        """Kill workers that ran too long or grew too large"""
+        now = time.monotonic()
+        for worker in list(self._workers):
+            if not worker.busy:
+                continue
+            
+            if self.timeout and now - worker.started > self.timeout:
+                self._retire(worker, WorkerTimeout(
+                    f"Extraction exceeded the {self.timeout:g}s time limit"
+                ))
+            elif self.memory_limit_bytes:
+                rss = _rss_bytes(worker.process.pid)
+                if rss is not None and rss > self.memory_limit_bytes:
+                    self._retire(worker, WorkerCrashed(
+                        f"Extraction exceeded the {self.memory_limit_bytes // (1024 * 1024)} MB memory limit"
+                    ))
+    
+    def _next_check(self) -> float:
+        """Seconds until the earliest deadline, capped at POLL_INTERVAL"""
+        if not self.timeout:
+            return self.POLL_INTERVAL
+        
+        now = time.monotonic()
+        remaining = [w.started + self.timeout - now for w in self._workers if w.busy]
+        return max(0.0, min(remaining + [self.POLL_INTERVAL]))
+    
+    def _start_worker(self) -> _Worker:
+        """Spawn a worker process"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.cancel_token),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        return worker
+    
+    def _retire(self, worker: _Worker, error: WorkerFailure):
+        """Kill a worker and fail its task; a replacement is started on demand"""
+        self._stop(worker, kill=True)
+        self._workers.remove(worker)
+        
+        if worker.future is not None:
+            self.logger.warning(f"{error} - worker {worker.process.pid} replaced")
+            worker.future.set_exception(error)
+            worker.future = None
+    
+    def _stop(self, worker: _Worker, kill: bool = False):
+        """Stop a worker process and close its pipe"""
+        if kill:
+            worker.process.kill()
+        else:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+
+
+def _worker_main(conn, cancel_token: Optional[CancellationToken]):
+    """Worker process loop: run tasks from the pipe until told to stop"""
+    # Ctrl+C is handled by the parent, which cancels the run cooperatively
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    install_token(cancel_token)
+    
+    # A fresh interpreter: pick up the parent's run-time settings (exported
+    # to the environment by Config.load)
+    from config import Config
+    Config.load()
+    
+    try:
+        _run_tasks(conn)
+    finally:
+        # Worker processes end without atexit hooks; write the batched cache stores
+        from utils.cache import ExtractionCache
+        ExtractionCache.flush_instance()
+
+
+def _run_tasks(conn):
+    """Run tasks from the pipe until the parent closes it or sends None"""
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        
+        fn, args = task
+        try:
+            reply = (True, fn(*args))
+        except BaseException as e:
+            reply = (False, e)
+        
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send((False, RuntimeError(f"Result could not be sent to the parent: {e}")))
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident memory of a process, or None if it cannot be measured here"""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    
+    if sys.platform.startswith('linux'):
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return None
+    return None
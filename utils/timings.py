@@ -0,0 +1,174 @@
+# ============================================================================
+# TIMINGS - Per-stage durations of file extraction
+# ============================================================================
+
+import time
+from typing import Dict, Optional
+
+from config import Config
+
+class _Stage:
+    """Context manager timing one stage of a StageTimings"""
+    
+    __slots__ = ('timings', 'name', 'nbytes', 'start', 'child_seconds')
+    
+    def __init__(self, timings: 'StageTimings', name: str, nbytes: int):
+        self.timings = timings
+        self.name = name
+        self.nbytes = nbytes
+        self.child_seconds = 0.0
+    
+    def __enter__(self):
+        self.timings._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self.start
+        stack = self.timings._stack
+        stack.pop()
+        if stack:
+            stack[-1].child_seconds += elapsed
+        self.timings.add(self.name, elapsed - self.child_seconds, self.nbytes)
+        return False
+
+
+class _NoStage:
+    """Stand-in when timings are off"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+class StageTimings:
+    """
+    Durations and bytes of the named stages of one file's extraction.
+    
+    Stages nest: the time of an inner stage (decode inside extract) is not
+    counted again in the stage around it, so the stages of a file add up to
+    its total. Time outside any stage is reported as 'other'. One instance
+    belongs to one extractor and is used from one thread.
+    """
+    
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Initialize timings (the total runs from here)
+        
+        Args:
+            enabled: Record anything at all (defaults to Config.RECORD_TIMINGS)
+        """
+        self.enabled = Config.RECORD_TIMINGS if enabled is None else enabled
+        self.stages: Dict[str, list] = {}  # Name -> [seconds, bytes]
+        self._stack = []
+        self._start = time.perf_counter()
+    
+    def stage(self, name: str, nbytes: int = 0):
+        """
+        Time a block: `with timings.stage('decode', len(data)): ...`
+        
+        Args:
+            name: Stage name (repeated stages add up)
+            nbytes: Bytes the stage processed
+        """
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name, nbytes)
+    
+    def add(self, name: str, seconds: float, nbytes: int = 0):
+        """Add a measured duration to a stage"""
+        if not self.enabled:
+            return
+        entry = self.stages.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += nbytes
+    
+    def as_dict(self) -> dict:
+        """
+        Timings for the result record
+        
+        Returns:
+            {stage: {'ms': float, 'bytes': int}} plus 'other' and 'total';
+            bytes are left out where a stage did not report them
+        """
+        total = time.perf_counter() - self._start
+        timings = {}
+        for name, (seconds, nbytes) in self.stages.items():
+            timings[name] = {'ms': round(seconds * 1000, 3)}
+            if nbytes:
+                timings[name]['bytes'] = nbytes
+        other = total - sum(seconds for seconds, _ in self.stages.values())
+        timings['other'] = {'ms': round(max(other, 0) * 1000, 3)}
+        timings['total'] = {'ms': round(total * 1000, 3)}
+        return timings
+
+
+class TimingTotals:
+    """Per-stage totals over all files of a run"""
+    
+    def __init__(self):
+        self.stages: Dict[str, dict] = {}  # Name -> {'files', 'ms', 'bytes'}
+    
+    def add(self, timings: Optional[dict]):
+        """Add the 'timings' field of one result record"""
+        for name, values in (timings or {}).items():
+            self._add(name, values.get('ms', 0), values.get('bytes', 0))
+    
+    def add_stage(self, name: str, ms: float, nbytes: int = 0, files: int = 1):
+        """
+        Add a duration measured outside the extractors (e.g. serialization)
+        
+        It is counted into 'total' as well, so stage shares stay within 100%.
+        """
+        self._add(name, ms, nbytes, files)
+        self._add('total', ms, files=0)
+    
+    def _add(self, name: str, ms: float, nbytes: int = 0, files: int = 1):
+        """Add to one stage's totals"""
+        entry = self.stages.setdefault(name, {'files': 0, 'ms': 0.0, 'bytes': 0})
+        entry['files'] += files
+        entry['ms'] += ms
+        entry['bytes'] += nbytes
+    
+    def summary(self) -> dict:
+        """
+        Totals for the footer, slowest stage first
+        
+        Returns:
+            {stage: {'files', 'ms', 'bytes', 'share_percent'}}; the share is
+            of the summed per-file totals plus the stages added with
+            add_stage ('total' itself is listed last)
+        """
+        total_ms = self.stages.get('total', {}).get('ms', 0)
+        stages = sorted((item for item in self.stages.items() if item[0] != 'total'),
+                        key=lambda item: item[1]['ms'], reverse=True)
+        if 'total' in self.stages:
+            stages.append(('total', self.stages['total']))
+        
+        summary = {}
+        for name, entry in stages:
+            summary[name] = {
+                'files': entry['files'],
+                'ms': round(entry['ms'], 1),
+                'bytes': entry['bytes'],
+                'share_percent': round(entry['ms'] / total_ms * 100, 1) if total_ms else None
+            }
+        return summary
+    
+    def format_top(self, count: int = 5) -> str:
+        """The slowest stages as one log line, e.g. 'ocr 61.2% (12.3 s), decode 20.1% (4.0 s)'"""
+        parts = []
+        for name, entry in self.summary().items():
+            if name == 'total' or len(parts) >= count:
+                continue
+            share = f"{entry['share_percent']}% " if entry['share_percent'] is not None else ""
+            duration = f"{entry['ms'] / 1000:.1f} s" if entry['ms'] >= 1000 else f"{entry['ms']:.0f} ms"
+            parts.append(f"{name} {share}({duration})")
+        return ", ".join(parts)